@@ -0,0 +1,44 @@
+import statistics
+import time
+from typing import Awaitable, Callable
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    cut_points = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": cut_points[49],
+        "p95": cut_points[94],
+        "p99": cut_points[98],
+    }
+
+
+def time_calls(call: Callable[[], object], iterations: int, warmup: int = 20):
+    for _ in range(warmup):
+        call()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def time_async_calls(
+    call: Callable[[], Awaitable[object]], iterations: int, warmup: int = 20
+):
+    for _ in range(warmup):
+        await call()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def print_table(title: str, rows: dict[str, dict[str, float]], width: int = 28):
+    print(title)
+    columns = list(next(iter(rows.values())).keys())
+    print(f"  {'':<{width}}" + "".join(f"{column:>12}" for column in columns))
+    for name, values in rows.items():
+        print(f"  {name:<{width}}" + "".join(f"{values[c]:>12.3f}" for c in columns))
@@ -0,0 +1,94 @@
+"""Measures bytes on the wire and CPU per request of a 100 item books page
+with 1000 character descriptions for each supported encoding and level.
+
+Run with: PYTHONPATH=books_reviewing python -m benchmarks.compression
+"""
+import datetime
+import random
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_pagination import add_pagination
+from odmantic import ObjectId
+
+from benchmarks.common import percentiles, print_table
+from books_reviewing.dependencies import get_books_service
+from books_reviewing.middleware.compression import COMPRESSORS, CompressionMiddleware
+from books_reviewing.models import Book
+from books_reviewing.responses import NegotiatedResponse
+from books_reviewing.routers.books import router as books_router
+
+PAGE_SIZE = 100
+ITERATIONS = 200
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 9], "zstd": [1, 3, 12]}
+WORDS = (
+    "the a of and book story reader chapter author novel history war peace "
+    "love life world time people city night house family friend journey"
+).split()
+
+
+class StubBooksService:
+    def __init__(self, books: list[Book]):
+        self.books = books
+
+    async def query(self, *args):
+        return self.books, len(self.books) * 10
+
+
+def create_books() -> list[Book]:
+    randomizer = random.Random(42)
+    return [
+        Book(
+            id=ObjectId(),
+            isbn="9780306406157",
+            title=f"Book number {i}",
+            description=" ".join(randomizer.choices(WORDS, k=250))[:1000],
+            publication_date=datetime.datetime.now(),
+            author_id=ObjectId(),
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def create_client(books: list[Book], encoding: str | None, level: int) -> TestClient:
+    app = FastAPI(default_response_class=NegotiatedResponse)
+    app.include_router(books_router, prefix="/books")
+    app.dependency_overrides[get_books_service] = lambda: StubBooksService(books)
+    add_pagination(app)
+    if encoding:
+        app.add_middleware(
+            CompressionMiddleware, levels={encoding: level}, encodings=[encoding]
+        )
+    return TestClient(app, headers={"Accept-Encoding": encoding or "identity"})
+
+
+def measure(client: TestClient) -> tuple[int, dict[str, float]]:
+    url = f"/books/?size={PAGE_SIZE}"
+    size = 0
+    samples = []
+    for iteration in range(ITERATIONS + 20):
+        started = time.process_time()
+        with client.stream("GET", url) as response:
+            size = sum(len(chunk) for chunk in response.iter_raw())
+        if iteration >= 20:
+            samples.append((time.process_time() - started) * 1000)
+    return size, percentiles(samples)
+
+
+def main():
+    books = create_books()
+    rows = {}
+    for encoding, levels in [(None, [0]), *LEVELS.items()]:
+        if encoding and encoding not in COMPRESSORS:
+            continue
+        for level in levels:
+            size, cpu = measure(create_client(books, encoding, level))
+            name = f"{encoding or 'identity'}:{level}" if encoding else "identity"
+            rows[name] = {"bytes": size, **cpu}
+
+    print_table("GET /books/ wire bytes and CPU per request (ms)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+"""End-to-end HTTP benchmark of every route against a real MongoDB.
+
+Starts a throwaway mongod (MONGOD, default "mongod" from PATH) or uses the
+server at BENCH_MONGO_URI, seeds the "bench" database with BENCH_USERS,
+BENCH_AUTHORS, BENCH_BOOKS and BENCH_REVIEWS documents, and starts the app
+with the production runner (BENCH_WORKERS workers, rate limiting off). Each
+route is then driven on its own by CONCURRENCY concurrent clients for
+DURATION seconds, after WARMUP seconds that are not recorded. Delete and
+merge routes consume BENCH_DELETES documents seeded for them and stop early
+when they run out. Reads run first, so writes do not change what they see.
+
+Throughput and latency percentiles per route are printed and written to
+BENCH_OUTPUT (default benchmarks/results/e2e-<commit>.json). Two result
+files can be compared with:
+
+    PYTHONPATH=books_reviewing python -m benchmarks.e2e compare old.json new.json
+
+Run with: PYTHONPATH=books_reviewing python -m benchmarks.e2e
+"""
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from typing import Callable, Iterator
+
+import httpx
+from odmantic import ObjectId
+from pymongo import MongoClient
+
+from benchmarks.common import percentiles, print_table
+from books_reviewing.runner import available_cpus
+
+USERS = int(os.getenv("BENCH_USERS", 1000))
+AUTHORS = int(os.getenv("BENCH_AUTHORS", 200))
+BOOKS = int(os.getenv("BENCH_BOOKS", 2000))
+REVIEWS = int(os.getenv("BENCH_REVIEWS", 10000))
+DELETES = int(os.getenv("BENCH_DELETES", 200))
+WORKERS = int(os.getenv("BENCH_WORKERS", 1))
+CONCURRENCY = int(os.getenv("CONCURRENCY", 32))
+DURATION = float(os.getenv("DURATION", 5))
+WARMUP = float(os.getenv("WARMUP", 1))
+PAGE_SIZE = 50
+DATABASE = "bench"
+MONGO_PORT = 27099
+PORT = 8098
+
+WORDS = (
+    "river shadow garden winter silver forest empire letter island engine "
+    "harbor journey mirror season thunder window castle desert candle ocean "
+    "spring violet hunter travel secret morning stone golden whisper north"
+).split()
+
+Request = tuple[str, str, dict | None]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def isbn(number: int) -> str:
+    digits = f"978{number:09d}"
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+def user_document(rng: random.Random, number: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"{sentence(rng, 2)} {number}",
+        "birthday": datetime.datetime(1950 + number % 50, 1 + number % 12, 1),
+        "email": f"user{number}@bench.example",
+        "phone": f"+389{rng.randrange(10**8, 10**9)}",
+    }
+
+
+def author_document(rng: random.Random) -> dict:
+    return {"_id": ObjectId(), "name": sentence(rng, 2), "bio": sentence(rng, 20)}
+
+
+def book_document(rng: random.Random, number: int, author_id: ObjectId) -> dict:
+    return {
+        "_id": ObjectId(),
+        "isbn": isbn(number),
+        "title": sentence(rng, 3),
+        "description": sentence(rng, rng.randint(20, 60)),
+        "publication_date": datetime.datetime(1900 + number % 124, 1, 1),
+        "author_id": author_id,
+    }
+
+
+def review_document(rng: random.Random, user_id: ObjectId, book_id: ObjectId) -> dict:
+    return {
+        "_id": ObjectId(),
+        "rating": rng.randint(1, 5),
+        "comment": sentence(rng, rng.randint(5, 40)),
+        "user_id": user_id,
+        "book_id": book_id,
+    }
+
+
+class Dataset:
+    """The seeded documents the scenarios pick from, plus the ones set
+    aside to be deleted or merged, one per request."""
+
+    def __init__(self, rng: random.Random):
+        self.users = [user_document(rng, number) for number in range(USERS)]
+        self.authors = [author_document(rng) for _ in range(AUTHORS)]
+        self.books = [
+            book_document(rng, number, rng.choice(self.authors)["_id"])
+            for number in range(BOOKS)
+        ]
+        self.reviews = [
+            review_document(
+                rng, rng.choice(self.users)["_id"], rng.choice(self.books)["_id"]
+            )
+            for _ in range(REVIEWS)
+        ]
+
+        self.doomed_users = [
+            user_document(rng, USERS + number) for number in range(DELETES)
+        ]
+        self.doomed_authors = [author_document(rng) for _ in range(DELETES)]
+        self.doomed_books = [
+            book_document(rng, BOOKS + number, rng.choice(self.authors)["_id"])
+            for number in range(DELETES)
+        ]
+        self.doomed_reviews = [
+            review_document(
+                rng, rng.choice(self.users)["_id"], rng.choice(self.books)["_id"]
+            )
+            for _ in range(DELETES)
+        ]
+        self.merged_authors = [author_document(rng) for _ in range(DELETES)]
+        self.merged_books = [
+            book_document(rng, BOOKS + DELETES + number, author["_id"])
+            for number, author in enumerate(self.merged_authors)
+        ]
+
+    def collections(self) -> dict[str, list[dict]]:
+        return {
+            "users": self.users + self.doomed_users,
+            "authors": self.authors + self.doomed_authors + self.merged_authors,
+            "books": self.books + self.doomed_books + self.merged_books,
+            "reviews": self.reviews + self.doomed_reviews,
+        }
+
+
+def seed(mongo_uri: str, dataset: Dataset):
+    with MongoClient(mongo_uri) as client:
+        client.drop_database(DATABASE)
+        database = client[DATABASE]
+        for name, documents in dataset.collections().items():
+            for start in range(0, len(documents), 1000):
+                database[name].insert_many(documents[start : start + 1000])
+
+
+def page(rng: random.Random, count: int) -> str:
+    return f"page={rng.randint(1, max(count // PAGE_SIZE, 1))}&size={PAGE_SIZE}"
+
+
+def taking(documents: list[dict], request: Callable[[dict], Request]):
+    """A scenario that uses up documents, one per request."""
+    remaining = deque(documents)
+
+    def next_request(rng: random.Random) -> Request | None:
+        return request(remaining.popleft()) if remaining else None
+
+    return next_request
+
+
+def scenarios(data: Dataset) -> dict[str, Callable[[random.Random], Request | None]]:
+    """Request factories by route, in the order they are run."""
+    created = iter(range(10**8, 10**9))
+
+    def pick(documents: list[dict]) -> Callable[[random.Random], dict]:
+        return lambda rng: rng.choice(documents)
+
+    user, author, book, review = (
+        pick(data.users),
+        pick(data.authors),
+        pick(data.books),
+        pick(data.reviews),
+    )
+
+    return {
+        "GET /users/": lambda rng: (
+            "GET",
+            f"/users/?{page(rng, USERS)}&sort=name",
+            None,
+        ),
+        "GET /users/{user_id}": lambda rng: ("GET", f"/users/{user(rng)['_id']}", None),
+        "GET /users/by-email/{email}": lambda rng: (
+            "GET",
+            f"/users/by-email/{user(rng)['email']}",
+            None,
+        ),
+        "GET /users/export": lambda rng: ("GET", "/users/export", None),
+        "GET /authors/": lambda rng: ("GET", f"/authors/?{page(rng, AUTHORS)}", None),
+        "GET /authors/{author_id}": lambda rng: (
+            "GET",
+            f"/authors/{author(rng)['_id']}",
+            None,
+        ),
+        "GET /authors/suggest": lambda rng: (
+            "GET",
+            f"/authors/suggest?prefix={rng.choice(WORDS)[:3]}",
+            None,
+        ),
+        "GET /authors/export": lambda rng: ("GET", "/authors/export", None),
+        "GET /books/": lambda rng: (
+            "GET",
+            f"/books/?{page(rng, BOOKS)}&sort=publication_date&sort_direction=desc",
+            None,
+        ),
+        "GET /books/{book_id}": lambda rng: ("GET", f"/books/{book(rng)['_id']}", None),
+        "GET /books/by-isbn/{isbn}": lambda rng: (
+            "GET",
+            f"/books/by-isbn/{book(rng)['isbn']}",
+            None,
+        ),
+        "POST /books/by-isbn": lambda rng: (
+            "POST",
+            "/books/by-isbn",
+            {"isbns": [book(rng)["isbn"] for _ in range(50)]},
+        ),
+        "GET /books/search": lambda rng: (
+            "GET",
+            f"/books/search?q={rng.choice(WORDS)}&size={PAGE_SIZE}",
+            None,
+        ),
+        "GET /books/suggest": lambda rng: (
+            "GET",
+            f"/books/suggest?prefix={rng.choice(WORDS)[:3]}",
+            None,
+        ),
+        "GET /books/export": lambda rng: ("GET", "/books/export", None),
+        "GET /reviews/": lambda rng: (
+            "GET",
+            f"/reviews/?{page(rng, REVIEWS)}&sort=rating",
+            None,
+        ),
+        "GET /reviews/{review_id}": lambda rng: (
+            "GET",
+            f"/reviews/{review(rng)['_id']}",
+            None,
+        ),
+        "GET /reviews/search": lambda rng: (
+            "GET",
+            f"/reviews/search?q={rng.choice(WORDS)}&size={PAGE_SIZE}",
+            None,
+        ),
+        "GET /reviews/export": lambda rng: ("GET", "/reviews/export", None),
+        "POST /users/": lambda rng: (
+            "POST",
+            "/users/",
+            {
+                "name": sentence(rng, 2),
+                "birthday": "1990-10-12T00:00:00",
+                "email": f"created{next(created)}@bench.example",
+                "phone": "+389234323243",
+            },
+        ),
+        "PATCH /users/{user_id}": lambda rng: (
+            "PATCH",
+            f"/users/{user(rng)['_id']}",
+            {"name": sentence(rng, 2)},
+        ),
+        "POST /authors/": lambda rng: (
+            "POST",
+            "/authors/",
+            {"name": sentence(rng, 2), "bio": sentence(rng, 20)},
+        ),
+        "PATCH /authors/{author_id}": lambda rng: (
+            "PATCH",
+            f"/authors/{author(rng)['_id']}",
+            {"bio": sentence(rng, 20)},
+        ),
+        "POST /books/": lambda rng: (
+            "POST",
+            "/books/",
+            {
+                "isbn": isbn(next(created)),
+                "title": sentence(rng, 3),
+                "description": sentence(rng, 30),
+                "publication_date": "2020-01-01T00:00:00",
+                "author_id": str(author(rng)["_id"]),
+            },
+        ),
+        "PATCH /books/{book_id}": lambda rng: (
+            "PATCH",
+            f"/books/{book(rng)['_id']}",
+            {"description": sentence(rng, 30)},
+        ),
+        "POST /reviews/": lambda rng: (
+            "POST",
+            "/reviews/",
+            {
+                "rating": rng.randint(1, 5),
+                "comment": sentence(rng, 20),
+                "user_id": str(user(rng)["_id"]),
+                "book_id": str(book(rng)["_id"]),
+            },
+        ),
+        "PATCH /reviews/{review_id}": lambda rng: (
+            "PATCH",
+            f"/reviews/{review(rng)['_id']}",
+            {"rating": rng.randint(1, 5)},
+        ),
+        "POST /authors/{author_id}/merge-into/{target_author_id}": taking(
+            data.merged_authors,
+            lambda merged: (
+                "POST",
+                f"/authors/{merged['_id']}/merge-into/{data.authors[0]['_id']}",
+                None,
+            ),
+        ),
+        "DELETE /reviews/{review_id}": taking(
+            data.doomed_reviews,
+            lambda doomed: ("DELETE", f"/reviews/{doomed['_id']}", None),
+        ),
+        "DELETE /books/{book_id}": taking(
+            data.doomed_books,
+            lambda doomed: ("DELETE", f"/books/{doomed['_id']}", None),
+        ),
+        "DELETE /authors/{author_id}": taking(
+            data.doomed_authors,
+            lambda doomed: ("DELETE", f"/authors/{doomed['_id']}", None),
+        ),
+        "DELETE /users/{user_id}": taking(
+            data.doomed_users,
+            lambda doomed: ("DELETE", f"/users/{doomed['_id']}", None),
+        ),
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    next_request: Callable[[random.Random], Request | None],
+    duration: float,
+) -> tuple[float, Counter, list[float]]:
+    statuses, samples = Counter(), []
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int):
+        rng = random.Random(index)
+        while time.perf_counter() < deadline:
+            request = next_request(rng)
+            if request is None:
+                return
+            method, url, body = request
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+            except httpx.HTTPError:
+                statuses["error"] += 1
+                continue
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[str(response.status_code)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(CONCURRENCY)))
+    return time.perf_counter() - started, statuses, samples
+
+
+async def run_scenarios(base_url: str, data: Dataset) -> dict[str, dict]:
+    results = {}
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        for route, next_request in scenarios(data).items():
+            if not route.startswith(("DELETE", "POST /authors/{")):
+                await drive(client, next_request, WARMUP)
+            elapsed, statuses, samples = await drive(client, next_request, DURATION)
+            ok = sum(
+                count for status, count in statuses.items() if status.startswith("2")
+            )
+            results[route] = {
+                "requests": sum(statuses.values()),
+                "failed": sum(statuses.values()) - ok,
+                "req/s": round(ok / elapsed, 1),
+                **{
+                    name: round(value, 3)
+                    for name, value in latency_percentiles(samples).items()
+                },
+                "statuses": dict(sorted(statuses.items())),
+            }
+            print(f"  {route}: {results[route]['req/s']} req/s", file=sys.stderr)
+    return results
+
+
+def latency_percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) >= 2:
+        return percentiles(samples)
+    value = samples[0] if samples else 0.0
+    return {"p50": value, "p95": value, "p99": value}
+
+
+@contextlib.contextmanager
+def mongo_server() -> Iterator[str]:
+    if os.getenv("BENCH_MONGO_URI"):
+        yield os.getenv("BENCH_MONGO_URI")
+        return
+    mongod = os.getenv("MONGOD", "mongod")
+    if shutil.which(mongod) is None:
+        sys.exit(f"{mongod} not found: install MongoDB, set MONGOD or BENCH_MONGO_URI")
+    directory = tempfile.mkdtemp(prefix="bench-mongo-")
+    process = subprocess.Popen(
+        [
+            mongod,
+            "--dbpath",
+            directory,
+            "--port",
+            str(MONGO_PORT),
+            "--bind_ip",
+            "127.0.0.1",
+            "--quiet",
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    uri = f"mongodb://127.0.0.1:{MONGO_PORT}/"
+    try:
+        with MongoClient(uri, serverSelectionTimeoutMS=30000) as client:
+            client.admin.command("ping")
+        yield uri
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def start_server(mongo_uri: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "from books_reviewing.runner import run; "
+            f"run(workers={WORKERS}, port={PORT}, host='127.0.0.1', "
+            "access_log=False, log_level='warning')",
+        ],
+        env=os.environ
+        | {
+            "MONGO_URI": mongo_uri,
+            "MONGO_DB": DATABASE,
+            "SEED_DUMMY_DATABASE": "0",
+            "RATE_LIMIT": "0",
+            "LOG_FILE": "",
+        },
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/readyz").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("Server did not become ready")
+
+
+def git(*args: str) -> str:
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, check=False
+    ).stdout.strip()
+
+
+def run():
+    print(
+        f"{USERS} users, {AUTHORS} authors, {BOOKS} books, {REVIEWS} reviews; "
+        f"{WORKERS} workers, {CONCURRENCY} connections, {DURATION:g}s per route",
+        file=sys.stderr,
+    )
+    data = Dataset(random.Random(0))
+    base_url = f"http://127.0.0.1:{PORT}"
+    with mongo_server() as mongo_uri:
+        seed(mongo_uri, data)
+        server = start_server(mongo_uri)
+        try:
+            wait_until_ready(base_url)
+            routes = asyncio.run(run_scenarios(base_url, data))
+        finally:
+            server.terminate()
+            server.wait()
+
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    report = {
+        "commit": commit,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(
+            timespec="seconds"
+        ),
+        "cpus": available_cpus(),
+        "settings": {
+            "users": USERS,
+            "authors": AUTHORS,
+            "books": BOOKS,
+            "reviews": REVIEWS,
+            "workers": WORKERS,
+            "concurrency": CONCURRENCY,
+            "duration": DURATION,
+        },
+        "routes": routes,
+    }
+    output = os.getenv("BENCH_OUTPUT", f"benchmarks/results/e2e-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+    print_table(
+        "Throughput and latency (ms)",
+        {
+            route: {
+                name: result[name] for name in ("req/s", "failed", "p50", "p95", "p99")
+            }
+            for route, result in routes.items()
+        },
+        width=56,
+    )
+    print(f"Written to {output}")
+
+
+def compare(old_path: str, new_path: str):
+    with open(old_path) as file:
+        old = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+    if old["settings"] != new["settings"]:
+        print(f"Settings differ: {old['settings']} vs {new['settings']}")
+
+    def change(before: float, after: float) -> float:
+        return (after - before) / before * 100 if before else 0.0
+
+    rows = {}
+    for route, after in new["routes"].items():
+        before = old["routes"].get(route)
+        if before is None:
+            continue
+        rows[route] = {
+            "req/s": after["req/s"],
+            "req/s %": change(before["req/s"], after["req/s"]),
+            "p50": after["p50"],
+            "p50 %": change(before["p50"], after["p50"]),
+            "p99": after["p99"],
+            "p99 %": change(before["p99"], after["p99"]),
+        }
+    print_table(f"{old['commit']} -> {new['commit']}", rows, width=56)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["compare"]:
+        compare(*sys.argv[2:4])
+    else:
+        run()
@@ -0,0 +1,67 @@
+"""Compares payload size, encoding and decoding of a raw 100 item reviews page
+per negotiated media type.
+
+Run with: PYTHONPATH=books_reviewing python -m benchmarks.negotiation
+"""
+import datetime
+import json
+
+from odmantic import ObjectId
+
+from benchmarks.common import percentiles, print_table, time_calls
+from books_reviewing.responses import (
+    BINARY_CODECS,
+    BSON_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    dumps,
+)
+
+PAGE_SIZE = 100
+ITERATIONS = 2000
+
+
+def create_page() -> dict:
+    return {
+        "items": [
+            {
+                "id": ObjectId(),
+                "rating": i % 5 + 1,
+                "comment": f"Review number {i}",
+                "date": datetime.datetime.now(),
+                "book_id": ObjectId(),
+                "user_id": ObjectId(),
+            }
+            for i in range(PAGE_SIZE)
+        ],
+        "total": PAGE_SIZE * 10,
+        "page": 1,
+        "size": PAGE_SIZE,
+        "pages": 10,
+    }
+
+
+def main():
+    page = create_page()
+    codecs = {JSON_MEDIA_TYPE: (dumps, json.loads)}
+    codecs.update(
+        (media_type, BINARY_CODECS[media_type])
+        for media_type in (MSGPACK_MEDIA_TYPE, BSON_MEDIA_TYPE)
+        if media_type in BINARY_CODECS
+    )
+
+    encode_rows = {}
+    decode_rows = {}
+    for media_type, (encode, decode) in codecs.items():
+        body = encode(page)
+        name = f"{media_type} ({len(body)} B)"
+        encode_rows[name] = percentiles(time_calls(lambda: encode(page), ITERATIONS))
+        decode_rows[name] = percentiles(time_calls(lambda: decode(body), ITERATIONS))
+
+    print_table("Encode (ms)", encode_rows)
+    print()
+    print_table("Decode (ms)", decode_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Compares the validated and the trusted read paths per endpoint.
+
+"validated" replays the previous code path: the document is parsed into an
+Odmantic model, dumped into the output schema and FastAPI validates the result
+against the response model again. "trusted" goes through the current routers.
+
+Run with: PYTHONPATH=books_reviewing python -m benchmarks.read_paths
+"""
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi_pagination import Params, add_pagination
+from fastapi_pagination.links import Page
+from odmantic import ObjectId
+
+from benchmarks.common import percentiles, print_table, time_async_calls
+from books_reviewing.models import Author, Book, Review, User
+from books_reviewing.repositories.documents import from_mongo_document
+from books_reviewing.routers.authors import AuthorsServiceDep
+from books_reviewing.routers.authors import router as authors_router
+from books_reviewing.routers.books import BooksServiceDep
+from books_reviewing.routers.books import router as books_router
+from books_reviewing.routers.reviews import ReviewsServiceDep
+from books_reviewing.routers.reviews import router as reviews_router
+from books_reviewing.routers.users import UsersServiceDep
+from books_reviewing.routers.users import router as users_router
+from books_reviewing.schemas.authors import AuthorOutSchema
+from books_reviewing.schemas.books import BookOutSchema
+
+ITERATIONS = 2000
+PAGE_SIZE = 100
+
+book_document = {
+    "_id": ObjectId(),
+    "isbn": "9780306406157",
+    "title": "Pepa Pig 1",
+    "description": "The Realest BlockBluster Ever!!! " * 30,
+    "publication_date": datetime.datetime(2024, 1, 23, 21, 19, 18, 307000),
+    "author_id": ObjectId(),
+}
+author_document = {"_id": ObjectId(), "name": "PEPAA", "bio": "She is the best"}
+user_document = {
+    "_id": ObjectId(),
+    "name": "John Doe",
+    "email": "john@doe.com",
+    "birthday": datetime.datetime(1990, 10, 12),
+    "phone": "+389234323243",
+}
+review_document = {
+    "_id": ObjectId(),
+    "rating": 4,
+    "comment": "JQWEKLRJ QWoajwerio ajwero iEKLRJ QKLWEJLKQW " * 20,
+    "book_id": ObjectId(),
+    "user_id": ObjectId(),
+}
+
+
+class StubService:
+    async def get_one(self, object_id: ObjectId):
+        return self.one()
+
+    async def query(self, *args):
+        return self.page(), PAGE_SIZE * 10
+
+
+class StubBooksService(StubService):
+    def one(self):
+        return BookOutSchema.model_construct(
+            **from_mongo_document(dict(book_document)), average_rating=3.5
+        )
+
+    def one_validated(self):
+        book = Book.model_validate_doc(book_document)
+        return BookOutSchema(**book.model_dump(), average_rating=3.5)
+
+    def page(self):
+        return [Book.model_validate_doc(book_document) for _ in range(PAGE_SIZE)]
+
+
+class StubAuthorsService(StubService):
+    def one(self):
+        return AuthorOutSchema.model_construct(
+            **from_mongo_document(dict(author_document)), books_count=3
+        )
+
+    def one_validated(self):
+        author = Author.model_validate_doc(author_document)
+        return AuthorOutSchema(**author.model_dump(), books_count=3)
+
+
+class StubUsersService(StubService):
+    def one(self):
+        return User.model_validate_doc(user_document)
+
+
+class StubReviewsService(StubService):
+    def one(self):
+        return Review.model_validate_doc(review_document)
+
+    def page(self):
+        return [Review.model_validate_doc(review_document) for _ in range(PAGE_SIZE)]
+
+    async def query_documents(self, *args):
+        documents = [dict(review_document) for _ in range(PAGE_SIZE)]
+        return [from_mongo_document(document) for document in documents], PAGE_SIZE
+
+
+def create_validated_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/books/{book_id}")
+    async def get_book(
+        book_id: ObjectId, books_service: BooksServiceDep
+    ) -> BookOutSchema:
+        return books_service.one_validated()
+
+    @app.get("/authors/{author_id}")
+    async def get_author(
+        author_id: ObjectId, authors_service: AuthorsServiceDep
+    ) -> AuthorOutSchema:
+        return authors_service.one_validated()
+
+    @app.get("/users/{user_id}")
+    async def get_user(user_id: ObjectId, users_service: UsersServiceDep) -> User:
+        return await users_service.get_one(user_id)
+
+    @app.get("/reviews/{review_id}")
+    async def get_review(
+        review_id: ObjectId, reviews_service: ReviewsServiceDep
+    ) -> Review:
+        return await reviews_service.get_one(review_id)
+
+    @app.get("/books/")
+    async def query_books(
+        books_service: BooksServiceDep, page: int = None, size: int = None
+    ) -> Page[Book]:
+        items, total_count = await books_service.query()
+        params = Params().model_construct(page=page, size=size)
+        return Page.create(items=items, params=params, total=total_count)
+
+    @app.get("/reviews/")
+    async def query_reviews(
+        reviews_service: ReviewsServiceDep, page: int = None, size: int = None
+    ) -> Page[Review]:
+        items, total_count = await reviews_service.query()
+        params = Params().model_construct(page=page, size=size)
+        return Page.create(items=items, params=params, total=total_count)
+
+    add_pagination(app)
+    app.state.container = STUB_CONTAINER
+    return app
+
+
+def create_trusted_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(books_router, prefix="/books")
+    app.include_router(authors_router, prefix="/authors")
+    app.include_router(users_router, prefix="/users")
+    app.include_router(reviews_router, prefix="/reviews")
+    add_pagination(app)
+    app.state.container = STUB_CONTAINER
+    return app
+
+
+STUB_CONTAINER = SimpleNamespace(
+    books_service=StubBooksService(),
+    authors_service=StubAuthorsService(),
+    users_service=StubUsersService(),
+    reviews_service=StubReviewsService(),
+)
+
+
+async def main():
+    object_id = str(ObjectId())
+    endpoints = {
+        "GET /books/{id}": f"/books/{object_id}",
+        "GET /authors/{id}": f"/authors/{object_id}",
+        "GET /users/{id}": f"/users/{object_id}",
+        "GET /reviews/{id}": f"/reviews/{object_id}",
+        f"GET /books/?size={PAGE_SIZE}": f"/books/?size={PAGE_SIZE}",
+        f"GET /reviews/?size={PAGE_SIZE}": f"/reviews/?size={PAGE_SIZE}",
+    }
+    clients = {
+        name: httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+        )
+        for name, app in (
+            ("validated", create_validated_app()),
+            ("trusted", create_trusted_app()),
+        )
+    }
+
+    for endpoint, url in endpoints.items():
+        rows = {}
+        for name, client in clients.items():
+            assert (await client.get(url)).status_code == 200
+            rows[name] = percentiles(
+                await time_async_calls(lambda: client.get(url), ITERATIONS)
+            )
+        print_table(f"{endpoint} (ms)", rows)
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
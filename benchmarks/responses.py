@@ -0,0 +1,89 @@
+"""Compares response rendering of a 100 item books page.
+
+Run with: PYTHONPATH=books_reviewing python -m benchmarks.responses
+"""
+import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_pagination import add_pagination
+from odmantic import ObjectId
+from starlette.responses import JSONResponse
+
+from benchmarks.common import percentiles, print_table, time_calls
+from books_reviewing.dependencies import get_books_service
+from books_reviewing.models import Book
+from books_reviewing.responses import FastJSONResponse
+from books_reviewing.routers.books import router as books_router
+
+PAGE_SIZE = 100
+ITERATIONS = 500
+
+
+class StubBooksService:
+    def __init__(self, books: list[Book]):
+        self.books = books
+
+    async def query(self, *args):
+        return self.books, len(self.books) * 10
+
+
+def create_books() -> list[Book]:
+    return [
+        Book(
+            id=ObjectId(),
+            isbn="9780306406157",
+            title=f"Book number {i}",
+            description="A long description " * 50,
+            publication_date=datetime.datetime.now(),
+            author_id=ObjectId(),
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def create_books_app(books: list[Book]) -> FastAPI:
+    app = FastAPI()
+    app.include_router(books_router, prefix="/books")
+    app.dependency_overrides[get_books_service] = lambda: StubBooksService(books)
+    add_pagination(app)
+    return app
+
+
+def create_app(response_class: type[JSONResponse], content: dict) -> FastAPI:
+    # The books router returns pre-rendered responses, which bypass the
+    # default response class, so the page is served by a plain route instead.
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/books/")
+    async def get_books():
+        return content
+
+    return app
+
+
+def main():
+    books = create_books()
+    page = TestClient(create_books_app(books)).get(f"/books/?size={PAGE_SIZE}")
+    content = page.json()
+
+    render_rows = {}
+    request_rows = {}
+    for response_class in (JSONResponse, FastJSONResponse):
+        name = response_class.__name__
+        render_rows[name] = percentiles(
+            time_calls(lambda: response_class(content), ITERATIONS)
+        )
+        client = TestClient(create_app(response_class, content))
+        request_rows[name] = percentiles(
+            time_calls(lambda: client.get(f"/books/?size={PAGE_SIZE}"), ITERATIONS)
+        )
+
+    print(f"Payload: {len(page.content)} bytes, {PAGE_SIZE} items\n")
+    print_table("Render only (ms)", render_rows)
+    print()
+    print_table("Page returned by a route, end to end (ms)", request_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Profiles importing the application in fresh interpreters: import time,
+modules and threads alive after import, and whether seeding code or a
+database client were loaded. Also prints the slowest imports.
+
+Run with: PYTHONPATH=books_reviewing python -m benchmarks.startup
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+TOP_IMPORTS = 10
+
+PROBE = """
+import gc, json, sys, threading, time
+started = time.perf_counter()
+import books_reviewing.main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "modules": len(sys.modules),
+    "threads": threading.active_count(),
+    "duplicated_modules": sorted(
+        m for m in sys.modules if "books_reviewing." + m in sys.modules
+    ),
+    "seeder_loaded": any(m.endswith("database_seeder") for m in sys.modules),
+    "mongo_clients": sum(
+        type(o).__name__ == "AsyncIOMotorClient" for o in gc.get_objects()
+    ),
+}))
+"""
+
+
+def run_probe() -> tuple[dict, str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "SEED_DUMMY_DATABASE": "1"},
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_output: str) -> list[tuple[str, float]]:
+    """Application modules and third party packages imported directly."""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1 or name.strip().startswith("books_reviewing"):
+            imports.append((name.strip(), int(cumulative) / 1000))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]
+
+
+def main():
+    probes = []
+    importtime_output = ""
+    for _ in range(RUNS):
+        probe, importtime_output = run_probe()
+        probes.append(probe)
+
+    print(f"import books_reviewing.main, {RUNS} fresh interpreters")
+    print(
+        f"  import time p50:       {statistics.median(p['import_ms'] for p in probes):.1f} ms"
+    )
+    print(f"  modules loaded:        {probes[-1]['modules']}")
+    print(f"  threads after import:  {probes[-1]['threads']}")
+    print(f"  mongo clients:         {probes[-1]['mongo_clients']}")
+    print(f"  loaded twice:          {', '.join(probes[-1]['duplicated_modules'])}")
+    print(f"  seeder loaded:         {probes[-1]['seeder_loaded']}")
+    print()
+    print("Slowest imports (cumulative ms)")
+    for name, milliseconds in slowest_imports(importtime_output):
+        print(f"  {name:<50}{milliseconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
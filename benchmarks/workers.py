@@ -0,0 +1,134 @@
+"""Measures how throughput scales with the number of server workers.
+
+Each run starts the production runner with stub services on a local port,
+then LOAD_PROCESSES client processes keep CONCURRENCY requests in flight each
+for DURATION seconds against a single book and a 100 book page. The clients
+share the machine with the workers, so the numbers only scale while there are
+idle cores left.
+
+Run with: PYTHONPATH=books_reviewing python -m benchmarks.workers
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from odmantic import ObjectId
+
+from benchmarks.common import percentiles, print_table
+from benchmarks.read_paths import PAGE_SIZE, STUB_CONTAINER, create_trusted_app
+from books_reviewing.runner import available_cpus
+from books_reviewing.routers.health import router as health_router
+
+WORKER_COUNTS = [
+    int(count)
+    for count in os.getenv("BENCH_WORKERS", f"1,2,4,{available_cpus()}").split(",")
+]
+LOAD_PROCESSES = int(os.getenv("LOAD_PROCESSES", available_cpus()))
+CONCURRENCY = 32
+DURATION = 5
+PORT = 8099
+
+URLS = [f"/books/{ObjectId()}", f"/books/?size={PAGE_SIZE}"]
+
+
+def create_app() -> FastAPI:
+    app = create_trusted_app()
+    app.include_router(health_router)
+    app.state.container = SimpleNamespace(
+        **vars(STUB_CONTAINER), ready=True, status="ready", startup_error=None
+    )
+    return app
+
+
+async def load(base_url: str) -> tuple[int, int, list[float]]:
+    ok, failed, samples = 0, 0, []
+    deadline = time.perf_counter() + DURATION
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+
+        async def user(index: int):
+            nonlocal ok, failed
+            while time.perf_counter() < deadline:
+                url = URLS[index % len(URLS)]
+                index += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                except httpx.HTTPError:
+                    failed += 1
+                    continue
+                samples.append((time.perf_counter() - started) * 1000)
+                if response.status_code == 200:
+                    ok += 1
+                else:
+                    failed += 1
+
+        await asyncio.gather(*(user(index) for index in range(CONCURRENCY)))
+    return ok, failed, samples
+
+
+def load_process(base_url: str) -> tuple[int, int, list[float]]:
+    return asyncio.run(load(base_url))
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "from books_reviewing.runner import run; "
+            f"run('benchmarks.workers:create_app', factory=True, workers={workers}, "
+            f"port={PORT}, host='127.0.0.1', access_log=False, log_level='warning')",
+        ]
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/readyz").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("Server did not become ready")
+
+
+def main():
+    base_url = f"http://127.0.0.1:{PORT}"
+    print(
+        f"{available_cpus()} CPUs, {LOAD_PROCESSES} load processes x "
+        f"{CONCURRENCY} connections, {DURATION}s per run"
+    )
+    rows = {}
+    for workers in WORKER_COUNTS:
+        server = start_server(workers)
+        try:
+            wait_until_ready(base_url)
+            with ProcessPoolExecutor(LOAD_PROCESSES) as executor:
+                results = list(executor.map(load_process, [base_url] * LOAD_PROCESSES))
+        finally:
+            server.terminate()
+            server.wait()
+
+        ok = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
+        samples = [sample for result in results for sample in result[2]]
+        rows[f"{workers} workers"] = {
+            "req/s": ok / DURATION,
+            "failed": failed,
+            **percentiles(samples),
+        }
+    print_table("Throughput and latency (ms)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from books_reviewing.runner import run
+
+run()
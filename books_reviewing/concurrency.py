@@ -0,0 +1,30 @@
+import asyncio
+from typing import Any, Coroutine
+
+from books_reviewing.deadlines import remaining_seconds
+from books_reviewing.exceptions import DeadlineExceededException
+
+
+async def gather(*coroutines: Coroutine) -> list[Any]:
+    """Like asyncio.gather, but the first failure or the request deadline
+    cancels the remaining coroutines instead of leaving them running."""
+    try:
+        async with asyncio.timeout(remaining_seconds()), asyncio.TaskGroup() as group:
+            tasks = [group.create_task(coroutine) for coroutine in coroutines]
+    except BaseExceptionGroup as exception_group:
+        raise exception_group.exceptions[0] from None
+    except TimeoutError:
+        raise DeadlineExceededException(detail="Request deadline exceeded")
+    return [task.result() for task in tasks]
+
+
+async def gather_writes(*coroutines: Coroutine) -> list[Any]:
+    """Runs the coroutines to completion, then raises the first failure.
+    Unlike gather, neither a failure nor the request deadline cancels the
+    others halfway through a cascade of writes; each database call still
+    gives up on its own once the deadline has passed."""
+    results = await asyncio.gather(*coroutines, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
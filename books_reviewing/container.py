@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from odmantic import AIOEngine
+
+from books_reviewing.models import User, Author, Book, Review
+from books_reviewing.mongo import (
+    CommandMonitor,
+    PoolMonitor,
+    create_mongo_client,
+    prewarm_pool,
+)
+from books_reviewing.repositories.users import UsersRepository
+from books_reviewing.repositories.authors import AuthorsRepository
+from books_reviewing.repositories.books import BooksRepository
+from books_reviewing.repositories.reviews import ReviewsRepository
+from books_reviewing.services.users import UsersService
+from books_reviewing.services.authors import AuthorsService
+from books_reviewing.services.books import BooksService
+from books_reviewing.services.reviews import ReviewsService
+
+logger = logging.getLogger(__name__)
+
+
+class Container:
+    """Owns the Mongo client, repositories and services of one worker.
+
+    Nothing is created before it is first used, so importing the
+    application or building a container does not connect anywhere. Each
+    worker process builds its own container in the lifespan and is ready
+    to serve once start() has warmed the pool, created the indexes, seeded
+    the database when asked to and built the suggestion indexes."""
+
+    mongo_uri: str
+    database_name: str
+    pool_monitor: PoolMonitor
+    command_monitor: CommandMonitor
+    startup_profile: dict[str, float]
+    ready: bool
+    stopping: bool
+    startup_error: str | None
+
+    def __init__(self, mongo_uri: str = None, database_name: str = None):
+        self.mongo_uri = mongo_uri or os.getenv(
+            "MONGO_URI", "mongodb://localhost:27017/"
+        )
+        self.database_name = database_name or os.getenv("MONGO_DB", "book_reviews")
+        self.pool_monitor = PoolMonitor()
+        self.command_monitor = CommandMonitor()
+        self.startup_profile = {}
+        self.ready = False
+        self.stopping = False
+        self.startup_error = None
+        self.__database_seeder = None
+        self.__seed_membership = None
+        self.__mongo_client = None
+        self.__mongo_engine = None
+        self.__services = None
+
+    @property
+    def mongo_client(self) -> AsyncIOMotorClient:
+        if self.__mongo_client is None:
+            self.__mongo_client = create_mongo_client(
+                self.mongo_uri, self.pool_monitor, self.command_monitor
+            )
+        return self.__mongo_client
+
+    @property
+    def mongo_engine(self) -> AIOEngine:
+        if self.__mongo_engine is None:
+            self.__mongo_engine = AIOEngine(
+                client=self.mongo_client, database=self.database_name
+            )
+        return self.__mongo_engine
+
+    @property
+    def users_service(self) -> UsersService:
+        return self.__build_services()[0]
+
+    @property
+    def authors_service(self) -> AuthorsService:
+        return self.__build_services()[1]
+
+    @property
+    def books_service(self) -> BooksService:
+        return self.__build_services()[2]
+
+    @property
+    def reviews_service(self) -> ReviewsService:
+        return self.__build_services()[3]
+
+    @property
+    def status(self) -> str:
+        if self.startup_error:
+            return "failed"
+        if self.stopping:
+            return "stopping"
+        return "ready" if self.ready else "starting"
+
+    async def start(self, seed: bool = False):
+        try:
+            await self.__profile("prewarm_pool", prewarm_pool(self.mongo_client))
+            await self.__profile(
+                "configure_database",
+                self.mongo_engine.configure_database([User, Author, Book, Review]),
+            )
+            if seed:
+                from books_reviewing.database_seeder import DatabaseSeeder
+
+                database_seeder = DatabaseSeeder(
+                    self.users_service,
+                    self.authors_service,
+                    self.books_service,
+                    self.reviews_service,
+                    self.mongo_client,
+                    self.database_name,
+                )
+                await self.__profile("seed_database", database_seeder.seed_once())
+                self.__database_seeder = database_seeder
+                self.__seed_membership = asyncio.create_task(
+                    database_seeder.keep_membership()
+                )
+            # Built after seeding so the suggestions include the seeded data.
+            await self.__profile(
+                "build_suggestion_indexes", self.build_suggestion_indexes()
+            )
+        except Exception as exception:
+            self.startup_error = f"{type(exception).__name__}: {exception}"
+            raise
+        self.ready = True
+
+    async def build_suggestion_indexes(self):
+        await asyncio.gather(
+            self.authors_service.build_names_index(),
+            self.books_service.build_titles_index(),
+        )
+
+    async def refresh_suggestion_indexes(self, interval: float):
+        """Rebuilds the suggestion indexes every interval seconds. Each
+        worker only updates its indexes with its own writes, so this is how
+        the writes of other workers and replicas show up in suggestions."""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.ready:
+                continue
+            try:
+                await self.build_suggestion_indexes()
+            except Exception:
+                logger.warning(
+                    "Rebuilding the suggestion indexes failed", exc_info=True
+                )
+
+    def drain(self):
+        self.ready = False
+        self.stopping = True
+
+    async def stop(self):
+        self.drain()
+        if self.__database_seeder is not None:
+            self.__seed_membership.cancel()
+            await asyncio.gather(self.__seed_membership, return_exceptions=True)
+            await self.__database_seeder.release()
+            self.__database_seeder = None
+        self.close()
+
+    def close(self):
+        if self.__mongo_client is not None:
+            self.__mongo_client.close()
+        self.__mongo_client = None
+        self.__mongo_engine = None
+        self.__services = None
+
+    async def __profile(self, phase: str, awaitable):
+        started = time.perf_counter()
+        await awaitable
+        self.startup_profile[phase] = (time.perf_counter() - started) * 1000
+
+    def __build_services(
+        self,
+    ) -> tuple[UsersService, AuthorsService, BooksService, ReviewsService]:
+        # The services reference each other, so they are built together.
+        if self.__services is None:
+            users_service = UsersService(UsersRepository(self.mongo_engine))
+            authors_service = AuthorsService(AuthorsRepository(self.mongo_engine))
+            books_service = BooksService(
+                BooksRepository(self.mongo_engine), authors_service
+            )
+            reviews_service = ReviewsService(
+                ReviewsRepository(self.mongo_engine), books_service, users_service
+            )
+
+            books_service.reviews_service = reviews_service
+            authors_service.books_service = books_service
+            users_service.reviews_service = reviews_service
+
+            self.__services = (
+                users_service,
+                authors_service,
+                books_service,
+                reviews_service,
+            )
+        return self.__services
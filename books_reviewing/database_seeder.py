@@ -1,7 +1,10 @@
+import asyncio
 import datetime
 import os
+import socket
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
 
 from books_reviewing.services.users import UsersService
 from books_reviewing.services.authors import AuthorsService
@@ -12,6 +15,9 @@ from books_reviewing.schemas.books import BaseBookSchema
 from books_reviewing.schemas.reviews import BaseReviewSchema
 from books_reviewing.schemas.users import BaseUserSchema
 
+SEED_LOCK_COLLECTION = "seed_locks"
+SEED_LOCK_ID = "dummy_data"
+
 
 class DatabaseSeeder:
     users_service: UsersService
@@ -19,6 +25,9 @@ class DatabaseSeeder:
     books_service: BooksService
     reviews_service: ReviewsService
     motor_client: AsyncIOMotorClient
+    database_name: str
+    owner: str
+    membership_seconds: float
 
     def __init__(
         self,
@@ -27,12 +36,155 @@ class DatabaseSeeder:
         books_service: BooksService,
         reviews_service: ReviewsService,
         mongo_client: AsyncIOMotorClient,
+        database_name: str = None,
     ):
         self.users_service = users_service
         self.authors_service = authors_service
         self.books_service = books_service
         self.reviews_service = reviews_service
         self.motor_client = mongo_client
+        self.database_name = database_name or os.getenv("MONGO_DB", "book_reviews")
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.membership_seconds = 60
+
+    @property
+    def locks(self) -> AsyncIOMotorCollection:
+        return self.motor_client[self.database_name][SEED_LOCK_COLLECTION]
+
+    async def seed_once(self, lease_seconds: float = 60, poll_interval: float = 0.5):
+        """Seeds the database unless another worker already did, and registers
+        this worker as a user of the seeded data.
+
+        A lock document elects one worker to seed while the others wait for
+        it. The seeding worker renews its lease until it is done; if it dies
+        first, the lease expires and another worker clears the partial data
+        and seeds again. Users of the data are listed in the lock with an
+        expiry that keep_membership() pushes back."""
+        while True:
+            now = datetime.datetime.now(datetime.UTC)
+            expires_at = now + datetime.timedelta(seconds=lease_seconds)
+            try:
+                await self.locks.insert_one(
+                    {
+                        "_id": SEED_LOCK_ID,
+                        "state": "seeding",
+                        "owner": self.owner,
+                        "expires_at": expires_at,
+                        "workers": [self.membership(now)],
+                    }
+                )
+                break
+            except DuplicateKeyError:
+                pass
+
+            if await self.locks.find_one_and_update(
+                {"_id": SEED_LOCK_ID, "state": "seeded"},
+                {"$push": {"workers": self.membership(now)}},
+            ):
+                return
+
+            if await self.locks.find_one_and_update(
+                {"_id": SEED_LOCK_ID, "expires_at": {"$lt": now}},
+                {
+                    "$set": {
+                        "state": "seeding",
+                        "owner": self.owner,
+                        "expires_at": expires_at,
+                        "workers": [self.membership(now)],
+                    }
+                },
+            ):
+                await self.clear_database()
+                break
+
+            await asyncio.sleep(poll_interval)
+
+        seeding = asyncio.create_task(self.seed_database())
+        renewal = asyncio.create_task(self.renew_lease(lease_seconds))
+        try:
+            await asyncio.wait({seeding, renewal}, return_when=asyncio.FIRST_COMPLETED)
+            if not seeding.done():
+                raise RuntimeError("Another worker took over the seed lease")
+            seeding.result()
+        finally:
+            renewal.cancel()
+            seeding.cancel()
+        await self.locks.update_one(
+            {"_id": SEED_LOCK_ID, "owner": self.owner},
+            {"$set": {"state": "seeded"}, "$unset": {"expires_at": ""}},
+        )
+
+    def membership(self, now: datetime.datetime) -> dict:
+        return {
+            "owner": self.owner,
+            "expires_at": now + datetime.timedelta(seconds=self.membership_seconds),
+        }
+
+    async def renew_lease(self, lease_seconds: float):
+        """Pushes back the seeding lease and this worker's membership every
+        third of the lease, until the lease turns out to be lost."""
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            now = datetime.datetime.now(datetime.UTC)
+            result = await self.locks.update_one(
+                {"_id": SEED_LOCK_ID, "state": "seeding", "owner": self.owner},
+                {
+                    "$set": {
+                        "expires_at": now + datetime.timedelta(seconds=lease_seconds),
+                        "workers": [self.membership(now)],
+                    }
+                },
+            )
+            if result.matched_count == 0:
+                return
+
+    async def keep_membership(self):
+        """Renews this worker's membership every third of its lifetime, so
+        the data outlives this worker's siblings only while it is alive."""
+        while True:
+            await asyncio.sleep(self.membership_seconds / 3)
+            await self.heartbeat()
+
+    async def heartbeat(self):
+        now = datetime.datetime.now(datetime.UTC)
+        # Workers killed before they could release are dropped here.
+        await self.locks.update_one(
+            {"_id": SEED_LOCK_ID},
+            {"$pull": {"workers": {"expires_at": {"$lt": now}}}},
+        )
+        result = await self.locks.update_one(
+            {"_id": SEED_LOCK_ID, "workers.owner": self.owner},
+            {"$set": {"workers.$.expires_at": self.membership(now)["expires_at"]}},
+        )
+        if result.matched_count == 0:
+            await self.locks.update_one(
+                {"_id": SEED_LOCK_ID, "state": "seeded"},
+                {"$push": {"workers": self.membership(now)}},
+            )
+
+    async def release(self, lease_seconds: float = 60):
+        """Unregisters this worker; the last live one to leave clears the
+        data."""
+        await self.locks.update_one(
+            {"_id": SEED_LOCK_ID}, {"$pull": {"workers": {"owner": self.owner}}}
+        )
+        now = datetime.datetime.now(datetime.UTC)
+        if await self.locks.find_one_and_update(
+            {
+                "_id": SEED_LOCK_ID,
+                "state": "seeded",
+                "workers": {"$not": {"$elemMatch": {"expires_at": {"$gt": now}}}},
+            },
+            {
+                "$set": {
+                    "state": "clearing",
+                    "owner": self.owner,
+                    "expires_at": now + datetime.timedelta(seconds=lease_seconds),
+                }
+            },
+        ):
+            await self.clear_database()
+            await self.locks.delete_one({"_id": SEED_LOCK_ID, "owner": self.owner})
 
     async def seed_database(self):
         users = {
@@ -81,28 +233,28 @@ class DatabaseSeeder:
 
         books = {
             "pepa_pig_1": BaseBookSchema(
-                isbn="1111111111",
+                isbn="9780306406157",
                 title="Pepa Pig 1",
                 description="The Realest BlockBluster Ever!!!",
                 publication_date=datetime.datetime.now(),
                 author_id=authors["pepa"].id,
             ),
             "pepa_pig_2": BaseBookSchema(
-                isbn="1111111121",
+                isbn="9780140449136",
                 title="Pepa Pig 2",
                 description="The Realest BlockBluster Ever!!!",
                 publication_date=datetime.datetime.now(),
                 author_id=authors["pepa"].id,
             ),
             "pepa_pig_3": BaseBookSchema(
-                isbn="111111113331",
+                isbn="9781861972712",
                 title="Pepa Pig 3",
                 description="The Realest BlockBluster Ever!!!",
                 publication_date=datetime.datetime.now(),
                 author_id=authors["pepa"].id,
             ),
             "ceca_1": BaseBookSchema(
-                isbn="111111113334",
+                isbn="9780804429573",
                 title="Ceca is trying",
                 description="Ceca is trying to come back .........",
                 publication_date=datetime.datetime.now(),
@@ -171,8 +323,12 @@ class DatabaseSeeder:
         ]
 
     async def clear_database(self):
-        db = self.motor_client[os.getenv("MONGO_DB", "book_reviews")]
-        db.drop_collection("users")
-        db.drop_collection("authors")
-        db.drop_collection("books")
-        db.drop_collection("reviews")
+        # Documents are deleted rather than collections dropped, so the indexes
+        # other workers created at startup survive.
+        db = self.motor_client[self.database_name]
+        await asyncio.gather(
+            db["users"].delete_many({}),
+            db["authors"].delete_many({}),
+            db["books"].delete_many({}),
+            db["reviews"].delete_many({}),
+        )
@@ -0,0 +1,49 @@
+import contextlib
+import os
+import time
+from contextvars import ContextVar
+from typing import Annotated
+
+from fastapi import Header
+
+DEFAULT_BUDGET_MS = int(os.getenv("REQUEST_BUDGET_MS", 5000))
+MAX_BUDGET_MS = int(os.getenv("REQUEST_MAX_BUDGET_MS", 30000))
+
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+def remaining_seconds() -> float | None:
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextlib.contextmanager
+def separate_deadline(budget_ms: int = DEFAULT_BUDGET_MS):
+    """Gives the calls made inside a budget of their own, for compensating
+    writes that must still run after the request's deadline has passed."""
+    token = request_deadline.set(time.monotonic() + budget_ms / 1000)
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
+class RequestDeadline:
+    """Dependency that starts the time budget of a request. Callers may ask
+    for a different budget with the X-Request-Timeout-Ms header, capped at
+    MAX_BUDGET_MS."""
+
+    budget_ms: int
+
+    def __init__(self, budget_ms: int = DEFAULT_BUDGET_MS):
+        self.budget_ms = budget_ms
+
+    async def __call__(
+        self, x_request_timeout_ms: Annotated[int | None, Header(ge=1)] = None
+    ):
+        budget_ms = min(x_request_timeout_ms or self.budget_ms, MAX_BUDGET_MS)
+        request_deadline.set(time.monotonic() + budget_ms / 1000)
@@ -1,51 +1,89 @@
 import os
+import re
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from odmantic import AIOEngine
+from fastapi import Request
 
-from database_seeder import DatabaseSeeder
-from repositories.users import UsersRepository
-from repositories.authors import AuthorsRepository
-from repositories.books import BooksRepository
-from repositories.reviews import ReviewsRepository
+from books_reviewing.container import Container
+from books_reviewing.middleware.admission import (
+    AdmissionController,
+    admission_class_from_env,
+)
+from books_reviewing.mongo import CommandMonitor, PoolMonitor
+from books_reviewing.profiling import Profiler, profiler_from_env
 from books_reviewing.services.users import UsersService
 from books_reviewing.services.authors import AuthorsService
 from books_reviewing.services.books import BooksService
 from books_reviewing.services.reviews import ReviewsService
 
-mongo_client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-mongo_engine = AIOEngine(
-    client=mongo_client, database=os.getenv("MONGO_DB", "book_reviews")
-)
+LISTING_PATH = re.compile(r"/(users|authors|books|reviews)/(search|export)?$")
 
-users_service = UsersService(UsersRepository(mongo_engine))
-authors_service = AuthorsService(AuthorsRepository(mongo_engine))
-books_service = BooksService(BooksRepository(mongo_engine), authors_service)
-reviews_service = ReviewsService(
-    ReviewsRepository(mongo_engine), books_service, users_service
+admission_controller = AdmissionController(
+    [
+        admission_class_from_env(
+            "cascade",
+            concurrency=8,
+            queue_size=16,
+            match=lambda method, path: method == "DELETE" or "/merge-into/" in path,
+        ),
+        admission_class_from_env(
+            "listing",
+            concurrency=32,
+            queue_size=64,
+            match=lambda method, path: method == "GET" and LISTING_PATH.search(path),
+        ),
+        admission_class_from_env(
+            "write",
+            concurrency=64,
+            queue_size=128,
+            match=lambda method, path: method in ("POST", "PATCH", "PUT"),
+        ),
+        admission_class_from_env("read", concurrency=256, queue_size=512),
+    ],
+    queue_timeout=int(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", 1000)) / 1000,
+    retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", 1)),
+    excluded_paths=r"/monitoring/|/(healthz|readyz|metrics)$",
 )
 
-books_service.reviews_service = reviews_service
-authors_service.books_service = books_service
-users_service.reviews_service = reviews_service
+profiler = profiler_from_env()
+
+monitoring_token = os.getenv("MONITORING_TOKEN")
+
+
+async def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+async def get_users_service(request: Request) -> UsersService:
+    return request.app.state.container.users_service
+
+
+async def get_authors_service(request: Request) -> AuthorsService:
+    return request.app.state.container.authors_service
+
+
+async def get_books_service(request: Request) -> BooksService:
+    return request.app.state.container.books_service
+
+
+async def get_reviews_service(request: Request) -> ReviewsService:
+    return request.app.state.container.reviews_service
+
 
-if os.getenv("SEED_DUMMY_DATABASE", 1) == "1":
-    database_seeder = DatabaseSeeder(
-        users_service, authors_service, books_service, reviews_service, mongo_client
-    )
+async def get_pool_monitor(request: Request) -> PoolMonitor:
+    return request.app.state.container.pool_monitor
 
 
-def get_users_service() -> UsersService:
-    return users_service
+async def get_command_monitor(request: Request) -> CommandMonitor:
+    return request.app.state.container.command_monitor
 
 
-def get_authors_service() -> AuthorsService:
-    return authors_service
+async def get_admission_controller() -> AdmissionController:
+    return admission_controller
 
 
-def get_books_service() -> BooksService:
-    return books_service
+async def get_profiler() -> Profiler:
+    return profiler
 
 
-def get_reviews_service() -> ReviewsService:
-    return reviews_service
+async def get_monitoring_token() -> str | None:
+    return monitoring_token
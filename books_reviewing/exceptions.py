@@ -1,6 +1,13 @@
 import inspect
+import time
 
+import pymongo
 from decorator import decorate
+from odmantic.exceptions import DuplicateKeyError
+from pymongo.errors import DuplicateKeyError as DriverDuplicateKeyError, PyMongoError
+
+from books_reviewing.deadlines import remaining_seconds
+from books_reviewing.instrumentation import RepositoryCall, notify, observers
 
 
 class BaseServiceException(Exception):
@@ -14,16 +21,66 @@ class ObjectNotFoundException(BaseServiceException):
     pass
 
 
+class ConflictException(BaseServiceException):
+    pass
+
+
+class DeadlineExceededException(BaseServiceException):
+    pass
+
+
 class DatabaseException(Exception):
     pass
 
 
-async def _database_exception_wrapper(func, *args, **kwargs):
+async def _call_database(func, remaining: float | None, args, kwargs):
     try:
-        return await func(*args, **kwargs)
+        if remaining is None:
+            return await func(*args, **kwargs)
+        with pymongo.timeout(remaining):
+            return await func(*args, **kwargs)
+    except (DuplicateKeyError, DriverDuplicateKeyError):
+        raise ConflictException(
+            detail="An object with the same unique attributes already exists"
+        )
+    except PyMongoError as e:
+        if e.timeout and remaining is not None:
+            raise DeadlineExceededException(detail="Request deadline exceeded")
+        raise DatabaseException(e)
     except Exception as e:
         raise DatabaseException(e)
 
 
+async def _database_exception_wrapper(func, *args, **kwargs):
+    remaining = remaining_seconds()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededException(detail="Request deadline exceeded")
+    if not observers:
+        return await _call_database(func, remaining, args, kwargs)
+
+    started = time.perf_counter()
+    try:
+        result = await _call_database(func, remaining, args, kwargs)
+    except Exception as exception:
+        # Observers get the driver error, not the one it was mapped to.
+        notify(
+            RepositoryCall(
+                func,
+                args,
+                kwargs,
+                time.perf_counter() - started,
+                None,
+                exception.__context__ or exception,
+            )
+        )
+        raise
+    notify(
+        RepositoryCall(func, args, kwargs, time.perf_counter() - started, result, None)
+    )
+    return result
+
+
 def database_exception_wrapper(func):
-    return decorate(func, _database_exception_wrapper)
+    # kwsyntax passes the arguments through as given instead of binding them
+    # to the signature on every call, which cost more than the call overhead.
+    return decorate(func, _database_exception_wrapper, kwsyntax=True)
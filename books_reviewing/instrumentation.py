@@ -0,0 +1,154 @@
+import functools
+import inspect
+import logging
+import random
+from enum import Enum
+from typing import Callable
+
+from odmantic import Model, ObjectId
+
+# Parameters whose string values are field names rather than user data.
+SHAPE_VISIBLE_STRINGS = {"sort", "sort_direction"}
+
+
+@functools.cache
+def call_labels(func) -> tuple[str, str]:
+    """("BooksRepository", "query") for BooksRepository.query."""
+    repository, _, method = func.__qualname__.rpartition(".")
+    return repository, method
+
+
+@functools.cache
+def call_signature(func) -> inspect.Signature:
+    return inspect.signature(func)
+
+
+def value_shape(value, visible: bool = False):
+    """The structure of a value without the user data in it: dict keys are
+    kept, strings and ids are replaced by their type."""
+    match value:
+        case None | bool() | int() | float():
+            return value
+        case Enum():
+            return value.value
+        case str():
+            return value if visible else "str"
+        case dict():
+            return {key: value_shape(item) for key, item in value.items()}
+        case list() | tuple() | set():
+            return [value_shape(next(iter(value)))] if value else []
+        case ObjectId():
+            return "ObjectId"
+        case Model():
+            return type(value).__name__
+    return type(value).__name__
+
+
+def result_size(result) -> int | None:
+    match result:
+        case None:
+            return 0
+        case (list() as items, int() | None):
+            return len(items)
+        case list():
+            return len(result)
+        case Model() | dict():
+            return 1
+    return None
+
+
+class RepositoryCall:
+    __slots__ = ("func", "args", "kwargs", "duration", "result", "error")
+
+    def __init__(self, func, args, kwargs, duration, result, error):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.duration = duration
+        self.result = result
+        self.error = error
+
+    @property
+    def labels(self) -> tuple[str, str]:
+        return call_labels(self.func)
+
+    @property
+    def result_size(self) -> int | None:
+        return result_size(self.result)
+
+    @property
+    def error_class(self) -> str:
+        return type(self.error).__name__ if self.error else "none"
+
+    def shape(self) -> dict:
+        """The filter, sort and paging arguments of the call, with the values
+        that come from users masked."""
+        arguments = call_signature(self.func).bind_partial(*self.args, **self.kwargs)
+        return {
+            name: value_shape(value, name in SHAPE_VISIBLE_STRINGS)
+            for name, value in arguments.arguments.items()
+            if name != "self"
+        }
+
+
+# Observers are called after every repository call. With none registered the
+# wrapper skips timing altogether.
+observers: list[Callable[[RepositoryCall], None]] = []
+
+
+def add_observer(observer: Callable[[RepositoryCall], None]):
+    observers.append(observer)
+
+
+def remove_observer(observer: Callable[[RepositoryCall], None]):
+    observers.remove(observer)
+
+
+def notify(call: RepositoryCall):
+    for observer in observers:
+        observer(call)
+
+
+class SlowQueryLog:
+    """Logs a sample of the repository calls slower than threshold_ms with
+    their duration, result size, error class and argument shape."""
+
+    threshold: float
+    sample_rate: float
+    logger: logging.Logger
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        sample_rate: float = 1.0,
+        logger: logging.Logger = None,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.logger = logger or logging.getLogger("books_reviewing.slow_queries")
+
+    def __call__(self, call: RepositoryCall):
+        if call.duration < self.threshold:
+            return
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        repository, method = call.labels
+        shape = call.shape()
+        self.logger.warning(
+            "Slow repository call %s.%s took %.1f ms, result size %s, error %s, "
+            "arguments %s",
+            repository,
+            method,
+            call.duration * 1000,
+            call.result_size,
+            call.error_class,
+            shape,
+            extra={
+                "repository": repository,
+                "method": method,
+                "duration_ms": round(call.duration * 1000, 3),
+                "result_size": call.result_size,
+                "error_class": call.error_class,
+                "shape": shape,
+            },
+        )
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from books_reviewing.metrics import event_loop_lag, event_loop_stalls
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task that sleeps for
+    interval seconds; anything beyond the interval is time the loop spent
+    running something else without yielding.
+
+    With capture_stacks, a watchdog thread also checks that the probe keeps
+    running. When the loop has not run it for threshold seconds, the
+    watchdog logs the loop thread's stack while it is still stuck, which
+    points at the blocking call."""
+
+    interval: float
+    threshold: float
+    capture_stacks: bool
+    logger: logging.Logger
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float = 0.1,
+        capture_stacks: bool = False,
+        logger: logging.Logger = None,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.capture_stacks = capture_stacks
+        self.logger = logger or logging.getLogger("books_reviewing.loop_monitor")
+        self.heartbeat = time.monotonic()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        stopped = threading.Event()
+        if self.capture_stacks:
+            threading.Thread(
+                target=self.watch,
+                args=(threading.get_ident(), stopped),
+                name="loop-watchdog",
+                daemon=True,
+            ).start()
+        try:
+            while True:
+                self.heartbeat = time.monotonic()
+                scheduled = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                self.observe(loop.time() - scheduled)
+        finally:
+            stopped.set()
+
+    def observe(self, lag: float):
+        lag = max(lag, 0.0)
+        event_loop_lag.observe((), lag)
+        if lag >= self.threshold:
+            event_loop_stalls.inc()
+
+    def watch(self, thread_id: int, stopped: threading.Event):
+        reported = None
+        while not stopped.wait(self.threshold / 2):
+            heartbeat = self.heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or heartbeat == reported:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                return
+            reported = heartbeat
+            stack = "".join(traceback.format_stack(frame))
+            self.logger.warning(
+                "Event loop blocked for %.0f ms so far",
+                stalled * 1000,
+                extra={"blocked_ms": round(stalled * 1000, 1), "stack": stack},
+            )
@@ -1,79 +1,238 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
 
-import uvicorn as uvicorn
 from fastapi import FastAPI, Request
-from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi_pagination import add_pagination
 from starlette.background import BackgroundTask
-from starlette.responses import JSONResponse
 from starlette.status import (
     HTTP_422_UNPROCESSABLE_ENTITY,
     HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
     HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_504_GATEWAY_TIMEOUT,
 )
 
-from exceptions import ObjectNotFoundException, DatabaseException
-
+from books_reviewing.container import Container
+from books_reviewing.dependencies import admission_controller, profiler
+from books_reviewing.exceptions import (
+    ObjectNotFoundException,
+    ConflictException,
+    DeadlineExceededException,
+    DatabaseException,
+)
+from books_reviewing.middleware.admission import AdmissionMiddleware
+from books_reviewing.instrumentation import SlowQueryLog, add_observer
+from books_reviewing.loop_monitor import LoopLagMonitor
+from books_reviewing.metrics import (
+    observe_repository_call,
+    registry,
+    runtime_collector,
+    write_snapshots,
+)
+from books_reviewing.middleware.compression import CompressionMiddleware
+from books_reviewing.middleware.metrics import MetricsMiddleware
+from books_reviewing.middleware.profiling import ProfilingMiddleware
+from books_reviewing.middleware.rate_limit import (
+    RateLimit,
+    RateLimiter,
+    RateLimitMiddleware,
+    client_key,
+)
+from books_reviewing.middleware.request_id import RequestIdMiddleware
+from books_reviewing.middleware.tracing import TracingMiddleware
+from books_reviewing.responses import (
+    FastJSONResponse,
+    NegotiatedResponse,
+    logger as responses_logger,
+)
 from books_reviewing.routers.users import router as users_router
 from books_reviewing.routers.authors import router as authors_router
 from books_reviewing.routers.books import router as books_router
 from books_reviewing.routers.reviews import router as reviews_router
-
-file_handler = logging.FileHandler("../errors.log")
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
+from books_reviewing.routers.monitoring import router as monitoring_router
+from books_reviewing.routers.health import router as health_router
+from books_reviewing.routers.metrics import router as metrics_router
+from books_reviewing.structured_logging import (
+    configure_logging,
+    log_file_path,
+    stop_logging,
+)
+from books_reviewing.tracing import trace_repository_call, tracer_from_env
 
 logger = logging.getLogger(__name__)
-logger.addHandler(file_handler)
-logger.addHandler(logging.StreamHandler())
 logger.setLevel(logging.ERROR)
+loggers = [logger, responses_logger]
+
+if os.getenv("REPOSITORY_METRICS", "1") == "1":
+    add_observer(observe_repository_call)
+if os.getenv("SLOW_QUERY_MS", "200") != "0":
+    slow_query_log = SlowQueryLog(
+        float(os.getenv("SLOW_QUERY_MS", 200)),
+        float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1)),
+    )
+    slow_query_log.logger.setLevel(logging.WARNING)
+    loggers.append(slow_query_log.logger)
+    add_observer(slow_query_log)
+loop_monitor = None
+if os.getenv("LOOP_LAG_INTERVAL_MS", "100") != "0":
+    loop_monitor = LoopLagMonitor(
+        float(os.getenv("LOOP_LAG_INTERVAL_MS", 100)) / 1000,
+        float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 100)) / 1000,
+        capture_stacks=os.getenv("LOOP_WATCHDOG", "0") == "1",
+    )
+    loop_monitor.logger.setLevel(logging.WARNING)
+    loggers.append(loop_monitor.logger)
+
+tracer = tracer_from_env()
+if tracer.enabled:
+    add_observer(trace_repository_call)
+
+
+def log_startup_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error("Worker startup failed", exc_info=task.exception())
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    if os.getenv("SEED_DUMMY_DATABASE", 1) == "1":
-        from dependencies import database_seeder
+    # Several workers log to stderr only, unless LOG_FILE asks for a file each.
+    workers = int(os.getenv("WEB_CONCURRENCY") or 1)
+    log_listener = configure_logging(
+        loggers,
+        log_file_path(
+            os.getenv("LOG_FILE", "../errors.log" if workers <= 1 else ""), workers
+        ),
+        max_bytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+        backup_count=int(os.getenv("LOG_BACKUP_COUNT", 5)),
+        repeat_window=float(os.getenv("LOG_REPEAT_WINDOW", 60)),
+        repeat_burst=int(os.getenv("LOG_REPEAT_BURST", 10)),
+    )
+    # The worker accepts connections right away so /healthz answers, and
+    # warms up in the background; /readyz reports when it is done.
+    container = Container()
+    app.state.container = container
+    startup = asyncio.create_task(
+        container.start(seed=os.getenv("SEED_DUMMY_DATABASE", 1) == "1")
+    )
+    startup.add_done_callback(log_startup_failure)
+    background_tasks = [startup]
+    suggest_refresh_interval = float(os.getenv("SUGGEST_REFRESH_INTERVAL", 60))
+    if suggest_refresh_interval > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                container.refresh_suggestion_indexes(suggest_refresh_interval)
+            )
+        )
+    if loop_monitor is not None:
+        background_tasks.append(asyncio.create_task(loop_monitor.run()))
+    if registry.directory:
+        interval = float(os.getenv("METRICS_WRITE_INTERVAL", 5))
+        registry.stale_after = 3 * interval
+        background_tasks.append(
+            asyncio.create_task(write_snapshots(registry, interval))
+        )
 
-        await database_seeder.seed_database()
-        yield
-        await database_seeder.clear_database()
     yield
 
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await container.stop()
+    registry.remove_snapshot()
+    tracer.exporter.shutdown()
+    stop_logging(loggers, log_listener)
+
 
-app = FastAPI(root_path="/api/v1", lifespan=lifespan)
+app = FastAPI(
+    root_path="/api/v1", lifespan=lifespan, default_response_class=NegotiatedResponse
+)
 
 add_pagination(app)
 
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 500)),
+    levels={
+        "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+        "br": int(os.getenv("COMPRESSION_BROTLI_LEVEL", 1)),
+        "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3)),
+    },
+)
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
 app.include_router(users_router, tags=["Users"], prefix="/users")
 app.include_router(authors_router, tags=["Authors"], prefix="/authors")
 app.include_router(books_router, tags=["Books"], prefix="/books")
 app.include_router(reviews_router, tags=["Reviews"], prefix="/reviews")
+app.include_router(monitoring_router, tags=["Monitoring"], prefix="/monitoring")
+app.include_router(health_router, tags=["Health"])
+app.include_router(metrics_router, tags=["Monitoring"])
+
+rate_limiter = RateLimiter(
+    {
+        "/users": RateLimit(requests=600, period=60, burst=200),
+        "/authors": RateLimit(requests=600, period=60, burst=200),
+        "/books": RateLimit(requests=300, period=60, burst=100),
+        "/reviews": RateLimit(requests=300, period=60, burst=100),
+    },
+    key=client_key(
+        os.getenv("RATE_LIMIT_KEY_HEADER"),
+        frozenset(
+            address.strip()
+            for address in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",")
+            if address.strip()
+        ),
+    ),
+)
+if os.getenv("RATE_LIMIT", "1") == "1":
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+app.add_middleware(MetricsMiddleware)
+if tracer.enabled:
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+app.add_middleware(RequestIdMiddleware)
+registry.add_collector(
+    runtime_collector(
+        lambda: getattr(app.state, "container", None),
+        admission_controller,
+        rate_limiter,
+    )
+)
 
 
 def log_errors(
-    exception: RequestValidationError | ObjectNotFoundException | DatabaseException,
+    exception: RequestValidationError
+    | ObjectNotFoundException
+    | ConflictException
+    | DeadlineExceededException
+    | DatabaseException,
+    status_code: int,
 ):
+    extra = {"status_code": status_code}
     match exception:
         case RequestValidationError():
-            logger.error(exception.errors())
-        case ObjectNotFoundException():
-            logger.error(exception.detail)
+            logger.error(exception.errors(), extra=extra)
+        case ObjectNotFoundException() | ConflictException() | DeadlineExceededException():
+            logger.error(exception.detail, extra=extra)
         case DatabaseException():
-            logger.error("Database error", exc_info=exception)
+            logger.error("Database error", exc_info=exception, extra=extra)
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
     request: Request, exception: RequestValidationError
 ):
-    background_task = BackgroundTask(log_errors, exception)
+    background_task = BackgroundTask(
+        log_errors, exception, HTTP_422_UNPROCESSABLE_ENTITY
+    )
 
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=HTTP_422_UNPROCESSABLE_ENTITY,
-        content=jsonable_encoder({"errors": exception.errors()}),
+        content={"errors": exception.errors()},
         background=background_task,
     )
 
@@ -82,23 +241,49 @@ async def validation_exception_handler(
 async def custom_http_exception_handler(
     request: Request, exception: ObjectNotFoundException
 ):
-    background_task = BackgroundTask(log_errors, exception)
-    return JSONResponse(
+    background_task = BackgroundTask(log_errors, exception, HTTP_404_NOT_FOUND)
+    return FastJSONResponse(
         status_code=HTTP_404_NOT_FOUND,
-        content=jsonable_encoder({"detail": exception.detail}),
+        content={"detail": exception.detail},
+        background=background_task,
+    )
+
+
+@app.exception_handler(ConflictException)
+async def conflict_exception_handler(request: Request, exception: ConflictException):
+    background_task = BackgroundTask(log_errors, exception, HTTP_409_CONFLICT)
+    return FastJSONResponse(
+        status_code=HTTP_409_CONFLICT,
+        content={"detail": exception.detail},
+        background=background_task,
+    )
+
+
+@app.exception_handler(DeadlineExceededException)
+async def deadline_exceeded_exception_handler(
+    request: Request, exception: DeadlineExceededException
+):
+    background_task = BackgroundTask(log_errors, exception, HTTP_504_GATEWAY_TIMEOUT)
+    return FastJSONResponse(
+        status_code=HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": exception.detail},
         background=background_task,
     )
 
 
 @app.exception_handler(DatabaseException)
 async def database_exception_handler(request: Request, exception: DatabaseException):
-    background_task = BackgroundTask(log_errors, exception)
-    return JSONResponse(
+    background_task = BackgroundTask(
+        log_errors, exception, HTTP_500_INTERNAL_SERVER_ERROR
+    )
+    return FastJSONResponse(
         status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-        content=jsonable_encoder({"detail": "Internal Server Error"}),
+        content={"detail": "Internal Server Error"},
         background=background_task,
     )
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from books_reviewing.runner import run
+
+    run()
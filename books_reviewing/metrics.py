@@ -0,0 +1,448 @@
+import asyncio
+import bisect
+import glob
+import json
+import os
+import re
+import tempfile
+import time
+from typing import TYPE_CHECKING, Callable
+
+from books_reviewing.instrumentation import RepositoryCall
+
+if TYPE_CHECKING:
+    from books_reviewing.container import Container
+    from books_reviewing.middleware.admission import AdmissionController
+    from books_reviewing.middleware.rate_limit import RateLimiter
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Metric:
+    """Base for in-process metrics. Values are keyed by a tuple of label
+    values and are only updated from the event loop, so they need no lock."""
+
+    type: str
+    name: str
+    help: str
+    labelnames: tuple[str, ...]
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}
+
+    def clear(self):
+        self.values.clear()
+
+    def set(self, labels: tuple = (), value: float = 0):
+        self.values[labels] = value
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "values": [[list(labels), value] for labels, value in self.values.items()],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    """Per label set: one count per bucket (not cumulative, the last one for
+    +Inf), then the sum of the observed values."""
+
+    type = "histogram"
+    buckets: tuple[float, ...]
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, labels: tuple, value: float):
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        snapshot["values"] = [
+            [labels, list(value)] for labels, value in snapshot["values"]
+        ]
+        return snapshot
+
+
+class MetricsRegistry:
+    """Holds the metrics of this worker. Collectors run before every
+    snapshot to refresh gauges that are read from elsewhere, like pool
+    stats. With a snapshot directory, each worker writes its snapshot there
+    and a scrape of any worker merges all of them."""
+
+    metrics: dict[str, Metric]
+    collectors: list[Callable[[], None]]
+    directory: str | None
+    stale_after: float
+
+    def __init__(self, directory: str = None, stale_after: float = 15):
+        self.metrics = {}
+        self.collectors = []
+        self.directory = directory
+        self.stale_after = stale_after
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict[str, dict]:
+        for collector in self.collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def write_snapshot(self):
+        if not self.directory:
+            return
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary_path, self.snapshot_path)
+
+    def remove_snapshot(self):
+        if self.directory:
+            try:
+                os.remove(self.snapshot_path)
+            except FileNotFoundError:
+                pass
+
+    def collect(self) -> dict[str, dict]:
+        """Merges the snapshot files of all live workers, after writing this
+        worker's. Scrapes never mix live values with snapshots, so every
+        worker serves the same sum, and counters do not go backwards between
+        scrapes served by different workers. Snapshots of workers that have
+        exited are deleted; gauges are only taken from snapshots written in
+        the last stale_after seconds."""
+        if not self.directory:
+            return merge_snapshots([self.snapshot()])
+        self.write_snapshot()
+        snapshots = []
+        now = time.time()
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            pid = snapshot_pid(path)
+            if pid is not None and not process_alive(pid):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path) as file:
+                    modified = os.fstat(file.fileno()).st_mtime
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if now - modified > self.stale_after:
+                snapshot = {
+                    name: metric
+                    for name, metric in snapshot.items()
+                    if metric["type"] != "gauge"
+                }
+            snapshots.append(snapshot)
+        return merge_snapshots(snapshots)
+
+
+def snapshot_pid(path: str) -> int | None:
+    match = re.fullmatch(r"metrics-(\d+)\.json", os.path.basename(path))
+    return int(match[1]) if match else None
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+async def write_snapshots(registry: MetricsRegistry, interval: float):
+    while True:
+        registry.write_snapshot()
+        await asyncio.sleep(interval)
+
+
+def clear_snapshots(directory: str):
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        os.remove(path)
+
+
+def merge_snapshots(snapshots: list[dict[str, dict]]) -> dict[str, dict]:
+    """Sums counters, gauges and histogram buckets with the same labels."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "values": {}})
+            for labels, value in metric["values"]:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    existing = target["values"].get(key)
+                    target["values"][key] = (
+                        [a + b for a, b in zip(existing, value)]
+                        if existing
+                        else list(value)
+                    )
+                else:
+                    target["values"][key] = target["values"].get(key, 0) + value
+    return merged
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_labels(labelnames, labels, extra: tuple[str, str] = None) -> str:
+    pairs = [
+        f'{name}="{escape_label_value(value)}"'
+        for name, value in zip(labelnames, labels)
+    ]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(metrics: dict[str, dict]) -> str:
+    """Renders merged snapshots in the Prometheus text exposition format."""
+    lines = []
+    for name, metric in metrics.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for labels, value in metric["values"].items():
+            if metric["type"] != "histogram":
+                lines.append(
+                    f"{name}{format_labels(labelnames, labels)} {format_value(value)}"
+                )
+                continue
+            cumulative = 0
+            for bound, count in zip([*metric["buckets"], "+Inf"], value[:-1]):
+                cumulative += count
+                bucket_labels = format_labels(labelnames, labels, ("le", str(bound)))
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(
+                f"{name}_sum{format_labels(labelnames, labels)} {format_value(value[-1])}"
+            )
+            lines.append(
+                f"{name}_count{format_labels(labelnames, labels)} {cumulative}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(os.getenv("METRICS_DIR"))
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+repository_call_duration = registry.histogram(
+    "mongo_repository_call_duration_seconds",
+    "Repository method latency, including the MongoDB round trips.",
+    ("repository", "method"),
+)
+repository_calls = registry.counter(
+    "mongo_repository_calls_total",
+    "Repository method calls by error class, none for successful calls.",
+    ("repository", "method", "error"),
+)
+repository_result_size = registry.histogram(
+    "mongo_repository_result_size",
+    "Documents returned by repository methods.",
+    ("repository", "method"),
+    buckets=(0, 1, 10, 100, 1000, 10000),
+)
+mongo_pool_connections = registry.gauge(
+    "mongo_pool_connections",
+    "Open and checked out connections per MongoDB server.",
+    ("server", "state"),
+)
+mongo_pool_max_size = registry.gauge(
+    "mongo_pool_max_size", "Connection pool size limit per MongoDB server.", ("server",)
+)
+mongo_pool_checkouts = registry.counter(
+    "mongo_pool_checkouts_total",
+    "Connection checkouts per MongoDB server.",
+    ("server",),
+)
+mongo_pool_checkout_wait = registry.counter(
+    "mongo_pool_checkout_wait_seconds_total",
+    "Time spent waiting for connection checkouts per MongoDB server.",
+    ("server",),
+)
+mongo_commands = registry.counter(
+    "mongo_commands_total",
+    "MongoDB commands by name and outcome.",
+    ("command", "outcome"),
+)
+mongo_command_duration = registry.counter(
+    "mongo_command_duration_seconds_total",
+    "Server round trip time of MongoDB commands by name.",
+    ("command",),
+)
+suggestion_index_entries = registry.gauge(
+    "suggestion_index_entries",
+    "Entries in the in-memory suggestion indexes.",
+    ("index",),
+)
+admission_requests = registry.gauge(
+    "admission_requests",
+    "Requests in flight or queued per admission class.",
+    ("class", "state"),
+)
+admission_shed = registry.counter(
+    "admission_shed_total",
+    "Requests shed per admission class, because the queue was full or timed out.",
+    ("class", "reason"),
+)
+rate_limit_buckets = registry.gauge(
+    "rate_limit_buckets", "Client token buckets held in memory."
+)
+rate_limit_rejected = registry.counter(
+    "rate_limit_rejected_total", "Requests rejected by the rate limiter."
+)
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a probe scheduled at a fixed interval.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+event_loop_stalls = registry.counter(
+    "event_loop_stalls_total",
+    "Probes that ran later than the blocking threshold.",
+)
+
+
+def observe_repository_call(call: RepositoryCall):
+    labels = call.labels
+    repository_call_duration.observe(labels, call.duration)
+    repository_calls.inc((*labels, call.error_class))
+    size = call.result_size
+    if size is not None:
+        repository_result_size.observe(labels, size)
+
+
+def runtime_collector(
+    get_container: Callable[[], "Container | None"],
+    admission_controller: "AdmissionController",
+    rate_limiter: "RateLimiter",
+) -> Callable[[], None]:
+    """Mirrors pool, command, cache, admission and rate limit stats into
+    metrics right before a snapshot."""
+
+    def collect():
+        for metric in (
+            mongo_pool_connections,
+            mongo_pool_max_size,
+            mongo_pool_checkouts,
+            mongo_pool_checkout_wait,
+            mongo_commands,
+            mongo_command_duration,
+            suggestion_index_entries,
+        ):
+            metric.clear()
+
+        container = get_container()
+        if container is not None:
+            for server, pool in container.pool_monitor.snapshot().items():
+                mongo_pool_connections.set((server, "open"), pool["open"])
+                mongo_pool_connections.set((server, "in_use"), pool["in_use"])
+                if pool["max_size"] is not None:
+                    mongo_pool_max_size.set((server,), pool["max_size"])
+                wait = pool["checkout_wait"]
+                mongo_pool_checkouts.set((server,), wait["count"])
+                mongo_pool_checkout_wait.set(
+                    (server,), wait["mean_ms"] * wait["count"] / 1000
+                )
+            for command, latency in container.command_monitor.snapshot().items():
+                succeeded = latency["count"] - latency["failures"]
+                mongo_commands.set((command, "succeeded"), succeeded)
+                mongo_commands.set((command, "failed"), latency["failures"])
+                mongo_command_duration.set(
+                    (command,), latency["mean_ms"] * latency["count"] / 1000
+                )
+            if container.ready:
+                suggestion_index_entries.set(
+                    ("author_names",), len(container.authors_service.names_index)
+                )
+                suggestion_index_entries.set(
+                    ("book_titles",), len(container.books_service.titles_index)
+                )
+
+        for name, stats in admission_controller.snapshot().items():
+            admission_requests.set((name, "in_flight"), stats["in_flight"])
+            admission_requests.set((name, "queued"), stats["queued"])
+            admission_shed.set((name, "queue_full"), stats["rejected"])
+            admission_shed.set((name, "timed_out"), stats["timed_out"])
+
+        rate_limit_buckets.set((), len(rate_limiter))
+        rate_limit_rejected.set((), rate_limiter.rejected)
+
+    return collect
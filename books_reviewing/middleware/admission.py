@@ -0,0 +1,170 @@
+import asyncio
+import os
+import re
+from collections import deque
+from typing import Callable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from books_reviewing.responses import FastJSONResponse
+
+
+class AdmissionClass:
+    """Concurrency limit with a bounded FIFO queue for one class of routes.
+
+    A finished request hands its slot directly to the oldest waiter, so
+    in_flight never exceeds concurrency."""
+
+    name: str
+    concurrency: int
+    queue_size: int
+    match: Callable[[str, str], bool] | None
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        queue_size: int,
+        match: Callable[[str, str], bool] = None,
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.match = match
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.__waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self.__waiters)
+
+    async def acquire(self, timeout: float | None = None) -> bool:
+        if self.in_flight < self.concurrency and not self.__waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self.__waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.__waiters.append(waiter)
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError) as exception:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over while we were giving up.
+                if isinstance(exception, asyncio.CancelledError):
+                    self.release()
+                    raise
+            else:
+                if waiter in self.__waiters:
+                    self.__waiters.remove(waiter)
+                if isinstance(exception, asyncio.CancelledError):
+                    raise
+                self.timed_out += 1
+                return False
+        self.admitted += 1
+        return True
+
+    def release(self):
+        while self.__waiters:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def admission_class_from_env(
+    name: str,
+    concurrency: int,
+    queue_size: int,
+    match: Callable[[str, str], bool] = None,
+) -> AdmissionClass:
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdmissionClass(
+        name,
+        int(os.getenv(f"{prefix}_CONCURRENCY", concurrency)),
+        int(os.getenv(f"{prefix}_QUEUE_SIZE", queue_size)),
+        match,
+    )
+
+
+class AdmissionController:
+    """Routes each request to the first admission class that matches its
+    method and path. The last class should match everything."""
+
+    classes: list[AdmissionClass]
+    queue_timeout: float | None
+    retry_after: int
+    excluded_paths: re.Pattern | None
+
+    def __init__(
+        self,
+        classes: list[AdmissionClass],
+        queue_timeout: float | None = None,
+        retry_after: int = 1,
+        excluded_paths: str = None,
+    ):
+        self.classes = classes
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.excluded_paths = re.compile(excluded_paths) if excluded_paths else None
+
+    def classify(self, method: str, path: str) -> AdmissionClass | None:
+        if self.excluded_paths and self.excluded_paths.search(path):
+            return None
+        for admission_class in self.classes:
+            if admission_class.match is None or admission_class.match(method, path):
+                return admission_class
+        return None
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            admission_class.name: admission_class.snapshot()
+            for admission_class in self.classes
+        }
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        admission_class = self.controller.classify(scope["method"], scope["path"])
+        if admission_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await admission_class.acquire(self.controller.queue_timeout):
+            response = FastJSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry later"},
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_class.release()
@@ -0,0 +1,181 @@
+import zlib
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_LEVELS = {"zstd": 3, "br": 1, "gzip": 6}
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self.__compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.__compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self.__compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.__compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self.__compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.__compressor.flush()
+
+
+COMPRESSORS: dict[str, type[Compressor]] = {"gzip": GzipCompressor}
+if brotli:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+
+def negotiate_encoding(accept_encoding: str, available: list[str]) -> str | None:
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, *parameters = (part.strip() for part in coding.split(";"))
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.lower()] = quality
+
+    best_encoding, best_quality = None, 0.0
+    for encoding in available:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+class CompressionMiddleware:
+    """Compresses responses with zstd, brotli or gzip, whichever the client
+    accepts, preferring them in that order.
+
+    Bodies sent in a single message are only compressed from minimum_size
+    bytes on. Streaming responses are compressed chunk by chunk as they are
+    sent, so their memory use stays constant."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        levels: dict[str, int] | None = None,
+        encodings: list[str] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.encodings = [
+            encoding
+            for encoding in encodings or ["zstd", "br", "gzip"]
+            if encoding in COMPRESSORS
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(
+            send, encoding, self.levels[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    def __init__(self, send: Send, encoding: str, level: int, minimum_size: int):
+        self.__send = send
+        self.__encoding = encoding
+        self.__level = level
+        self.__minimum_size = minimum_size
+        self.__start_message: Message | None = None
+        self.__compressor: Compressor | None = None
+        self.__passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.__start_message = message
+            return
+        if message["type"] != "http.response.body" or self.__passthrough:
+            await self.__send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.__compressor is None:
+            headers = Headers(raw=self.__start_message["headers"])
+            if "content-encoding" in headers or (
+                not more_body and len(body) < max(self.__minimum_size, 1)
+            ):
+                self.__passthrough = True
+                await self.__send(self.__start_message)
+                await self.__send(message)
+                return
+            self.__compressor = COMPRESSORS[self.__encoding](self.__level)
+
+        compressed = self.__compressor.compress(body)
+        if not more_body:
+            compressed += self.__compressor.flush()
+        if self.__start_message is not None:
+            await self.__send_start(None if more_body else len(compressed))
+        await self.__send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+    async def __send_start(self, content_length: int | None):
+        headers = MutableHeaders(raw=self.__start_message["headers"])
+        headers["content-encoding"] = self.__encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["content-length"]
+        else:
+            headers["content-length"] = str(content_length)
+        await self.__send(self.__start_message)
+        self.__start_message = None
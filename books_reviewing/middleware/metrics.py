@@ -0,0 +1,43 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from books_reviewing.metrics import (
+    http_request_duration,
+    http_requests,
+    http_requests_in_flight,
+)
+
+
+class MetricsMiddleware:
+    """Counts requests and records their latency by route template, so that
+    paths with ids do not each get their own series."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            http_request_duration.observe(
+                (scope["method"], route_path), time.perf_counter() - started
+            )
+            http_requests.inc((scope["method"], route_path, str(status)))
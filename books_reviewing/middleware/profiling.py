@@ -0,0 +1,67 @@
+import asyncio
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from books_reviewing.profiling import Profiler
+
+
+def resolve_route(scope: Scope) -> str | None:
+    """The path template of the route the router will pick for this request.
+    Routes are tried in order, as the router does, so /books/search is not
+    mistaken for /books/{book_id}."""
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return None
+
+
+class ProfilingMiddleware:
+    """Profiles the requests the profiler claims and writes each profile to
+    its directory after the response is sent. The X-Profile response header
+    names the file."""
+
+    def __init__(self, app: ASGIApp, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile-token":
+                token = value.decode("latin-1")
+                break
+        if token is None and not self.profiler.targets:
+            await self.app(scope, receive, send)
+            return
+
+        route = resolve_route(scope) if token is None else None
+        mode = self.profiler.claim(scope["method"], route, token)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        name = None
+
+        async def send_with_profile_name(message: Message):
+            nonlocal name
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                route_path = route.path if route is not None else "unmatched"
+                name = self.profiler.profile_name(scope["method"], route_path, mode)
+                MutableHeaders(scope=message).append("x-profile", name)
+            await send(message)
+
+        session = self.profiler.start(mode)
+        try:
+            await self.app(scope, receive, send_with_profile_name)
+        finally:
+            self.profiler.stop(session)
+            if name is not None:
+                await asyncio.to_thread(self.profiler.save, session, name)
@@ -0,0 +1,174 @@
+import math
+import time
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from books_reviewing.responses import FastJSONResponse
+
+
+class RateLimit:
+    """Allows requests per period seconds on average, with bursts of up to
+    burst requests."""
+
+    requests: int
+    period: float
+    burst: int
+    rate: float
+
+    def __init__(self, requests: int, period: float, burst: int = None):
+        self.requests = requests
+        self.period = period
+        self.burst = burst or requests
+        self.rate = requests / period
+
+    @property
+    def policy(self) -> str:
+        return f"{self.requests};w={self.period:g};burst={self.burst}"
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+def client_key(
+    header: str | None = None, trusted_proxies: frozenset[str] = frozenset()
+) -> Callable[[Scope], str]:
+    """Identifies clients by IP address. The given header is only trusted on
+    requests from one of the trusted proxies, which are expected to have
+    validated it: a client sending it directly could otherwise get a fresh
+    bucket per value it makes up."""
+    header = header.lower() if header else None
+
+    def key(scope: Scope) -> str:
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        if header and address in trusted_proxies:
+            value = Headers(scope=scope).get(header)
+            if value:
+                return "key:" + value
+        return "ip:" + address
+
+    return key
+
+
+class RateLimiter:
+    """Token buckets per route prefix and client key.
+
+    Buckets are only touched from the event loop and never across an await,
+    so taking a token needs no lock. Buckets that have been idle long enough
+    to be full again are dropped every eviction_interval seconds."""
+
+    limits: dict[str, RateLimit]
+    key: Callable[[Scope], str]
+    eviction_interval: float
+
+    def __init__(
+        self,
+        limits: dict[str, RateLimit] = None,
+        key: Callable[[Scope], str] = None,
+        eviction_interval: float = 60,
+    ):
+        self.limits = dict(limits or {})
+        self.key = key or client_key()
+        self.eviction_interval = eviction_interval
+        self.rejected = 0
+        self.__buckets: dict[tuple[str, str], TokenBucket] = {}
+        self.__next_eviction = time.monotonic() + eviction_interval
+
+    def __len__(self) -> int:
+        return len(self.__buckets)
+
+    def add(self, prefix: str, limit: RateLimit):
+        self.limits[prefix] = limit
+
+    def limit_for(self, scope: Scope) -> tuple[str, RateLimit] | None:
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        prefix = "/" + path.split("/", 2)[1]
+        limit = self.limits.get(prefix)
+        return (prefix, limit) if limit else None
+
+    def take(
+        self, prefix: str, limit: RateLimit, key: str, now: float = None
+    ) -> tuple[bool, float]:
+        now = time.monotonic() if now is None else now
+        if now >= self.__next_eviction:
+            self.evict(now)
+
+        bucket = self.__buckets.get((prefix, key))
+        if bucket is None:
+            bucket = self.__buckets[(prefix, key)] = TokenBucket(limit.burst, now)
+        else:
+            bucket.tokens = min(
+                limit.burst, bucket.tokens + (now - bucket.updated) * limit.rate
+            )
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True, bucket.tokens
+        self.rejected += 1
+        return False, bucket.tokens
+
+    def evict(self, now: float):
+        self.__next_eviction = now + self.eviction_interval
+        idle = [
+            bucket_key
+            for bucket_key, bucket in self.__buckets.items()
+            if bucket.tokens + (now - bucket.updated) * self.limits[bucket_key[0]].rate
+            >= self.limits[bucket_key[0]].burst
+        ]
+        for bucket_key in idle:
+            del self.__buckets[bucket_key]
+
+
+def rate_limit_headers(limit: RateLimit, tokens: float) -> dict[str, str]:
+    return {
+        "RateLimit-Limit": str(limit.burst),
+        "RateLimit-Remaining": str(math.floor(tokens)),
+        "RateLimit-Reset": str(math.ceil((limit.burst - tokens) / limit.rate)),
+        "RateLimit-Policy": limit.policy,
+    }
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_limit = self.limiter.limit_for(scope)
+        if route_limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        prefix, limit = route_limit
+        allowed, tokens = self.limiter.take(prefix, limit, self.limiter.key(scope))
+        headers = rate_limit_headers(limit, tokens)
+        if not allowed:
+            headers["Retry-After"] = str(math.ceil((1 - tokens) / limit.rate))
+            response = FastJSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests"},
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"]).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
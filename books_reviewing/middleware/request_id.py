@@ -0,0 +1,40 @@
+import re
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from books_reviewing.structured_logging import request_id
+
+# Ids from upstream proxies are kept when they look like ids, not log input.
+VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+class RequestIdMiddleware:
+    """Gives every request an id, taken from the X-Request-ID header when
+    the proxy in front sets one, that is added to its log records and
+    returned in the response."""
+
+    def __init__(self, app: ASGIApp, header: str = "x-request-id"):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        value = Headers(scope=scope).get(self.header)
+        if value is None or not VALID_REQUEST_ID.fullmatch(value):
+            value = uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(self.header, value)
+            await send(message)
+
+        token = request_id.set(value)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,59 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from books_reviewing.tracing import Tracer, current_span
+
+
+class TracingMiddleware:
+    """Opens the root span of sampled requests. Service and repository spans
+    nest under it through the current_span context variable, and the
+    traceparent response header tells the client which trace to look up."""
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        span = self.tracer.start_request(
+            scope["method"], Headers(scope=scope).get("traceparent")
+        )
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_traceparent(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "traceparent", f"00-{span.trace.trace_id}-{span.span_id}-01"
+                )
+            await send(message)
+
+        token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as exception:
+            span.error = type(exception).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            span.name = f"{scope['method']} {route_path}"
+            span.attributes.update(
+                {
+                    "http.method": scope["method"],
+                    "http.route": route_path,
+                    "http.status_code": status,
+                }
+            )
+            if status >= 500 and span.error is None:
+                span.error = f"HTTP {status}"
+            self.tracer.finish_request(span)
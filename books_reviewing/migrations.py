@@ -0,0 +1,134 @@
+"""One-off data migrations, run by hand before deploying the release that
+needs them:
+
+    python -m books_reviewing.migrations [--dry-run]
+"""
+
+import asyncio
+import os
+import sys
+from collections import defaultdict
+from typing import Callable
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from odmantic import AIOEngine, ObjectId
+from pymongo import UpdateOne
+
+from books_reviewing.models import Book, User
+from books_reviewing.schemas.books import normalize_isbn
+
+
+class MigrationReport:
+    updated: int
+    invalid: dict[ObjectId, str]
+    duplicates: dict[str, list[ObjectId]]
+
+    def __init__(self):
+        self.updated = 0
+        self.invalid = {}
+        self.duplicates = {}
+
+    @property
+    def clean(self) -> bool:
+        return not self.invalid and not self.duplicates
+
+
+def normalize_email(value: str) -> str:
+    if not isinstance(value, str):
+        raise TypeError("Email is not a string")
+    return value.lower()
+
+
+async def normalize_stored_values(
+    collection: AsyncIOMotorCollection,
+    field: str,
+    normalize: Callable[[str], str],
+    dry_run: bool = False,
+) -> MigrationReport:
+    """Rewrites field in every document to its normalized form. Documents
+    whose value cannot be normalized, or that share a value once
+    normalized, are left as they are and reported: they have to be fixed by
+    hand before a unique index on field can be created."""
+    report = MigrationReport()
+    stored: dict[ObjectId, str] = {}
+    ids_by_value: dict[str, list[ObjectId]] = defaultdict(list)
+    async for document in collection.find({}, {field: 1}):
+        object_id, value = document["_id"], document.get(field)
+        try:
+            normalized = normalize(value)
+        except (TypeError, ValueError):
+            report.invalid[object_id] = value
+            continue
+        stored[object_id] = value
+        ids_by_value[normalized].append(object_id)
+
+    updates = []
+    for normalized, object_ids in ids_by_value.items():
+        if len(object_ids) > 1:
+            report.duplicates[normalized] = object_ids
+        elif stored[object_ids[0]] != normalized:
+            updates.append(
+                UpdateOne({"_id": object_ids[0]}, {"$set": {field: normalized}})
+            )
+    if updates and not dry_run:
+        await collection.bulk_write(updates, ordered=False)
+    report.updated = len(updates)
+    return report
+
+
+async def normalize_stored_isbns(
+    collection: AsyncIOMotorCollection, dry_run: bool = False
+) -> MigrationReport:
+    """Rewrites stored ISBNs in the ISBN-13 form the schemas store since
+    ISBNs became unique."""
+    return await normalize_stored_values(collection, "isbn", normalize_isbn, dry_run)
+
+
+async def normalize_stored_emails(
+    collection: AsyncIOMotorCollection, dry_run: bool = False
+) -> MigrationReport:
+    """Lowercases stored emails, as the schemas do since emails became
+    unique. Accounts whose emails differ only in case are reported, to be
+    merged by hand."""
+    return await normalize_stored_values(collection, "email", normalize_email, dry_run)
+
+
+def print_report(report: MigrationReport, field: str, collection: str, dry_run: bool):
+    print(
+        f"{'Would normalize' if dry_run else 'Normalized'} "
+        f"{report.updated} {field} values in {collection}"
+    )
+    for object_id, value in report.invalid.items():
+        print(f"Invalid {field} {value!r} on {collection} {object_id}")
+    for value, object_ids in report.duplicates.items():
+        print(
+            f"{field} {value} is shared by {collection} "
+            f"{', '.join(map(str, object_ids))}"
+        )
+
+
+async def main(dry_run: bool) -> int:
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    engine = AIOEngine(client=client, database=os.getenv("MONGO_DB", "book_reviews"))
+    try:
+        isbns = await normalize_stored_isbns(
+            engine.get_collection(Book), dry_run=dry_run
+        )
+        print_report(isbns, "isbn", "books", dry_run)
+        emails = await normalize_stored_emails(
+            engine.get_collection(User), dry_run=dry_run
+        )
+        print_report(emails, "email", "users", dry_run)
+        if not isbns.clean or not emails.clean:
+            print("Fix these documents and run again before creating the indexes")
+            return 1
+        if not dry_run:
+            await engine.configure_database([Book, User])
+            print("Created the unique ISBN and email indexes")
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main("--dry-run" in sys.argv[1:])))
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from odmantic import Model, Reference, ObjectId, Field
+from pymongo import IndexModel, TEXT
 
 
 class Author(Model):
@@ -11,19 +12,28 @@ class Author(Model):
 
 
 class Book(Model):
-    isbn: str
+    isbn: str = Field(unique=True)
     title: str
     description: str
     publication_date: datetime
     author_id: ObjectId = Field(index=True)
 
-    model_config = {"collection": "books"}
+    model_config = {
+        "collection": "books",
+        "indexes": lambda: [
+            IndexModel(
+                [("title", TEXT), ("description", TEXT)],
+                weights={"title": 3, "description": 1},
+                name="books_text",
+            )
+        ],
+    }
 
 
 class User(Model):
     name: str
     birthday: datetime
-    email: str
+    email: str = Field(unique=True)
     phone: str
 
     model_config = {"collection": "users"}
@@ -35,4 +45,7 @@ class Review(Model):
     user_id: ObjectId = Field(index=True)
     book_id: ObjectId = Field(index=True)
 
-    model_config = {"collection": "reviews"}
+    model_config = {
+        "collection": "reviews",
+        "indexes": lambda: [IndexModel([("comment", TEXT)], name="reviews_text")],
+    }
@@ -0,0 +1,211 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+CLIENT_OPTIONS_FROM_ENV = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", int),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", int),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", int),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", int),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", int),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", int),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", int),
+    "compressors": ("MONGO_COMPRESSORS", str),
+}
+
+
+def client_options_from_env() -> dict:
+    options = {}
+    for option, (variable, parse) in CLIENT_OPTIONS_FROM_ENV.items():
+        value = os.getenv(variable)
+        if value:
+            options[option] = parse(value)
+    return options
+
+
+class LatencyRecorder:
+    """Thread safe latency statistics. Percentiles are computed over the last
+    window samples, everything else over the whole lifetime."""
+
+    def __init__(self, window: int = 1024):
+        self.__lock = threading.Lock()
+        self.__samples = deque(maxlen=window)
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, milliseconds: float, failed: bool = False):
+        with self.__lock:
+            self.__samples.append(milliseconds)
+            self.count += 1
+            self.failures += failed
+            self.total_ms += milliseconds
+            self.max_ms = max(self.max_ms, milliseconds)
+
+    def snapshot(self) -> dict:
+        with self.__lock:
+            samples = sorted(self.__samples)
+            snapshot = {
+                "count": self.count,
+                "failures": self.failures,
+                "mean_ms": self.total_ms / self.count if self.count else 0.0,
+                "max_ms": self.max_ms,
+            }
+        for name, quantile in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            snapshot[name] = (
+                samples[max(math.ceil(quantile * len(samples)) - 1, 0)]
+                if samples
+                else 0.0
+            )
+        return snapshot
+
+
+class PoolStats:
+    def __init__(self, max_size: int | None = None, min_size: int | None = None):
+        self.max_size = max_size
+        self.min_size = min_size
+        self.open = 0
+        self.in_use = 0
+        self.checkout_wait = LatencyRecorder()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_size": self.max_size,
+            "min_size": self.min_size,
+            "open": self.open,
+            "in_use": self.in_use,
+            "checkout_wait": self.checkout_wait.snapshot(),
+        }
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks open and checked out connections and checkout wait times per
+    server. Checkout start and end are reported on the same thread, so the
+    start time is kept in a thread local."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.pools: dict[str, PoolStats] = {}
+
+    def snapshot(self) -> dict[str, dict]:
+        with self.__lock:
+            return {address: pool.snapshot() for address, pool in self.pools.items()}
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent):
+        with self.__lock:
+            self.pools[self.__key(event.address)] = PoolStats(
+                event.options.get("maxPoolSize"), event.options.get("minPoolSize")
+            )
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent):
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent):
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent):
+        with self.__lock:
+            self.pools.pop(self.__key(event.address), None)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent):
+        with self.__lock:
+            self.__pool(event.address).open += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent):
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent):
+        with self.__lock:
+            self.__pool(event.address).open -= 1
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ):
+        self.__local.started = time.perf_counter()
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ):
+        self.__record_wait(event.address, failed=True)
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent):
+        with self.__lock:
+            self.__pool(event.address).in_use += 1
+        self.__record_wait(event.address, failed=False)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent):
+        with self.__lock:
+            self.__pool(event.address).in_use -= 1
+
+    def __record_wait(self, address: tuple[str, int], failed: bool):
+        started = getattr(self.__local, "started", None)
+        if started is None:
+            return
+        self.__local.started = None
+        with self.__lock:
+            pool = self.__pool(address)
+        pool.checkout_wait.record((time.perf_counter() - started) * 1000, failed)
+
+    def __pool(self, address: tuple[str, int]) -> PoolStats:
+        return self.pools.setdefault(self.__key(address), PoolStats())
+
+    @staticmethod
+    def __key(address: tuple[str, int]) -> str:
+        return f"{address[0]}:{address[1]}"
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Records the server round trip latency of every command by name."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.commands: dict[str, LatencyRecorder] = {}
+
+    def snapshot(self) -> dict[str, dict]:
+        with self.__lock:
+            commands = dict(self.commands)
+        return {name: recorder.snapshot() for name, recorder in commands.items()}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self.__record(event.command_name, event.duration_micros, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self.__record(event.command_name, event.duration_micros, failed=True)
+
+    def __record(self, command_name: str, duration_micros: int, failed: bool):
+        with self.__lock:
+            recorder = self.commands.get(command_name)
+            if recorder is None:
+                recorder = self.commands[command_name] = LatencyRecorder()
+        recorder.record(duration_micros / 1000, failed)
+
+
+def create_mongo_client(
+    uri: str, pool_monitor: PoolMonitor, command_monitor: CommandMonitor
+) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        uri,
+        event_listeners=[pool_monitor, command_monitor],
+        **client_options_from_env(),
+    )
+
+
+async def prewarm_pool(mongo_client: AsyncIOMotorClient):
+    """Opens minPoolSize connections before the first request needs them by
+    running that many pings at once."""
+    min_pool_size = mongo_client.options.pool_options.min_pool_size
+    if min_pool_size:
+        await asyncio.gather(
+            *(mongo_client.admin.command("ping") for _ in range(min_pool_size))
+        )
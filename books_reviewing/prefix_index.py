@@ -0,0 +1,69 @@
+import bisect
+import unicodedata
+from typing import Iterable
+
+from odmantic import ObjectId
+
+
+def normalize(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value)
+    return (
+        "".join(char for char in decomposed if not unicodedata.combining(char))
+        .casefold()
+        .strip()
+    )
+
+
+class PrefixIndex:
+    __keys: list[tuple[str, ObjectId]]
+    __values: dict[ObjectId, tuple[str, str]]
+
+    def __init__(self):
+        self.__keys = []
+        self.__values = {}
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def build(self, entries: Iterable[tuple[ObjectId, str]]):
+        values = {object_id: (normalize(value), value) for object_id, value in entries}
+        self.__keys = sorted(
+            (normalized, object_id) for object_id, (normalized, _) in values.items()
+        )
+        self.__values = values
+
+    def add(self, object_id: ObjectId, value: str):
+        normalized = normalize(value)
+        existing = self.__values.get(object_id)
+        if existing and existing[0] == normalized:
+            self.__values[object_id] = (normalized, value)
+            return
+        if existing:
+            self.__remove_key(existing[0], object_id)
+        bisect.insort(self.__keys, (normalized, object_id))
+        self.__values[object_id] = (normalized, value)
+
+    def remove(self, object_id: ObjectId):
+        existing = self.__values.pop(object_id, None)
+        if existing:
+            self.__remove_key(existing[0], object_id)
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple[ObjectId, str]]:
+        normalized_prefix = normalize(prefix)
+        if not normalized_prefix:
+            return []
+        position = bisect.bisect_left(self.__keys, (normalized_prefix,))
+        suggestions = []
+        for normalized, object_id in self.__keys[position : position + limit]:
+            if not normalized.startswith(normalized_prefix):
+                break
+            suggestions.append((object_id, self.__values[object_id][1]))
+        return suggestions
+
+    def __remove_key(self, normalized: str, object_id: ObjectId):
+        position = bisect.bisect_left(self.__keys, (normalized, object_id))
+        if position < len(self.__keys) and self.__keys[position] == (
+            normalized,
+            object_id,
+        ):
+            del self.__keys[position]
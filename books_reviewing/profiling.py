@@ -0,0 +1,179 @@
+import cProfile
+import hmac
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class StackSampler:
+    """Records the stack of one thread every interval seconds from a
+    background thread. The counts are in the folded format flamegraph.pl
+    and speedscope read: one line per distinct stack, root first."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(
+            target=self.__run, name="stack-sampler", daemon=True
+        )
+
+    def start(self):
+        self.__thread.start()
+
+    def stop(self):
+        self.__stopped.set()
+        self.__thread.join()
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            for stack, count in self.counts.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def __run(self):
+        while not self.__stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_qualname} "
+                    f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+
+class FunctionProfiler:
+    """cProfile, saved in the pstats format snakeviz and flameprof read."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def dump(self, path: str):
+        self.profile.dump_stats(path)
+
+
+class ProfileTarget:
+    """The next count requests to one route, armed from the admin endpoint."""
+
+    method: str
+    route: str
+    count: int
+    mode: str
+
+    def __init__(self, method: str, route: str, count: int, mode: str):
+        self.method = method
+        self.route = route
+        self.count = count
+        self.mode = mode
+
+
+class Profiler:
+    """Profiles single requests: the ones sent with the profiling token in
+    the X-Profile-Token header, and the next requests to the routes armed
+    from the admin endpoint. One request is profiled at a time, since
+    profiles cover the whole event loop thread; requests that arrive in
+    the meantime run normally."""
+
+    directory: str | None
+    token: str | None
+    mode: str
+    interval: float
+
+    def __init__(
+        self,
+        directory: str | None,
+        token: str | None,
+        mode: str = "sample",
+        interval: float = 0.005,
+    ):
+        self.directory = directory
+        self.token = token
+        self.mode = mode
+        self.interval = interval
+        self.targets: dict[tuple[str, str], ProfileTarget] = {}
+        self.active = False
+        self.__ids = itertools.count(1)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory and self.token)
+
+    def authorized(self, token: str | None) -> bool:
+        return (
+            self.enabled
+            and token is not None
+            and hmac.compare_digest(token.encode(), self.token.encode())
+        )
+
+    def arm(self, method: str, route: str, count: int, mode: str = None):
+        self.targets[(method, route)] = ProfileTarget(
+            method, route, count, mode or self.mode
+        )
+
+    def claim(self, method: str, route: str | None, token: str | None) -> str | None:
+        """The mode to profile this request in, or None to leave it be.
+        route is the path template of the route the request resolves to."""
+        if self.active:
+            return None
+        if token is not None:
+            return self.mode if self.authorized(token) else None
+        target = self.targets.get((method, route))
+        if target is None:
+            return None
+        target.count -= 1
+        if target.count <= 0:
+            del self.targets[(method, route)]
+        return target.mode
+
+    def start(self, mode: str) -> StackSampler | FunctionProfiler:
+        self.active = True
+        if mode == "cprofile":
+            session = FunctionProfiler()
+        else:
+            session = StackSampler(threading.get_ident(), self.interval)
+        session.start()
+        return session
+
+    def stop(self, session: StackSampler | FunctionProfiler):
+        session.stop()
+        self.active = False
+
+    def profile_name(self, method: str, route: str, mode: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        extension = "prof" if mode == "cprofile" else "folded"
+        return (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(self.__ids)}"
+            f"-{method}-{slug}.{extension}"
+        )
+
+    def save(self, session: StackSampler | FunctionProfiler, name: str):
+        os.makedirs(self.directory, exist_ok=True)
+        session.dump(os.path.join(self.directory, name))
+
+    def files(self) -> list[str]:
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        return sorted(os.listdir(self.directory))
+
+
+def profiler_from_env() -> Profiler:
+    return Profiler(
+        os.getenv("PROFILE_DIR"),
+        os.getenv("PROFILE_TOKEN"),
+        os.getenv("PROFILE_MODE", "sample"),
+        float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5)) / 1000,
+    )
@@ -1,7 +1,16 @@
+from typing import AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorCursor
 from odmantic import AIOEngine, ObjectId
 from odmantic.query import QueryExpression
 
 from books_reviewing.exceptions import database_exception_wrapper
+from books_reviewing.repositories.documents import (
+    EXPORT_BATCH_SIZE,
+    export_cursor,
+    from_mongo_document,
+    iterate_documents,
+)
 from books_reviewing.models import Author
 
 
@@ -22,14 +31,33 @@ class AuthorsRepository:
         )
         return author
 
+    @database_exception_wrapper
+    async def get_one_document(self, author_id: ObjectId) -> dict | None:
+        document = await self.mongo_engine.get_collection(Author).find_one(
+            {"_id": author_id}
+        )
+        return from_mongo_document(document) if document else None
+
     @database_exception_wrapper
     async def get_all(self) -> list[Author]:
         return await self.mongo_engine.find(Author)
 
+    @database_exception_wrapper
+    async def get_names(self) -> list[tuple[ObjectId, str]]:
+        cursor = self.mongo_engine.get_collection(Author).find({}, {"name": 1})
+        return [(document["_id"], document["name"]) async for document in cursor]
+
     @database_exception_wrapper
     async def delete(self, author: Author):
         await self.mongo_engine.delete(author)
 
+    @database_exception_wrapper
+    async def delete_if_exists(self, author_id: ObjectId) -> bool:
+        result = await self.mongo_engine.get_collection(Author).delete_one(
+            {"_id": author_id}
+        )
+        return result.deleted_count == 1
+
     @database_exception_wrapper
     async def query(
         self,
@@ -59,3 +87,24 @@ class AuthorsRepository:
         total_count = await self.mongo_engine.count(Author, *queries)
 
         return items, total_count
+
+    def export_documents(
+        self,
+        sort: str,
+        sort_direction: str,
+        filters_dict: dict[str, str | ObjectId] = None,
+    ) -> AsyncIterator[dict]:
+        return iterate_documents(
+            export_cursor(
+                self.mongo_engine.get_collection(Author),
+                Author,
+                sort,
+                sort_direction,
+                filters_dict,
+            ),
+            self.export_batch,
+        )
+
+    @database_exception_wrapper
+    async def export_batch(self, cursor: AsyncIOMotorCursor) -> list[dict]:
+        return await cursor.to_list(EXPORT_BATCH_SIZE)
@@ -1,7 +1,17 @@
+from typing import AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorCursor
 from odmantic import AIOEngine, ObjectId
 from odmantic.query import QueryExpression
 
 from books_reviewing.exceptions import database_exception_wrapper
+from books_reviewing.repositories.documents import (
+    EXPORT_BATCH_SIZE,
+    export_cursor,
+    from_mongo_document,
+    iterate_documents,
+    projection_for,
+)
 from books_reviewing.models import Book
 
 
@@ -20,10 +30,30 @@ class BooksRepository:
         book: Book = await self.mongo_engine.find_one(Book, Book.id == book_id)
         return book
 
+    @database_exception_wrapper
+    async def get_one_by_isbn(self, isbn: str) -> Book | None:
+        return await self.mongo_engine.find_one(Book, Book.isbn == isbn)
+
+    @database_exception_wrapper
+    async def get_by_isbns(self, isbns: list[str]) -> list[Book]:
+        return await self.mongo_engine.find(Book, Book.isbn.in_(isbns))
+
+    @database_exception_wrapper
+    async def get_one_document(self, book_id: ObjectId) -> dict | None:
+        document = await self.mongo_engine.get_collection(Book).find_one(
+            {"_id": book_id}
+        )
+        return from_mongo_document(document) if document else None
+
     @database_exception_wrapper
     async def get_all(self) -> list[Book]:
         return await self.mongo_engine.find(Book)
 
+    @database_exception_wrapper
+    async def get_titles(self) -> list[tuple[ObjectId, str]]:
+        cursor = self.mongo_engine.get_collection(Book).find({}, {"title": 1})
+        return [(document["_id"], document["title"]) async for document in cursor]
+
     @database_exception_wrapper
     async def delete(self, book: Book):
         await self.mongo_engine.delete(book)
@@ -63,6 +93,54 @@ class BooksRepository:
 
         return items, total_count
 
+    def export_documents(
+        self,
+        sort: str,
+        sort_direction: str,
+        filters_dict: dict[str, str | ObjectId] = None,
+    ) -> AsyncIterator[dict]:
+        return iterate_documents(
+            export_cursor(
+                self.mongo_engine.get_collection(Book),
+                Book,
+                sort,
+                sort_direction,
+                filters_dict,
+            ),
+            self.export_batch,
+        )
+
+    @database_exception_wrapper
+    async def export_batch(self, cursor: AsyncIOMotorCursor) -> list[dict]:
+        return await cursor.to_list(EXPORT_BATCH_SIZE)
+
+    @database_exception_wrapper
+    async def search(
+        self,
+        text: str,
+        page: int,
+        size: int,
+        author_id: ObjectId = None,
+    ) -> (list[Book], int):
+        query = {"$text": {"$search": text}}
+        if author_id:
+            query["author_id"] = author_id
+
+        projection = projection_for(Book)
+        projection["score"] = {"$meta": "textScore"}
+
+        collection = self.mongo_engine.get_collection(Book)
+        cursor = (
+            collection.find(query, projection)
+            .sort([("score", {"$meta": "textScore"})])
+            .skip((page - 1) * size)
+            .limit(size)
+        )
+        items = [Book.model_validate_doc(document) async for document in cursor]
+        total_count = await collection.count_documents(query)
+
+        return items, total_count
+
     @database_exception_wrapper
     async def count_books_for_author(self, author_id: ObjectId) -> int:
         return await self.mongo_engine.count(Book, Book.author_id == author_id)
@@ -74,3 +152,12 @@ class BooksRepository:
     @database_exception_wrapper
     async def delete_books_for_author(self, author_id: ObjectId):
         return await self.mongo_engine.remove(Book, Book.author_id == author_id)
+
+    @database_exception_wrapper
+    async def reassign_books_for_author(
+        self, author_id: ObjectId, target_author_id: ObjectId
+    ) -> int:
+        result = await self.mongo_engine.get_collection(Book).update_many(
+            {"author_id": author_id}, {"$set": {"author_id": target_author_id}}
+        )
+        return result.modified_count
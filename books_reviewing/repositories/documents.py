@@ -0,0 +1,45 @@
+import os
+from typing import AsyncIterator, Awaitable, Callable, Type
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+from odmantic import Model
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+
+def from_mongo_document(document: dict) -> dict:
+    _id = document.pop("_id")
+    return {"id": _id, **document}
+
+
+def projection_for(model: Type[Model]) -> dict[str, int]:
+    return {name: 1 for name in model.model_fields if name != "id"}
+
+
+def export_cursor(
+    collection: AsyncIOMotorCollection,
+    model: Type[Model],
+    sort: str,
+    sort_direction: str,
+    filters_dict: dict = None,
+) -> AsyncIOMotorCursor:
+    return (
+        collection.find(filters_dict or {}, projection_for(model))
+        .sort(sort, 1 if sort_direction == "asc" else -1)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+
+
+async def iterate_documents(
+    cursor: AsyncIOMotorCursor,
+    fetch_batch: Callable[[AsyncIOMotorCursor], Awaitable[list[dict]]],
+) -> AsyncIterator[dict]:
+    """Yields the cursor's documents, fetching them a batch at a time with
+    fetch_batch, which repositories wrap with database_exception_wrapper so
+    each round trip gets the request deadline, metrics and error mapping."""
+    try:
+        while batch := await fetch_batch(cursor):
+            for document in batch:
+                yield from_mongo_document(document)
+    finally:
+        await cursor.close()
@@ -1,7 +1,17 @@
+from typing import AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorCursor
 from odmantic import AIOEngine, ObjectId
 from odmantic.query import QueryExpression
 
 from books_reviewing.exceptions import database_exception_wrapper
+from books_reviewing.repositories.documents import (
+    EXPORT_BATCH_SIZE,
+    export_cursor,
+    from_mongo_document,
+    iterate_documents,
+    projection_for,
+)
 from books_reviewing.models import Review
 
 
@@ -60,6 +70,76 @@ class ReviewsRepository:
 
         return items, total_count
 
+    def export_documents(
+        self,
+        sort: str,
+        sort_direction: str,
+        filters_dict: dict[str, str | ObjectId] = None,
+    ) -> AsyncIterator[dict]:
+        return iterate_documents(
+            export_cursor(
+                self.mongo_engine.get_collection(Review),
+                Review,
+                sort,
+                sort_direction,
+                filters_dict,
+            ),
+            self.export_batch,
+        )
+
+    @database_exception_wrapper
+    async def export_batch(self, cursor: AsyncIOMotorCursor) -> list[dict]:
+        return await cursor.to_list(EXPORT_BATCH_SIZE)
+
+    @database_exception_wrapper
+    async def query_documents(
+        self,
+        sort: str,
+        sort_direction: str,
+        page: int,
+        size: int,
+        filters_dict: dict[str, str | ObjectId] = None,
+    ) -> (list[dict], int):
+        filters_dict = filters_dict or {}
+        collection = self.mongo_engine.get_collection(Review)
+        cursor = (
+            collection.find(filters_dict, projection_for(Review))
+            .sort(sort, 1 if sort_direction == "asc" else -1)
+            .skip((page - 1) * size)
+            .limit(size)
+        )
+        items = [from_mongo_document(document) async for document in cursor]
+        total_count = await collection.count_documents(filters_dict)
+
+        return items, total_count
+
+    @database_exception_wrapper
+    async def search(
+        self,
+        text: str,
+        page: int,
+        size: int,
+        book_ids: list[ObjectId] = None,
+    ) -> (list[Review], int):
+        query = {"$text": {"$search": text}}
+        if book_ids is not None:
+            query["book_id"] = {"$in": book_ids}
+
+        projection = projection_for(Review)
+        projection["score"] = {"$meta": "textScore"}
+
+        collection = self.mongo_engine.get_collection(Review)
+        cursor = (
+            collection.find(query, projection)
+            .sort([("score", {"$meta": "textScore"})])
+            .skip((page - 1) * size)
+            .limit(size)
+        )
+        items = [Review.model_validate_doc(document) async for document in cursor]
+        total_count = await collection.count_documents(query)
+
+        return items, total_count
+
     @database_exception_wrapper
     async def get_average_rating_for_book(self, book_id: ObjectId) -> float:
         result = (
@@ -1,7 +1,15 @@
+from typing import AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorCursor
 from odmantic import AIOEngine, ObjectId
 from odmantic.query import QueryExpression
 
 from books_reviewing.exceptions import database_exception_wrapper
+from books_reviewing.repositories.documents import (
+    EXPORT_BATCH_SIZE,
+    export_cursor,
+    iterate_documents,
+)
 from books_reviewing.models import User
 
 
@@ -20,6 +28,10 @@ class UsersRepository:
         user: User = await self.mongo_engine.find_one(User, User.id == user_id)
         return user
 
+    @database_exception_wrapper
+    async def get_one_by_email(self, email: str) -> User | None:
+        return await self.mongo_engine.find_one(User, User.email == email)
+
     @database_exception_wrapper
     async def get_all(self) -> list[User]:
         return await self.mongo_engine.find(User)
@@ -57,3 +69,24 @@ class UsersRepository:
         total_count = await self.mongo_engine.count(User, *queries)
 
         return items, total_count
+
+    def export_documents(
+        self,
+        sort: str,
+        sort_direction: str,
+        filters_dict: dict[str, str | ObjectId] = None,
+    ) -> AsyncIterator[dict]:
+        return iterate_documents(
+            export_cursor(
+                self.mongo_engine.get_collection(User),
+                User,
+                sort,
+                sort_direction,
+                filters_dict,
+            ),
+            self.export_batch,
+        )
+
+    @database_exception_wrapper
+    async def export_batch(self, cursor: AsyncIOMotorCursor) -> list[dict]:
+        return await cursor.to_list(EXPORT_BATCH_SIZE)
@@ -0,0 +1,167 @@
+import datetime
+import json
+import logging
+import os
+from contextvars import ContextVar
+from typing import Any, AsyncIterable, AsyncIterator, Callable
+
+import bson
+from bson import ObjectId
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+BSON_MEDIA_TYPE = "application/bson"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    if isinstance(value, Exception):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_orjson(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dumps_json(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+JSON_ENCODERS: dict[str, Callable[[Any], bytes]] = {"json": dumps_json}
+if orjson:
+    JSON_ENCODERS["orjson"] = dumps_orjson
+
+dumps = JSON_ENCODERS.get(
+    os.getenv("JSON_ENCODER", "orjson" if orjson else "json"), dumps_json
+)
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        seconds = (value - _EPOCH) // datetime.timedelta(seconds=1)
+        return msgpack.Timestamp(seconds, value.microsecond * 1000)
+    return _default(value)
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+def loads_msgpack(body: bytes) -> Any:
+    return msgpack.unpackb(body, timestamp=3)
+
+
+def dumps_bson(content: Any) -> bytes:
+    # BSON documents must be mappings, so top-level lists are wrapped.
+    if not isinstance(content, dict):
+        content = {"items": content}
+    return bson.encode(content)
+
+
+def loads_bson(body: bytes) -> Any:
+    return bson.decode(body)
+
+
+BINARY_CODECS: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    BSON_MEDIA_TYPE: (dumps_bson, loads_bson),
+}
+if msgpack:
+    BINARY_CODECS[MSGPACK_MEDIA_TYPE] = (dumps_msgpack, loads_msgpack)
+    BINARY_CODECS["application/x-msgpack"] = (dumps_msgpack, loads_msgpack)
+
+response_media_type: ContextVar[str] = ContextVar(
+    "response_media_type", default=JSON_MEDIA_TYPE
+)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class NegotiatedResponse(FastJSONResponse):
+    def render(self, content: Any) -> bytes:
+        media_type = response_media_type.get()
+        if media_type not in BINARY_CODECS:
+            return dumps(content)
+        self.media_type = media_type
+        return BINARY_CODECS[media_type][0](content)
+
+
+def trusted_response(content: BaseModel, mode: str = "json") -> NegotiatedResponse:
+    return NegotiatedResponse(content.model_dump(mode=mode))
+
+
+async def iterate_json_array(
+    documents: AsyncIterable[Any], chunk_size: int = STREAM_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    buffer = bytearray(b"[")
+    separator = b""
+    async for document in documents:
+        buffer += separator
+        buffer += dumps(document)
+        separator = b","
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+async def continue_stream(
+    first_chunk: bytes, chunks: AsyncIterator[bytes]
+) -> AsyncIterator[bytes]:
+    yield first_chunk
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except Exception:
+        # The status line has gone out, so the error can only be signalled by
+        # closing the connection before the closing "]" is sent, which the
+        # client sees as a truncated body.
+        logger.exception("Streaming the response failed")
+        raise
+
+
+async def streaming_json_response(documents: AsyncIterable[Any]) -> StreamingResponse:
+    """Streams the documents as a JSON array. The first chunk is produced
+    before the response starts, so errors in the first query still get
+    their usual status code."""
+    chunks = iterate_json_array(documents)
+    first_chunk = await anext(chunks)
+    return StreamingResponse(
+        continue_stream(first_chunk, chunks), media_type=JSON_MEDIA_TYPE
+    )
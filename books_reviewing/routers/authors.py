@@ -1,22 +1,33 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import Params
 from fastapi_pagination.links import Page
 from odmantic import ObjectId
 
+from books_reviewing.deadlines import RequestDeadline, MAX_BUDGET_MS
 from books_reviewing.dependencies import get_authors_service
 from books_reviewing.models import Author
-from books_reviewing.schemas.base import SortEnum
+from books_reviewing.responses import (
+    FastJSONResponse,
+    trusted_response,
+    streaming_json_response,
+)
+from books_reviewing.routing import NegotiatedRoute
+from books_reviewing.schemas.base import SortEnum, PageQuery, SizeQuery
 from books_reviewing.schemas.authors import (
     AuthorPatchSchema,
     BaseAuthorSchema,
     AuthorFilterEnum,
     AuthorOutSchema,
+    AuthorSuggestionSchema,
 )
 from books_reviewing.services.authors import AuthorsService
 
-router = APIRouter()
+router = APIRouter(
+    route_class=NegotiatedRoute, dependencies=[Depends(RequestDeadline())]
+)
 
 AuthorsServiceDep = Annotated[AuthorsService, Depends(get_authors_service)]
 
@@ -37,34 +48,74 @@ async def update(
     return await authors_service.update(author_id, author_new)
 
 
-@router.get("/{author_id}")
+@router.get("/suggest", description="Prefix suggestions for autocompletion.")
+async def suggest(
+    authors_service: AuthorsServiceDep,
+    prefix: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=50)] = None,
+) -> list[AuthorSuggestionSchema]:
+    return authors_service.suggest(prefix, limit)
+
+
+@router.get(
+    "/export",
+    description="Streams all matching authors as a JSON array, without paging.",
+    response_model=list[Author],
+)
+async def export(
+    authors_service: AuthorsServiceDep,
+    filter_attributes: Annotated[list[AuthorFilterEnum], Query()] = None,
+    filter_values: Annotated[list[str], Query()] = None,
+    sort: AuthorFilterEnum = None,
+    sort_direction: SortEnum = None,
+) -> StreamingResponse:
+    return await streaming_json_response(
+        authors_service.export_documents(
+            filter_attributes, filter_values, sort, sort_direction
+        )
+    )
+
+
+@router.get("/{author_id}", response_model=AuthorOutSchema)
 async def get_one(
     author_id: ObjectId, authors_service: AuthorsServiceDep
-) -> AuthorOutSchema:
-    return await authors_service.get_one(author_id)
+) -> FastJSONResponse:
+    return trusted_response(await authors_service.get_one(author_id))
 
 
-@router.get("/")
+@router.get("/", response_model=Page[Author])
 async def query(
     authors_service: AuthorsServiceDep,
     filter_attributes: Annotated[list[AuthorFilterEnum], Query()] = None,
     filter_values: Annotated[list[str], Query()] = None,
     sort: AuthorFilterEnum = None,
     sort_direction: SortEnum = None,
-    page: int = None,
-    size: int = None,
-) -> Page[Author]:
+    page: PageQuery = None,
+    size: SizeQuery = None,
+) -> FastJSONResponse:
     items, total_count = await authors_service.query(
         filter_attributes, filter_values, sort, sort_direction, page, size
     )
     params = Params().model_construct(page=page, size=size)
-    return Page.create(items=items, params=params, total=total_count)
+    return trusted_response(Page.create(items=items, params=params, total=total_count))
+
+
+@router.post(
+    "/{author_id}/merge-into/{target_author_id}",
+    description="Moves all books to the target author and deletes this author!",
+    dependencies=[Depends(RequestDeadline(budget_ms=MAX_BUDGET_MS))],
+)
+async def merge(
+    author_id: ObjectId, target_author_id: ObjectId, authors_service: AuthorsServiceDep
+) -> AuthorOutSchema:
+    return await authors_service.merge(author_id, target_author_id)
 
 
 @router.delete(
     "/{author_id}",
     status_code=204,
     description="Also deletes all books for this author!",
+    dependencies=[Depends(RequestDeadline(budget_ms=MAX_BUDGET_MS))],
 )
 async def delete(author_id: ObjectId, authors_service: AuthorsServiceDep):
     await authors_service.delete(author_id)
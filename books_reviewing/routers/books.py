@@ -1,22 +1,36 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import Params
 from fastapi_pagination.links import Page
 from odmantic import ObjectId
+from pydantic import AfterValidator
 
+from books_reviewing.deadlines import RequestDeadline
 from books_reviewing.dependencies import get_books_service
 from books_reviewing.models import Book
-from books_reviewing.schemas.base import SortEnum
+from books_reviewing.responses import (
+    FastJSONResponse,
+    trusted_response,
+    streaming_json_response,
+)
+from books_reviewing.routing import NegotiatedRoute
+from books_reviewing.schemas.base import SortEnum, PageQuery, SizeQuery
 from books_reviewing.schemas.books import (
     BookPatchSchema,
     BaseBookSchema,
     BookFilterEnum,
     BookOutSchema,
+    BookSuggestionSchema,
+    BookIsbnBatchSchema,
+    normalize_isbn,
 )
 from books_reviewing.services.books import BooksService
 
-router = APIRouter()
+router = APIRouter(
+    route_class=NegotiatedRoute, dependencies=[Depends(RequestDeadline())]
+)
 
 BooksServiceDep = Annotated[BooksService, Depends(get_books_service)]
 
@@ -33,26 +47,91 @@ async def update(
     return await books_service.update(book_id, book_new)
 
 
-@router.get("/{book_id}")
-async def get_one(book_id: ObjectId, books_service: BooksServiceDep) -> BookOutSchema:
-    return await books_service.get_one(book_id)
+@router.get(
+    "/search",
+    description="Relevance-ranked full-text search.",
+    response_model=Page[Book],
+)
+async def search(
+    books_service: BooksServiceDep,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    author_id: ObjectId = None,
+    page: PageQuery = None,
+    size: SizeQuery = None,
+) -> FastJSONResponse:
+    items, total_count = await books_service.search(q, author_id, page, size)
+    params = Params().model_construct(page=page, size=size)
+    return trusted_response(Page.create(items=items, params=params, total=total_count))
+
+
+@router.get("/suggest", description="Prefix suggestions for autocompletion.")
+async def suggest(
+    books_service: BooksServiceDep,
+    prefix: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=50)] = None,
+) -> list[BookSuggestionSchema]:
+    return books_service.suggest(prefix, limit)
+
+
+@router.get("/by-isbn/{isbn}", response_model=BookOutSchema)
+async def get_one_by_isbn(
+    isbn: Annotated[str, AfterValidator(normalize_isbn)],
+    books_service: BooksServiceDep,
+) -> FastJSONResponse:
+    return trusted_response(await books_service.get_one_by_isbn(isbn))
+
+
+@router.post(
+    "/by-isbn",
+    description="Resolves a batch of ISBNs. Unknown ISBNs are left out.",
+)
+async def get_by_isbns(
+    isbn_batch: BookIsbnBatchSchema, books_service: BooksServiceDep
+) -> list[Book]:
+    return await books_service.get_by_isbns(isbn_batch.isbns)
+
+
+@router.get(
+    "/export",
+    description="Streams all matching books as a JSON array, without paging.",
+    response_model=list[Book],
+)
+async def export(
+    books_service: BooksServiceDep,
+    filter_attributes: Annotated[list[BookFilterEnum], Query()] = None,
+    filter_values: Annotated[list[str], Query()] = None,
+    sort: BookFilterEnum = None,
+    sort_direction: SortEnum = None,
+) -> StreamingResponse:
+    return await streaming_json_response(
+        books_service.export_documents(
+            filter_attributes, filter_values, sort, sort_direction
+        )
+    )
+
+
+@router.get("/{book_id}", response_model=BookOutSchema)
+async def get_one(
+    book_id: ObjectId, books_service: BooksServiceDep
+) -> FastJSONResponse:
+    return trusted_response(await books_service.get_one(book_id))
 
 
-@router.get("/")
+@router.get("/", response_model=Page[Book])
 async def query(
     books_service: BooksServiceDep,
     filter_attributes: Annotated[list[BookFilterEnum], Query()] = None,
     filter_values: Annotated[list[str], Query()] = None,
     sort: BookFilterEnum = None,
     sort_direction: SortEnum = None,
-    page: int = None,
-    size: int = None,
-) -> Page[Book]:
+    page: PageQuery = None,
+    size: SizeQuery = None,
+) -> FastJSONResponse:
     items, total_count = await books_service.query(
         filter_attributes, filter_values, sort, sort_direction, page, size
     )
     params = Params().model_construct(page=page, size=size)
-    return Page.create(items=items, params=params, total=total_count)
+    return trusted_response(Page.create(items=items, params=params, total=total_count))
 
 
 @router.delete("/{book_id}", status_code=204)
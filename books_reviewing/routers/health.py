@@ -0,0 +1,35 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from books_reviewing.container import Container
+from books_reviewing.dependencies import get_container
+from books_reviewing.schemas.monitoring import HealthSchema
+
+router = APIRouter()
+
+
+@router.get(
+    "/healthz",
+    description="Liveness: the worker is running and its startup has not failed.",
+)
+async def healthz(
+    container: Annotated[Container, Depends(get_container)], response: Response
+) -> HealthSchema:
+    if container.startup_error:
+        response.status_code = HTTP_503_SERVICE_UNAVAILABLE
+        return HealthSchema(status="failed", detail=container.startup_error)
+    return HealthSchema(status="ok")
+
+
+@router.get(
+    "/readyz",
+    description="Readiness: the pool is warm, indexes exist and caches are primed.",
+)
+async def readyz(
+    container: Annotated[Container, Depends(get_container)], response: Response
+) -> HealthSchema:
+    if not container.ready:
+        response.status_code = HTTP_503_SERVICE_UNAVAILABLE
+    return HealthSchema(status=container.status, detail=container.startup_error)
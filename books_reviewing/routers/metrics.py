@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+
+from books_reviewing.metrics import CONTENT_TYPE, registry, render
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    response_class=Response,
+    description="Metrics of all workers in the Prometheus text format.",
+)
+async def metrics() -> Response:
+    return Response(render(registry.collect()), media_type=CONTENT_TYPE)
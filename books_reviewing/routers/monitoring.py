@@ -0,0 +1,136 @@
+import hmac
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from starlette.status import HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
+
+from books_reviewing.container import Container
+from books_reviewing.dependencies import (
+    get_container,
+    get_pool_monitor,
+    get_command_monitor,
+    get_admission_controller,
+    get_profiler,
+    get_monitoring_token,
+)
+from books_reviewing.middleware.admission import AdmissionController
+from books_reviewing.mongo import PoolMonitor, CommandMonitor
+from books_reviewing.profiling import Profiler
+from books_reviewing.schemas.monitoring import (
+    DatabaseStatsSchema,
+    AdmissionClassStatsSchema,
+    ProfileTargetSchema,
+    ProfilesSchema,
+)
+
+
+async def authorized_monitoring(
+    monitoring_token: Annotated[str | None, Depends(get_monitoring_token)],
+    x_monitoring_token: Annotated[str | None, Header()] = None,
+):
+    if (
+        not monitoring_token
+        or x_monitoring_token is None
+        or not hmac.compare_digest(
+            x_monitoring_token.encode(), monitoring_token.encode()
+        )
+    ):
+        raise HTTPException(
+            HTTP_403_FORBIDDEN, "Monitoring is disabled or the token is wrong"
+        )
+
+
+router = APIRouter(dependencies=[Depends(authorized_monitoring)])
+
+
+@router.get(
+    "/database",
+    description="Connection pool usage, checkout waits and command latencies.",
+)
+async def database_stats(
+    pool_monitor: Annotated[PoolMonitor, Depends(get_pool_monitor)],
+    command_monitor: Annotated[CommandMonitor, Depends(get_command_monitor)],
+) -> DatabaseStatsSchema:
+    return DatabaseStatsSchema(
+        pools=pool_monitor.snapshot(), commands=command_monitor.snapshot()
+    )
+
+
+@router.get(
+    "/admission",
+    description="Concurrency, queue depth and rejections per route class.",
+)
+async def admission_stats(
+    admission_controller: Annotated[
+        AdmissionController, Depends(get_admission_controller)
+    ],
+) -> dict[str, AdmissionClassStatsSchema]:
+    return admission_controller.snapshot()
+
+
+@router.get(
+    "/startup",
+    description="Duration of each startup phase of this worker, in milliseconds.",
+)
+async def startup_profile(
+    container: Annotated[Container, Depends(get_container)],
+) -> dict[str, float]:
+    return container.startup_profile
+
+
+async def authorized_profiler(
+    profiler: Annotated[Profiler, Depends(get_profiler)],
+    x_profile_token: Annotated[str | None, Header()] = None,
+) -> Profiler:
+    if not profiler.authorized(x_profile_token):
+        raise HTTPException(
+            HTTP_403_FORBIDDEN, "Profiling is disabled or the token is wrong"
+        )
+    return profiler
+
+
+def profiles(profiler: Profiler) -> ProfilesSchema:
+    return ProfilesSchema(
+        targets=[
+            ProfileTargetSchema(
+                method=target.method,
+                route=target.route,
+                count=target.count,
+                mode=target.mode,
+            )
+            for target in profiler.targets.values()
+        ],
+        files=profiler.files(),
+    )
+
+
+@router.get(
+    "/profiles",
+    description="Routes armed for profiling on this worker and the saved profiles.",
+)
+async def list_profiles(
+    profiler: Annotated[Profiler, Depends(authorized_profiler)],
+) -> ProfilesSchema:
+    return profiles(profiler)
+
+
+@router.post(
+    "/profiles",
+    description="Profiles the next count requests this worker serves for a route.",
+)
+async def arm_profiling(
+    target: ProfileTargetSchema,
+    request: Request,
+    profiler: Annotated[Profiler, Depends(authorized_profiler)],
+) -> ProfilesSchema:
+    method = target.method.upper()
+    if not any(
+        getattr(route, "path", None) == target.route
+        and method in getattr(route, "methods", ())
+        for route in request.app.routes
+    ):
+        raise HTTPException(
+            HTTP_404_NOT_FOUND, "Route " + method + " " + target.route + " not found"
+        )
+    profiler.arm(method, target.route, target.count, target.mode)
+    return profiles(profiler)
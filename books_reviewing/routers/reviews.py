@@ -1,13 +1,21 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import Params
 from fastapi_pagination.links import Page
 from odmantic import ObjectId
 
+from books_reviewing.deadlines import RequestDeadline
 from books_reviewing.dependencies import get_reviews_service
 from books_reviewing.models import Review
-from books_reviewing.schemas.base import SortEnum
+from books_reviewing.responses import (
+    FastJSONResponse,
+    trusted_response,
+    streaming_json_response,
+)
+from books_reviewing.routing import NegotiatedRoute
+from books_reviewing.schemas.base import SortEnum, PageQuery, SizeQuery
 from books_reviewing.schemas.reviews import (
     ReviewPatchSchema,
     BaseReviewSchema,
@@ -15,7 +23,9 @@ from books_reviewing.schemas.reviews import (
 )
 from books_reviewing.services.reviews import ReviewsService
 
-router = APIRouter()
+router = APIRouter(
+    route_class=NegotiatedRoute, dependencies=[Depends(RequestDeadline())]
+)
 
 ReviewsServiceDep = Annotated[ReviewsService, Depends(get_reviews_service)]
 
@@ -36,26 +46,66 @@ async def update(
     return await reviews_service.update(review_id, review_new)
 
 
-@router.get("/{review_id}")
-async def get_one(review_id: ObjectId, reviews_service: ReviewsServiceDep) -> Review:
-    return await reviews_service.get_one(review_id)
+@router.get(
+    "/search",
+    description="Relevance-ranked full-text search.",
+    response_model=Page[Review],
+)
+async def search(
+    reviews_service: ReviewsServiceDep,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    author_id: ObjectId = None,
+    page: PageQuery = None,
+    size: SizeQuery = None,
+) -> FastJSONResponse:
+    items, total_count = await reviews_service.search(q, author_id, page, size)
+    params = Params().model_construct(page=page, size=size)
+    return trusted_response(Page.create(items=items, params=params, total=total_count))
 
 
-@router.get("/")
+@router.get(
+    "/export",
+    description="Streams all matching reviews as a JSON array, without paging.",
+    response_model=list[Review],
+)
+async def export(
+    reviews_service: ReviewsServiceDep,
+    filter_attributes: Annotated[list[ReviewFilterEnum], Query()] = None,
+    filter_values: Annotated[list[str], Query()] = None,
+    sort: ReviewFilterEnum = None,
+    sort_direction: SortEnum = None,
+) -> StreamingResponse:
+    return await streaming_json_response(
+        reviews_service.export_documents(
+            filter_attributes, filter_values, sort, sort_direction
+        )
+    )
+
+
+@router.get("/{review_id}", response_model=Review)
+async def get_one(
+    review_id: ObjectId, reviews_service: ReviewsServiceDep
+) -> FastJSONResponse:
+    return trusted_response(await reviews_service.get_one(review_id))
+
+
+@router.get("/", response_model=Page[Review])
 async def query(
     reviews_service: ReviewsServiceDep,
     filter_attributes: Annotated[list[ReviewFilterEnum], Query()] = None,
     filter_values: Annotated[list[str], Query()] = None,
     sort: ReviewFilterEnum = None,
     sort_direction: SortEnum = None,
-    page: int = None,
-    size: int = None,
-) -> Page[Review]:
-    items, total_count = await reviews_service.query(
+    page: PageQuery = None,
+    size: SizeQuery = None,
+) -> FastJSONResponse:
+    items, total_count = await reviews_service.query_documents(
         filter_attributes, filter_values, sort, sort_direction, page, size
     )
     params = Params().model_construct(page=page, size=size)
-    return Page.create(items=items, params=params, total=total_count)
+    return trusted_response(
+        Page.create(items=items, params=params, total=total_count), mode="python"
+    )
 
 
 @router.delete("/{review_id}", status_code=204)
@@ -1,21 +1,33 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import Params
 from fastapi_pagination.links import Page
 from odmantic import ObjectId
+from pydantic import AfterValidator
 
+from books_reviewing.deadlines import RequestDeadline
 from books_reviewing.dependencies import get_users_service
 from books_reviewing.models import User
-from books_reviewing.schemas.base import SortEnum
+from books_reviewing.responses import (
+    FastJSONResponse,
+    trusted_response,
+    streaming_json_response,
+)
+from books_reviewing.routing import NegotiatedRoute
+from books_reviewing.schemas.base import SortEnum, PageQuery, SizeQuery
 from books_reviewing.schemas.users import (
     UserPatchSchema,
     BaseUserSchema,
     UserFilterEnum,
+    validate_email,
 )
 from books_reviewing.services.users import UsersService
 
-router = APIRouter()
+router = APIRouter(
+    route_class=NegotiatedRoute, dependencies=[Depends(RequestDeadline())]
+)
 
 UsersServiceDep = Annotated[UsersService, Depends(get_users_service)]
 
@@ -32,26 +44,55 @@ async def update(
     return await users_service.update(user_id, user_new)
 
 
-@router.get("/{user_id}")
-async def get_one(user_id: ObjectId, users_service: UsersServiceDep) -> User:
-    return await users_service.get_one(user_id)
+@router.get("/by-email/{email}", response_model=User)
+async def get_one_by_email(
+    email: Annotated[str, AfterValidator(validate_email)],
+    users_service: UsersServiceDep,
+) -> FastJSONResponse:
+    return trusted_response(await users_service.get_one_by_email(email))
+
+
+@router.get(
+    "/export",
+    description="Streams all matching users as a JSON array, without paging.",
+    response_model=list[User],
+)
+async def export(
+    users_service: UsersServiceDep,
+    filter_attributes: Annotated[list[UserFilterEnum], Query()] = None,
+    filter_values: Annotated[list[str], Query()] = None,
+    sort: UserFilterEnum = None,
+    sort_direction: SortEnum = None,
+) -> StreamingResponse:
+    return await streaming_json_response(
+        users_service.export_documents(
+            filter_attributes, filter_values, sort, sort_direction
+        )
+    )
+
+
+@router.get("/{user_id}", response_model=User)
+async def get_one(
+    user_id: ObjectId, users_service: UsersServiceDep
+) -> FastJSONResponse:
+    return trusted_response(await users_service.get_one(user_id))
 
 
-@router.get("/")
+@router.get("/", response_model=Page[User])
 async def query(
     users_service: UsersServiceDep,
     filter_attributes: Annotated[list[UserFilterEnum], Query()] = None,
     filter_values: Annotated[list[str], Query()] = None,
     sort: UserFilterEnum = None,
     sort_direction: SortEnum = None,
-    page: int = None,
-    size: int = None,
-) -> Page[User]:
+    page: PageQuery = None,
+    size: SizeQuery = None,
+) -> FastJSONResponse:
     items, total_count = await users_service.query(
         filter_attributes, filter_values, sort, sort_direction, page, size
     )
     params = Params().model_construct(page=page, size=size)
-    return Page.create(items=items, params=params, total=total_count)
+    return trusted_response(Page.create(items=items, params=params, total=total_count))
 
 
 @router.delete("/{user_id}", status_code=204)
@@ -0,0 +1,69 @@
+from typing import Any, Callable, Coroutine
+
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from books_reviewing.responses import (
+    BINARY_CODECS,
+    JSON_MEDIA_TYPE,
+    response_media_type,
+)
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    best_media_type, best_quality = JSON_MEDIA_TYPE, 0.0
+    for media_range in (accept or "").split(","):
+        media_type, *parameters = (part.strip() for part in media_range.split(";"))
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type.lower() in BINARY_CODECS and quality > best_quality:
+            best_media_type, best_quality = media_type.lower(), quality
+        elif media_type in (JSON_MEDIA_TYPE, "*/*") and quality > best_quality:
+            best_media_type, best_quality = JSON_MEDIA_TYPE, quality
+    return best_media_type
+
+
+async def decode_binary_body(request: Request) -> Request:
+    content_type = request.headers.get("content-type", "").split(";")[0].lower()
+    if content_type not in BINARY_CODECS:
+        return request
+    body = await request.body()
+    try:
+        data = BINARY_CODECS[content_type][1](body) if body else None
+    except Exception:
+        raise RequestValidationError("Body could not be decoded!")
+
+    scope = dict(request.scope)
+    scope["headers"] = [
+        (name, value) for name, value in scope["headers"] if name != b"content-type"
+    ] + [(b"content-type", JSON_MEDIA_TYPE.encode())]
+    decoded_request = Request(scope, request.receive)
+    decoded_request._body = body
+    decoded_request._json = data
+    return decoded_request
+
+
+class NegotiatedRoute(APIRoute):
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def negotiated_route_handler(request: Request) -> Response:
+            token = response_media_type.set(
+                negotiate_media_type(request.headers.get("accept"))
+            )
+            try:
+                response = await route_handler(await decode_binary_body(request))
+            finally:
+                response_media_type.reset(token)
+            response.headers["vary"] = "Accept"
+            return response
+
+        return negotiated_route_handler
@@ -0,0 +1,195 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import threading
+from multiprocessing.context import SpawnProcess
+from types import FrameType
+
+import uvicorn
+from uvicorn._subprocess import get_subprocess
+
+from books_reviewing.metrics import clear_snapshots
+
+logger = logging.getLogger("uvicorn.error")
+
+SERVER_OPTIONS_FROM_ENV = {
+    "host": ("HOST", str),
+    "port": ("PORT", int),
+    "workers": ("WEB_CONCURRENCY", int),
+    "loop": ("SERVER_LOOP", str),
+    "http": ("SERVER_HTTP", str),
+    "backlog": ("SERVER_BACKLOG", int),
+    "timeout_keep_alive": ("SERVER_KEEP_ALIVE_TIMEOUT", int),
+    "timeout_graceful_shutdown": ("SERVER_GRACEFUL_SHUTDOWN_TIMEOUT", int),
+    "drain_seconds": ("SERVER_DRAIN_SECONDS", float),
+}
+
+FALLBACKS = {
+    "loop": {"uvloop": "asyncio"},
+    "http": {"httptools": "h11"},
+}
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def server_options_from_env() -> dict:
+    options = {
+        "host": "0.0.0.0",
+        "port": 8000,
+        "workers": 1,
+        "loop": "auto",
+        "http": "auto",
+        "backlog": 2048,
+        "timeout_keep_alive": 5,
+        "timeout_graceful_shutdown": 30,
+        "drain_seconds": 0.0,
+    }
+    for option, (variable, parse) in SERVER_OPTIONS_FROM_ENV.items():
+        value = os.getenv(variable)
+        if value:
+            options[option] = parse(value)
+    return options
+
+
+def select_implementation(kind: str, preferred: str) -> str:
+    """Resolves "auto" to the fast implementation when it is installed and
+    falls back to the pure Python one when the requested one is not."""
+    ((fast, fallback),) = FALLBACKS[kind].items()
+    if preferred not in ("auto", fast):
+        return preferred
+    if importlib.util.find_spec(fast) is not None:
+        return fast
+    if preferred == fast:
+        logger.warning("%s is not installed, using %s instead", fast, fallback)
+    return fallback
+
+
+class DrainingServer(uvicorn.Server):
+    """On SIGTERM, reports the worker as not ready and keeps serving for
+    drain_seconds so load balancers stop routing to it, then shuts down
+    gracefully. A second signal or SIGINT shuts down right away."""
+
+    def __init__(self, config: uvicorn.Config, drain_seconds: float = 0):
+        super().__init__(config)
+        self.drain_seconds = drain_seconds
+        self.draining = False
+
+    def handle_exit(self, sig: int, frame: FrameType | None):
+        if sig != signal.SIGTERM or self.draining or not self.drain_seconds:
+            super().handle_exit(sig, frame)
+            return
+        self.draining = True
+        container = getattr(self.__fastapi_app().state, "container", None)
+        if container is not None:
+            container.drain()
+        logger.info("Draining for %.1f seconds", self.drain_seconds)
+        asyncio.get_running_loop().call_later(
+            self.drain_seconds, super().handle_exit, sig, frame
+        )
+
+    def __fastapi_app(self):
+        # Unwrap the middlewares uvicorn puts around the application.
+        app = self.config.loaded_app
+        while not hasattr(app, "state") and hasattr(app, "app"):
+            app = app.app
+        return app
+
+
+class Supervisor:
+    """Runs worker processes on one shared listening socket, replaces the
+    ones that die and stops them all on SIGTERM or SIGINT."""
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        server: DrainingServer,
+        sockets: list[socket.socket],
+    ):
+        self.config = config
+        self.server = server
+        self.sockets = sockets
+        self.processes: list[SpawnProcess] = []
+        self.should_exit = threading.Event()
+        self.exit_signal = signal.SIGTERM
+
+    def run(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.handle_exit)
+        logger.info("Starting %d workers", self.config.workers)
+        self.processes = [self.spawn() for _ in range(self.config.workers)]
+        while not self.should_exit.wait(1):
+            self.replace_dead_workers()
+        self.shutdown()
+
+    def handle_exit(self, sig: int, frame: FrameType | None):
+        self.exit_signal = sig
+        self.should_exit.set()
+
+    def spawn(self) -> SpawnProcess:
+        process = get_subprocess(self.config, self.server.run, self.sockets)
+        process.start()
+        return process
+
+    def replace_dead_workers(self):
+        for index, process in enumerate(self.processes):
+            if not process.is_alive():
+                logger.warning(
+                    "Worker %d exited with code %s, restarting",
+                    process.pid,
+                    process.exitcode,
+                )
+                process.join()
+                self.processes[index] = self.spawn()
+
+    def shutdown(self):
+        for process in self.processes:
+            if process.is_alive():
+                os.kill(process.pid, self.exit_signal)
+        timeout = (
+            self.server.drain_seconds + (self.config.timeout_graceful_shutdown or 0) + 5
+        )
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning("Worker %d did not stop in time, killing", process.pid)
+                process.kill()
+                process.join()
+        logger.info("All workers stopped")
+
+
+def run(app: str = "books_reviewing.main:app", factory: bool = False, **overrides):
+    options = server_options_from_env() | overrides
+    drain_seconds = options.pop("drain_seconds")
+    options["loop"] = select_implementation("loop", options["loop"])
+    options["http"] = select_implementation("http", options["http"])
+    config = uvicorn.Config(app, factory=factory, **options)
+    server = DrainingServer(config, drain_seconds)
+    logger.info(
+        "Serving with %d workers, %s event loop and %s parser",
+        config.workers,
+        config.loop,
+        config.http,
+    )
+
+    metrics_directory = os.getenv("METRICS_DIR")
+    if metrics_directory:
+        # Snapshots of a previous run would be merged into this one's.
+        os.makedirs(metrics_directory, exist_ok=True)
+        clear_snapshots(metrics_directory)
+
+    if config.workers <= 1:
+        server.run()
+        return
+    Supervisor(config, server, [config.bind_socket()]).run()
+
+
+if __name__ == "__main__":
+    run()
@@ -15,6 +15,11 @@ class AuthorOutSchema(BaseAuthorSchema):
     books_count: int
 
 
+class AuthorSuggestionSchema(BaseModel):
+    id: ObjectId
+    name: str
+
+
 class AuthorPatchSchema(BaseModel):
     name: Optional[str] = Field(min_length=3, max_length=200, default=None)
     bio: Optional[str] = None
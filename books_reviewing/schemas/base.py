@@ -1,4 +1,15 @@
+import os
 from enum import Enum
+from typing import Annotated
+
+from fastapi import Query
+
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 100))
+
+PageQuery = Annotated[int, Query(ge=1)]
+SizeQuery = Annotated[
+    int, Query(ge=1, le=MAX_PAGE_SIZE, description="Use /export for bigger reads.")
+]
 
 
 class SortEnum(str, Enum):
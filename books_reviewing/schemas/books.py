@@ -1,21 +1,29 @@
+import re
 from datetime import datetime
 from enum import Enum
 from typing import Optional
 
 from odmantic import ObjectId
-from pydantic import BaseModel, model_validator, Field
+from pydantic import BaseModel, model_validator, field_validator, Field
+
+ISBN_DESCRIPTION = "ISBN-10 or ISBN-13, hyphens allowed. Stored as ISBN-13."
 
 
 class BaseBookSchema(BaseModel):
-    isbn: str = Field(min_length=10, max_length=13)
+    isbn: str = Field(description=ISBN_DESCRIPTION)
     title: str = Field(min_length=3, max_length=300)
     description: str = Field(min_length=10, max_length=1000)
     publication_date: datetime
     author_id: ObjectId
 
+    @field_validator("isbn")
+    @classmethod
+    def isbn_must_be_valid(cls, value: str) -> str:
+        return normalize_isbn(value)
+
 
 class BookPatchSchema(BaseModel):
-    isbn: Optional[str] = Field(min_length=10, max_length=13, default=None)
+    isbn: Optional[str] = Field(description=ISBN_DESCRIPTION, default=None)
     title: Optional[str] = Field(min_length=3, max_length=300, default=None)
     description: Optional[str] = Field(min_length=10, max_length=1000, default=None)
     publication_date: Optional[datetime] = None
@@ -33,12 +41,50 @@ class BookPatchSchema(BaseModel):
             raise ValueError("All fields cannot be empty")
         return self
 
+    @field_validator("isbn")
+    @classmethod
+    def isbn_must_be_valid(cls, value: Optional[str]) -> Optional[str]:
+        return None if value is None else normalize_isbn(value)
+
 
 class BookOutSchema(BaseBookSchema):
     id: Optional[ObjectId] = None
     average_rating: float
 
 
+class BookSuggestionSchema(BaseModel):
+    id: ObjectId
+    title: str
+
+
+class BookIsbnBatchSchema(BaseModel):
+    isbns: list[str] = Field(min_length=1, max_length=500)
+
+    @field_validator("isbns")
+    @classmethod
+    def isbns_must_be_valid(cls, value: list[str]) -> list[str]:
+        return [normalize_isbn(isbn) for isbn in value]
+
+
+def normalize_isbn(value: str) -> str:
+    isbn = re.sub(r"[\s-]", "", value).upper()
+
+    if re.fullmatch(r"[0-9]{9}[0-9X]", isbn):
+        digits = [10 if char == "X" else int(char) for char in isbn]
+        if sum((10 - i) * digit for i, digit in enumerate(digits)) % 11 == 0:
+            return _with_isbn_13_check_digit("978" + isbn[:9])
+    elif re.fullmatch(r"97[89][0-9]{10}", isbn):
+        if _with_isbn_13_check_digit(isbn[:12]) == isbn:
+            return isbn
+
+    raise ValueError("ISBN is not valid")
+
+
+def _with_isbn_13_check_digit(isbn: str) -> str:
+    total = sum(int(char) * (3 if i % 2 else 1) for i, char in enumerate(isbn))
+    return isbn + str((10 - total % 10) % 10)
+
+
 class BookFilterEnum(str, Enum):
     isbn = "isbn"
     title = "title"
@@ -0,0 +1,53 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class LatencySchema(BaseModel):
+    count: int
+    failures: int
+    mean_ms: float
+    max_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+class PoolStatsSchema(BaseModel):
+    max_size: Optional[int] = None
+    min_size: Optional[int] = None
+    open: int
+    in_use: int
+    checkout_wait: LatencySchema
+
+
+class DatabaseStatsSchema(BaseModel):
+    pools: dict[str, PoolStatsSchema]
+    commands: dict[str, LatencySchema]
+
+
+class AdmissionClassStatsSchema(BaseModel):
+    concurrency: int
+    queue_size: int
+    in_flight: int
+    queued: int
+    admitted: int
+    rejected: int
+    timed_out: int
+
+
+class HealthSchema(BaseModel):
+    status: str
+    detail: Optional[str] = None
+
+
+class ProfileTargetSchema(BaseModel):
+    method: str = "GET"
+    route: str
+    count: int = Field(default=1, ge=1, le=100)
+    mode: Optional[Literal["sample", "cprofile"]] = None
+
+
+class ProfilesSchema(BaseModel):
+    targets: list[ProfileTargetSchema]
+    files: list[str]
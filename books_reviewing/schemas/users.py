@@ -57,7 +57,7 @@ class UserPatchSchema(BaseModel):
 def validate_email(value: str) -> str:
     if not re.compile(r"[^@]+@[^@]+\.[^@]+").match(value):
         raise ValueError("Email is not valid")
-    return value
+    return value.lower()
 
 
 def validate_phone(value: str) -> str:
@@ -1,11 +1,13 @@
-import asyncio
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AsyncIterator
 
 from fastapi.exceptions import RequestValidationError
 from odmantic import ObjectId
 
+from books_reviewing.concurrency import gather, gather_writes
+from books_reviewing.deadlines import separate_deadline
 from books_reviewing.exceptions import ObjectNotFoundException
 from books_reviewing.models import Author
+from books_reviewing.prefix_index import PrefixIndex
 from books_reviewing.repositories.authors import AuthorsRepository
 from books_reviewing.schemas.base import SortEnum
 from books_reviewing.schemas.authors import (
@@ -13,14 +15,18 @@ from books_reviewing.schemas.authors import (
     AuthorPatchSchema,
     AuthorFilterEnum,
     AuthorOutSchema,
+    AuthorSuggestionSchema,
 )
+from books_reviewing.tracing import traced_methods
 
 if TYPE_CHECKING:
     from books_reviewing.services.books import BooksService
 
 
+@traced_methods
 class AuthorsService:
     books_service: "BooksService"
+    names_index: PrefixIndex
 
     __authors_repository: AuthorsRepository
 
@@ -31,10 +37,13 @@ class AuthorsService:
     ):
         self.__authors_repository = authors_repository
         self.books_service = books_service
+        self.names_index = PrefixIndex()
 
     async def create(self, author: BaseAuthorSchema) -> Author:
         author_in_db = Author(**author.model_dump(exclude={"id"}))
-        return await self.__authors_repository.save(author_in_db)
+        author_in_db = await self.__authors_repository.save(author_in_db)
+        self.names_index.add(author_in_db.id, author_in_db.name)
+        return author_in_db
 
     async def update(
         self, author_id: ObjectId, author_new: AuthorPatchSchema
@@ -42,14 +51,15 @@ class AuthorsService:
         author = await self.__get_author_by_id_if_exists(author_id)
         author.model_update(author_new, exclude_unset=True)
         await self.__authors_repository.save(author)
+        self.names_index.add(author.id, author.name)
         return author
 
     async def get_one(self, author_id: ObjectId) -> AuthorOutSchema:
-        author, books_count = await asyncio.gather(
-            self.__get_author_by_id_if_exists(author_id),
+        author, books_count = await gather(
+            self.__get_author_document_by_id_if_exists(author_id),
             self.books_service.get_book_count_for_author(author_id),
         )
-        return AuthorOutSchema(**author.model_dump(), books_count=books_count)
+        return AuthorOutSchema.model_construct(**author, books_count=books_count)
 
     async def query(
         self,
@@ -60,29 +70,76 @@ class AuthorsService:
         page: int = None,
         size: int = None,
     ) -> (list[Author], int):
-        filters_dict = {}
-        if filter_attributes and filter_values:
-            if len(filter_attributes) != len(filter_values):
-                raise RequestValidationError(
-                    "Wrong number of filter attributes and values!"
-                )
-
-            filters_dict = dict(zip(filter_attributes, filter_values))
-
         return await self.__authors_repository.query(
-            filters_dict=filters_dict,
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
             sort=sort if sort else AuthorFilterEnum.name,
             sort_direction=sort_direction.lower() if sort_direction else "asc",
             page=page if page else 1,
             size=size if size else 10,
         )
 
+    def export_documents(
+        self,
+        filter_attributes: list[AuthorFilterEnum] = None,
+        filter_values: list[str] = None,
+        sort: AuthorFilterEnum = None,
+        sort_direction: SortEnum = None,
+    ) -> AsyncIterator[dict]:
+        return self.__authors_repository.export_documents(
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
+            sort=sort if sort else AuthorFilterEnum.name,
+            sort_direction=sort_direction.lower() if sort_direction else "asc",
+        )
+
     async def delete(self, author_id: ObjectId):
         author = await self.__get_author_by_id_if_exists(author_id)
-        await asyncio.gather(
+        await gather_writes(
             self.__authors_repository.delete(author),
             self.books_service.delete_books_for_author(author_id),
         )
+        self.names_index.remove(author_id)
+
+    async def build_names_index(self):
+        self.names_index.build(await self.__authors_repository.get_names())
+
+    def suggest(self, prefix: str, limit: int = None) -> list[AuthorSuggestionSchema]:
+        return [
+            AuthorSuggestionSchema(id=author_id, name=name)
+            for author_id, name in self.names_index.suggest(prefix, limit or 10)
+        ]
+
+    async def merge(
+        self, author_id: ObjectId, target_author_id: ObjectId
+    ) -> AuthorOutSchema:
+        if author_id == target_author_id:
+            raise RequestValidationError("An author cannot be merged into itself!")
+
+        author, _ = await gather(
+            self.__get_author_by_id_if_exists(author_id),
+            self.__get_author_by_id_if_exists(target_author_id),
+        )
+        # Without a replica set there are no transactions, so the author is
+        # deleted first: of two concurrent merges of the same author only
+        # the one that deletes it goes on to move the books. If moving them
+        # fails the author is put back. A worker dying in between still
+        # leaves the books pointing at the deleted author, as does a book
+        # created for it while the merge runs.
+        if not await self.__authors_repository.delete_if_exists(author_id):
+            raise ObjectNotFoundException(
+                detail="Author with id " + str(author_id) + " not found"
+            )
+        try:
+            await self.books_service.reassign_books_for_author(
+                author_id, target_author_id
+            )
+        except Exception:
+            # Usually the deadline ran out, which would refuse the restore
+            # too, so it gets a budget of its own.
+            with separate_deadline():
+                await self.__authors_repository.save(author)
+            raise
+        self.names_index.remove(author_id)
+        return await self.get_one(target_author_id)
 
     async def __get_author_by_id_if_exists(self, author_id: ObjectId) -> Author:
         author = await self.__authors_repository.get_one(author_id)
@@ -91,3 +148,25 @@ class AuthorsService:
                 detail="Author with id " + str(author_id) + " not found"
             )
         return author
+
+    async def __get_author_document_by_id_if_exists(self, author_id: ObjectId) -> dict:
+        author = await self.__authors_repository.get_one_document(author_id)
+        if not author:
+            raise ObjectNotFoundException(
+                detail="Author with id " + str(author_id) + " not found"
+            )
+        return author
+
+    @staticmethod
+    def __build_filters_dict(
+        filter_attributes: list[AuthorFilterEnum], filter_values: list[str]
+    ) -> dict[str, str]:
+        filters_dict = {}
+        if filter_attributes and filter_values:
+            if len(filter_attributes) != len(filter_values):
+                raise RequestValidationError(
+                    "Wrong number of filter attributes and values!"
+                )
+
+            filters_dict = dict(zip(filter_attributes, filter_values))
+        return filters_dict
@@ -1,12 +1,13 @@
-import asyncio
 import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AsyncIterator
 
 from fastapi.exceptions import RequestValidationError
 from odmantic import ObjectId
 
+from books_reviewing.concurrency import gather, gather_writes
 from books_reviewing.exceptions import ObjectNotFoundException
 from books_reviewing.models import Book
+from books_reviewing.prefix_index import PrefixIndex
 from books_reviewing.repositories.books import BooksRepository
 from books_reviewing.schemas.base import SortEnum
 from books_reviewing.schemas.books import (
@@ -14,15 +15,20 @@ from books_reviewing.schemas.books import (
     BookPatchSchema,
     BookFilterEnum,
     BookOutSchema,
+    BookSuggestionSchema,
+    normalize_isbn,
 )
 from books_reviewing.services.authors import AuthorsService
+from books_reviewing.tracing import traced_methods
 
 if TYPE_CHECKING:
     from books_reviewing.services.reviews import ReviewsService
 
 
+@traced_methods
 class BooksService:
     reviews_service: "ReviewsService"
+    titles_index: PrefixIndex
 
     __books_repository: BooksRepository
     __authors_service: AuthorsService
@@ -36,11 +42,14 @@ class BooksService:
         self.__books_repository = books_repository
         self.__authors_service = authors_service
         self.reviews_service = reviews_service
+        self.titles_index = PrefixIndex()
 
     async def create(self, book: BaseBookSchema) -> Book:
         await self.__authors_service.get_one(book.author_id)
         book_in_db = Book(**book.model_dump())
-        return await self.__books_repository.save(book_in_db)
+        book_in_db = await self.__books_repository.save(book_in_db)
+        self.titles_index.add(book_in_db.id, book_in_db.title)
+        return book_in_db
 
     async def update(self, book_id: ObjectId, book_new: BookPatchSchema) -> Book:
         book = await self.__get_book_by_id_if_exists(book_id)
@@ -48,18 +57,33 @@ class BooksService:
             await self.__authors_service.get_one(book.author_id)
         book.model_update(book_new, exclude_unset=True)
         await self.__books_repository.save(book)
+        self.titles_index.add(book.id, book.title)
         return book
 
     async def get_one(self, book_id: ObjectId) -> BookOutSchema:
-        book, average_rating = await asyncio.gather(
-            self.__get_book_by_id_if_exists(book_id),
+        book, average_rating = await gather(
+            self.__get_book_document_by_id_if_exists(book_id),
             self.reviews_service.get_average_rating_for_book(book_id),
         )
-        return BookOutSchema(**book.model_dump(), average_rating=average_rating)
+        return BookOutSchema.model_construct(**book, average_rating=average_rating)
+
+    async def get_one_by_isbn(self, isbn: str) -> BookOutSchema:
+        book = await self.__books_repository.get_one_by_isbn(isbn)
+        if not book:
+            raise ObjectNotFoundException(
+                detail="Book with ISBN " + isbn + " not found"
+            )
+        average_rating = await self.reviews_service.get_average_rating_for_book(book.id)
+        return BookOutSchema.model_construct(
+            **book.model_dump(), average_rating=average_rating
+        )
+
+    async def get_by_isbns(self, isbns: list[str]) -> list[Book]:
+        return await self.__books_repository.get_by_isbns(isbns)
 
     async def get_one_without_rating(self, book_id: ObjectId) -> BookOutSchema:
-        book = await self.__get_book_by_id_if_exists(book_id)
-        return BookOutSchema(**book.model_dump(), average_rating=0)
+        book = await self.__get_book_document_by_id_if_exists(book_id)
+        return BookOutSchema.model_construct(**book, average_rating=0)
 
     async def query(
         self,
@@ -70,46 +94,81 @@ class BooksService:
         page: int = None,
         size: int = None,
     ) -> (list[Book], int):
-        filters_dict = {}
-        if filter_attributes and filter_values:
-            if len(filter_attributes) != len(filter_values):
-                raise RequestValidationError(
-                    "Wrong number of filter attributes and values!"
-                )
-            for attribute, value in zip(filter_attributes, filter_values):
-                if attribute == BookFilterEnum.publication_date:
-                    filters_dict[attribute.lower()] = datetime.datetime.fromisoformat(
-                        value
-                    )
-                elif attribute == BookFilterEnum.author_id:
-                    filters_dict[attribute.lower()] = ObjectId(value)
-                else:
-                    filters_dict[attribute.lower()] = value
         return await self.__books_repository.query(
-            filters_dict=filters_dict,
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
             sort=sort if sort else BookFilterEnum.title,
             sort_direction=sort_direction.lower() if sort_direction else "asc",
             page=page if page else 1,
             size=size if size else 10,
         )
 
+    def export_documents(
+        self,
+        filter_attributes: list[BookFilterEnum] = None,
+        filter_values: list[str] = None,
+        sort: BookFilterEnum = None,
+        sort_direction: SortEnum = None,
+    ) -> AsyncIterator[dict]:
+        return self.__books_repository.export_documents(
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
+            sort=sort if sort else BookFilterEnum.title,
+            sort_direction=sort_direction.lower() if sort_direction else "asc",
+        )
+
+    async def search(
+        self,
+        text: str,
+        author_id: ObjectId = None,
+        page: int = None,
+        size: int = None,
+    ) -> (list[Book], int):
+        return await self.__books_repository.search(
+            text=text,
+            author_id=author_id,
+            page=page if page else 1,
+            size=size if size else 10,
+        )
+
+    async def get_book_ids_for_author(self, author_id: ObjectId) -> list[ObjectId]:
+        books = await self.__books_repository.get_books_for_author(author_id)
+        return [book.id for book in books]
+
     async def get_book_count_for_author(self, author_id: ObjectId) -> int:
         return await self.__books_repository.count_books_for_author(author_id)
 
+    async def reassign_books_for_author(
+        self, author_id: ObjectId, target_author_id: ObjectId
+    ) -> int:
+        return await self.__books_repository.reassign_books_for_author(
+            author_id, target_author_id
+        )
+
     async def delete_books_for_author(self, author_id: ObjectId):
         books = await self.__books_repository.get_books_for_author(author_id)
         book_ids = [book.id for book in books]
-        await asyncio.gather(
+        await gather_writes(
             self.__books_repository.delete_books_for_author(author_id),
             self.reviews_service.delete_reviews_for_books(book_ids),
         )
+        for book_id in book_ids:
+            self.titles_index.remove(book_id)
 
     async def delete(self, book_id: ObjectId):
         book = await self.__get_book_by_id_if_exists(book_id)
-        await asyncio.gather(
+        await gather_writes(
             self.__books_repository.delete(book),
             self.reviews_service.delete_reviews_for_book(book_id),
         )
+        self.titles_index.remove(book_id)
+
+    async def build_titles_index(self):
+        self.titles_index.build(await self.__books_repository.get_titles())
+
+    def suggest(self, prefix: str, limit: int = None) -> list[BookSuggestionSchema]:
+        return [
+            BookSuggestionSchema(id=book_id, title=title)
+            for book_id, title in self.titles_index.suggest(prefix, limit or 10)
+        ]
 
     async def __get_book_by_id_if_exists(self, book_id: ObjectId) -> Book:
         book = await self.__books_repository.get_one(book_id)
@@ -118,3 +177,37 @@ class BooksService:
                 detail="Book with id " + str(book_id) + " not found"
             )
         return book
+
+    async def __get_book_document_by_id_if_exists(self, book_id: ObjectId) -> dict:
+        book = await self.__books_repository.get_one_document(book_id)
+        if not book:
+            raise ObjectNotFoundException(
+                detail="Book with id " + str(book_id) + " not found"
+            )
+        return book
+
+    @staticmethod
+    def __build_filters_dict(
+        filter_attributes: list[BookFilterEnum], filter_values: list[str]
+    ) -> dict[str, str | ObjectId | datetime.datetime]:
+        filters_dict = {}
+        if filter_attributes and filter_values:
+            if len(filter_attributes) != len(filter_values):
+                raise RequestValidationError(
+                    "Wrong number of filter attributes and values!"
+                )
+            for attribute, value in zip(filter_attributes, filter_values):
+                if attribute == BookFilterEnum.publication_date:
+                    filters_dict[attribute.lower()] = datetime.datetime.fromisoformat(
+                        value
+                    )
+                elif attribute == BookFilterEnum.author_id:
+                    filters_dict[attribute.lower()] = ObjectId(value)
+                elif attribute == BookFilterEnum.isbn:
+                    try:
+                        filters_dict[attribute.lower()] = normalize_isbn(value)
+                    except ValueError:
+                        raise RequestValidationError("ISBN is not valid!")
+                else:
+                    filters_dict[attribute.lower()] = value
+        return filters_dict
@@ -1,8 +1,9 @@
-import asyncio
+from typing import AsyncIterator
 
 from fastapi.exceptions import RequestValidationError
 from odmantic import ObjectId
 
+from books_reviewing.concurrency import gather
 from books_reviewing.exceptions import ObjectNotFoundException
 from books_reviewing.models import Review
 from books_reviewing.repositories.reviews import ReviewsRepository
@@ -14,8 +15,10 @@ from books_reviewing.schemas.reviews import (
 )
 from books_reviewing.services.books import BooksService
 from books_reviewing.services.users import UsersService
+from books_reviewing.tracing import traced_methods
 
 
+@traced_methods
 class ReviewsService:
     books_service: BooksService
     users_service: UsersService
@@ -33,7 +36,7 @@ class ReviewsService:
         self.users_service = users_service
 
     async def create(self, review: BaseReviewSchema) -> Review:
-        await asyncio.gather(
+        await gather(
             self.books_service.get_one_without_rating(review.book_id),
             self.users_service.get_one(review.user_id),
         )
@@ -54,7 +57,7 @@ class ReviewsService:
             tasks.append(self.users_service.get_one(review_new.user_id))
 
         if len(tasks) > 0:
-            await asyncio.gather(*tasks)
+            await gather(*tasks)
 
         review.model_update(review_new, exclude_unset=True)
         await self.__reviews_repository.save(review)
@@ -72,25 +75,61 @@ class ReviewsService:
         page: int = None,
         size: int = None,
     ) -> (list[Review], int):
-        filters_dict = {}
-        if filter_attributes and filter_values:
-            if len(filter_attributes) != len(filter_values):
-                raise RequestValidationError(
-                    "Wrong number of filter attributes and values!"
-                )
-            for attribute, value in zip(filter_attributes, filter_values):
-                if attribute in [ReviewFilterEnum.book_id, ReviewFilterEnum.user_id]:
-                    filters_dict[attribute.lower()] = ObjectId(value)
-                else:
-                    filters_dict[attribute.lower()] = value
         return await self.__reviews_repository.query(
-            filters_dict=filters_dict,
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
             sort=sort if sort else ReviewFilterEnum.comment,
             sort_direction=sort_direction.lower() if sort_direction else "asc",
             page=page if page else 1,
             size=size if size else 10,
         )
 
+    async def query_documents(
+        self,
+        filter_attributes: list[ReviewFilterEnum] = None,
+        filter_values: list[str] = None,
+        sort: ReviewFilterEnum = None,
+        sort_direction: SortEnum = None,
+        page: int = None,
+        size: int = None,
+    ) -> (list[dict], int):
+        return await self.__reviews_repository.query_documents(
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
+            sort=sort if sort else ReviewFilterEnum.comment,
+            sort_direction=sort_direction.lower() if sort_direction else "asc",
+            page=page if page else 1,
+            size=size if size else 10,
+        )
+
+    def export_documents(
+        self,
+        filter_attributes: list[ReviewFilterEnum] = None,
+        filter_values: list[str] = None,
+        sort: ReviewFilterEnum = None,
+        sort_direction: SortEnum = None,
+    ) -> AsyncIterator[dict]:
+        return self.__reviews_repository.export_documents(
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
+            sort=sort if sort else ReviewFilterEnum.comment,
+            sort_direction=sort_direction.lower() if sort_direction else "asc",
+        )
+
+    async def search(
+        self,
+        text: str,
+        author_id: ObjectId = None,
+        page: int = None,
+        size: int = None,
+    ) -> (list[Review], int):
+        book_ids = None
+        if author_id:
+            book_ids = await self.books_service.get_book_ids_for_author(author_id)
+        return await self.__reviews_repository.search(
+            text=text,
+            book_ids=book_ids,
+            page=page if page else 1,
+            size=size if size else 10,
+        )
+
     async def get_average_rating_for_book(self, book_id: ObjectId) -> float:
         return await self.__reviews_repository.get_average_rating_for_book(book_id)
 
@@ -114,3 +153,20 @@ class ReviewsService:
                 detail="Review with id " + str(review_id) + " not found"
             )
         return review
+
+    @staticmethod
+    def __build_filters_dict(
+        filter_attributes: list[ReviewFilterEnum], filter_values: list[str]
+    ) -> dict[str, str | ObjectId]:
+        filters_dict = {}
+        if filter_attributes and filter_values:
+            if len(filter_attributes) != len(filter_values):
+                raise RequestValidationError(
+                    "Wrong number of filter attributes and values!"
+                )
+            for attribute, value in zip(filter_attributes, filter_values):
+                if attribute in [ReviewFilterEnum.book_id, ReviewFilterEnum.user_id]:
+                    filters_dict[attribute.lower()] = ObjectId(value)
+                else:
+                    filters_dict[attribute.lower()] = value
+        return filters_dict
@@ -1,11 +1,11 @@
-import asyncio
 import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AsyncIterator
 
 from fastapi.exceptions import RequestValidationError
 from odmantic import ObjectId
 
-from books_reviewing.exceptions import ObjectNotFoundException
+from books_reviewing.concurrency import gather, gather_writes
+from books_reviewing.exceptions import ObjectNotFoundException, ConflictException
 from books_reviewing.models import User
 from books_reviewing.repositories.users import UsersRepository
 from books_reviewing.schemas.base import SortEnum
@@ -14,11 +14,13 @@ from books_reviewing.schemas.users import (
     UserPatchSchema,
     UserFilterEnum,
 )
+from books_reviewing.tracing import traced_methods
 
 if TYPE_CHECKING:
     from books_reviewing.services.reviews import ReviewsService
 
 
+@traced_methods
 class UsersService:
     reviews_service: "ReviewsService"
 
@@ -33,11 +35,14 @@ class UsersService:
         self.reviews_service = reviews_service
 
     async def create(self, user: BaseUserSchema) -> User:
+        await self.__check_email_is_free(user.email)
         user_in_db = User(**user.model_dump())
         return await self.__users_repository.save(user_in_db)
 
     async def update(self, user_id: ObjectId, user_new: UserPatchSchema) -> User:
         user = await self.__get_user_by_id_if_exists(user_id)
+        if user_new.email and user_new.email != user.email:
+            await self.__check_email_is_free(user_new.email)
         user.model_update(user_new, exclude_unset=True)
         await self.__users_repository.save(user)
         return user
@@ -45,6 +50,14 @@ class UsersService:
     async def get_one(self, user_id: ObjectId) -> User:
         return await self.__get_user_by_id_if_exists(user_id)
 
+    async def get_one_by_email(self, email: str) -> User:
+        user = await self.__users_repository.get_one_by_email(email)
+        if not user:
+            raise ObjectNotFoundException(
+                detail="User with email " + email + " not found"
+            )
+        return user
+
     async def query(
         self,
         filter_attributes: list[UserFilterEnum] = None,
@@ -54,30 +67,30 @@ class UsersService:
         page: int = None,
         size: int = None,
     ) -> (list[User], int):
-        filters_dict = {}
-        if filter_attributes and filter_values:
-            if len(filter_attributes) != len(filter_values):
-                raise RequestValidationError(
-                    "Wrong number of filter attributes and values!"
-                )
-            for attribute, value in zip(filter_attributes, filter_values):
-                if attribute == UserFilterEnum.birthday:
-                    filters_dict[attribute.lower()] = datetime.datetime.fromisoformat(
-                        value
-                    )
-                else:
-                    filters_dict[attribute.lower()] = value
         return await self.__users_repository.query(
-            filters_dict=filters_dict,
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
             sort=sort if sort else UserFilterEnum.name,
             sort_direction=sort_direction.lower() if sort_direction else "asc",
             page=page if page else 1,
             size=size if size else 10,
         )
 
+    def export_documents(
+        self,
+        filter_attributes: list[UserFilterEnum] = None,
+        filter_values: list[str] = None,
+        sort: UserFilterEnum = None,
+        sort_direction: SortEnum = None,
+    ) -> AsyncIterator[dict]:
+        return self.__users_repository.export_documents(
+            filters_dict=self.__build_filters_dict(filter_attributes, filter_values),
+            sort=sort if sort else UserFilterEnum.name,
+            sort_direction=sort_direction.lower() if sort_direction else "asc",
+        )
+
     async def delete(self, user_id: ObjectId):
         user = await self.__get_user_by_id_if_exists(user_id)
-        await asyncio.gather(
+        await gather_writes(
             self.__users_repository.delete(user),
             self.reviews_service.delete_reviews_by_user(user_id),
         )
@@ -89,3 +102,30 @@ class UsersService:
                 detail="User with id " + str(user_id) + " not found"
             )
         return user
+
+    async def __check_email_is_free(self, email: str):
+        if await self.__users_repository.get_one_by_email(email):
+            raise ConflictException(
+                detail="User with email " + email + " already exists"
+            )
+
+    @staticmethod
+    def __build_filters_dict(
+        filter_attributes: list[UserFilterEnum], filter_values: list[str]
+    ) -> dict[str, str | datetime.datetime]:
+        filters_dict = {}
+        if filter_attributes and filter_values:
+            if len(filter_attributes) != len(filter_values):
+                raise RequestValidationError(
+                    "Wrong number of filter attributes and values!"
+                )
+            for attribute, value in zip(filter_attributes, filter_values):
+                if attribute == UserFilterEnum.birthday:
+                    filters_dict[attribute.lower()] = datetime.datetime.fromisoformat(
+                        value
+                    )
+                elif attribute == UserFilterEnum.email:
+                    filters_dict[attribute.lower()] = value.lower()
+                else:
+                    filters_dict[attribute.lower()] = value
+        return filters_dict
@@ -0,0 +1,203 @@
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+
+from books_reviewing.tracing import current_span
+
+# Set by RequestIdMiddleware for the duration of a request. Background tasks
+# and threadpool calls copy the context, so their records carry it too.
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed in extra.
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "request_id",
+    "trace_id",
+    "suppressed",
+}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the request id and trace id of the code that
+    logged them. It must run before the record is queued, while the
+    logging code's context is still current."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        span = current_span.get()
+        record.trace_id = span.trace.trace_id if span is not None else None
+        return True
+
+
+class RepeatedRecordFilter(logging.Filter):
+    """Lets through at most burst records per call site, exception class and
+    status code every window seconds, so a flood of one kind of error does
+    not hide another logged from the same place. The first record let
+    through after some were dropped says how many, in its suppressed
+    attribute."""
+
+    window: float
+    burst: int
+
+    def __init__(self, window: float = 60, burst: int = 10):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.__counts: dict[tuple, list] = {}
+        self.__lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (
+            record.name,
+            record.levelno,
+            record.pathname,
+            record.lineno,
+            record.exc_info[0] if record.exc_info else None,
+            getattr(record, "status_code", None),
+        )
+        now = time.monotonic()
+        with self.__lock:
+            # [window start, records let through, records dropped]
+            counts = self.__counts.get(key)
+            if counts is None or now - counts[0] >= self.window:
+                suppressed = counts[2] if counts is not None else 0
+                self.__counts[key] = [now, 1, 0]
+            elif counts[1] < self.burst:
+                counts[1] += 1
+                suppressed = 0
+            else:
+                counts[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, the request context and
+    the fields passed in extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("request_id", "trace_id", "suppressed"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+exception_formatter = logging.Formatter()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to a QueueListener thread, which does the formatting
+    and the I/O. When the queue is full the record is dropped and counted
+    instead of blocking the event loop."""
+
+    dropped: int
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the default, keeps the message and the traceback apart so
+        # the formatter can write them to separate fields. The traceback is
+        # rendered here, before its frames go away.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def log_file_path(path: str | None, workers: int) -> str | None:
+    """Where a worker writes its log file. RotatingFileHandler is not safe
+    across processes, so with several workers each gets its own file,
+    named after its pid."""
+    if not path or workers <= 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}-{os.getpid()}{extension}"
+
+
+def configure_logging(
+    loggers: list[logging.Logger],
+    path: str | None,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    repeat_window: float = 60,
+    repeat_burst: int = 10,
+    queue_size: int = 10000,
+) -> logging.handlers.QueueListener:
+    """Routes the loggers through one queue to a size-rotated JSON file at
+    path (if any) and to stderr, and starts the thread that writes them.
+    Stop the listener to flush the queue."""
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if path:
+        handlers.append(
+            logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count
+            )
+        )
+    formatter = JsonFormatter()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.Queue(queue_size)
+    queue_handler = NonBlockingQueueHandler(records)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(RepeatedRecordFilter(repeat_window, repeat_burst))
+    for logger in loggers:
+        logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(
+        records, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    return listener
+
+
+def stop_logging(
+    loggers: list[logging.Logger], listener: logging.handlers.QueueListener
+):
+    """Flushes the queue, detaches the loggers from it and closes the files
+    configure_logging opened."""
+    listener.stop()
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            if isinstance(handler, NonBlockingQueueHandler):
+                logger.removeHandler(handler)
+    for handler in listener.handlers:
+        handler.close()
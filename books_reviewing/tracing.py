@@ -0,0 +1,367 @@
+import abc
+import contextlib
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Iterator
+
+import httpx
+
+from books_reviewing.instrumentation import RepositoryCall
+
+logger = logging.getLogger(__name__)
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+
+class Trace:
+    """The finished spans of one sampled request."""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_span_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        parent_span_id: str | None = None,
+        start_ns: int = None,
+        attributes: dict = None,
+    ):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def end(self, end_ns: int = None):
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.error:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+def otlp_value(value) -> dict:
+    match value:
+        case bool():
+            return {"boolValue": value}
+        case int():
+            return {"intValue": str(value)}
+        case float():
+            return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# The innermost open span of the current request, None when it is not sampled.
+# Tasks copy the context when they are created, so spans opened in gathered
+# coroutines become children of the span that gathered them.
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextlib.contextmanager
+def start_span(
+    name: str, kind: int = SPAN_KIND_INTERNAL, attributes: dict = None
+) -> Iterator[Span | None]:
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(parent.trace, name, kind, parent.span_id, attributes=attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as exception:
+        span.error = type(exception).__name__
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+def traced(name: str):
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return await func(*args, **kwargs)
+            with start_span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_methods(cls):
+    """Gives every public coroutine method of the class its own span."""
+    for name, member in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(member):
+            setattr(cls, name, traced(f"{cls.__name__}.{name}")(member))
+    return cls
+
+
+def trace_repository_call(call: RepositoryCall):
+    """Instrumentation observer that adds repository calls to the trace. It
+    runs right after the call, so the span is reconstructed from its
+    duration."""
+    parent = current_span.get()
+    if parent is None:
+        return
+    repository, method = call.labels
+    end_ns = time.time_ns()
+    span = Span(
+        parent.trace,
+        f"{repository}.{method}",
+        SPAN_KIND_CLIENT,
+        parent.span_id,
+        start_ns=end_ns - int(call.duration * 1e9),
+        attributes={"db.system": "mongodb", "db.operation": method},
+    )
+    result_size = call.result_size
+    if result_size is not None:
+        span.attributes["db.result_size"] = result_size
+    if call.error:
+        span.error = call.error_class
+    span.end(end_ns)
+
+
+TRACEPARENT = re.compile(
+    r"(?P<version>[0-9a-f]{2})-(?P<trace_id>[0-9a-f]{32})"
+    r"-(?P<parent_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})(?P<rest>-.*)?"
+)
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """Trace id, parent span id and sampled flag of a W3C traceparent, or
+    None if it is not a valid one."""
+    if not header:
+        return None
+    match = TRACEPARENT.fullmatch(header.strip())
+    if (
+        match is None
+        or match["version"] == "ff"
+        # Version 00 has exactly four fields; later ones may append more.
+        or (match["version"] == "00" and match["rest"] is not None)
+        or match["trace_id"] == "0" * 32
+        or match["parent_id"] == "0" * 16
+    ):
+        return None
+    return match["trace_id"], match["parent_id"], bool(int(match["flags"], 16) & 1)
+
+
+class SpanExporter(abc.ABC):
+    """Batches finished traces on a background thread so that writing them
+    out never blocks the event loop. Traces are dropped when the queue is
+    full."""
+
+    service_name: str
+
+    def __init__(
+        self,
+        service_name: str = "books_reviewing",
+        max_queue_size: int = 2048,
+        flush_interval: float = 1.0,
+    ):
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.__queue: queue.Queue[Trace | None] = queue.Queue(max_queue_size)
+        self.__thread: threading.Thread | None = None
+        self.__lock = threading.Lock()
+
+    def export(self, trace: Trace):
+        if self.__thread is None:
+            self.__start()
+        try:
+            self.__queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self, timeout: float = 5):
+        if self.__thread is not None:
+            self.__queue.put(None)
+            self.__thread.join(timeout)
+            self.__thread = None
+
+    @abc.abstractmethod
+    def write(self, request: dict):
+        """Sends one OTLP/JSON export request."""
+
+    def to_otlp(self, traces: list[Trace]) -> dict:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "books_reviewing.tracing"},
+                            "spans": [
+                                span.to_otlp()
+                                for trace in traces
+                                for span in trace.spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def __start(self):
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="span-exporter", daemon=True
+                )
+                self.__thread.start()
+
+    def __run(self):
+        stopping = False
+        while not stopping:
+            traces = []
+            deadline = time.monotonic() + self.flush_interval
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    trace = self.__queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if trace is None:
+                    stopping = True
+                    break
+                traces.append(trace)
+            if traces:
+                try:
+                    self.write(self.to_otlp(traces))
+                except Exception:
+                    logger.exception("Could not export %d traces", len(traces))
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends one OTLP/JSON export request per batch to a file, as the
+    OpenTelemetry collector's file exporter does. Each batch is a single
+    append, so several workers can share the file."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def write(self, request: dict):
+        line = (json.dumps(request, separators=(",", ":")) + "\n").encode()
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line)
+        finally:
+            os.close(descriptor)
+
+
+class HttpSpanExporter(SpanExporter):
+    """Posts OTLP/JSON to a collector, e.g. http://localhost:4318/v1/traces."""
+
+    def __init__(self, endpoint: str, timeout: float = 5, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def write(self, request: dict):
+        httpx.post(self.endpoint, json=request, timeout=self.timeout).raise_for_status()
+
+
+class Tracer:
+    """Starts a trace for a sample_rate share of the requests. Requests with
+    a traceparent header continue the caller's trace if the caller sampled
+    it."""
+
+    sample_rate: float
+    exporter: SpanExporter
+
+    def __init__(self, sample_rate: float, exporter: SpanExporter):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def start_request(
+        self, name: str, traceparent: str = None, attributes: dict = None
+    ) -> Span | None:
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_span_id, sampled = parent
+            if not sampled:
+                return None
+        elif random.random() < self.sample_rate:
+            trace_id, parent_span_id = f"{random.getrandbits(128):032x}", None
+        else:
+            return None
+        return Span(
+            Trace(trace_id), name, SPAN_KIND_SERVER, parent_span_id, None, attributes
+        )
+
+    def finish_request(self, span: Span):
+        span.end()
+        self.exporter.export(span.trace)
+
+
+def tracer_from_env() -> Tracer:
+    if os.getenv("TRACE_EXPORT_ENDPOINT"):
+        exporter = HttpSpanExporter(os.getenv("TRACE_EXPORT_ENDPOINT"))
+    else:
+        exporter = FileSpanExporter(os.getenv("TRACE_EXPORT_FILE", "../traces.jsonl"))
+    return Tracer(float(os.getenv("TRACE_SAMPLE_RATE", 0)), exporter)
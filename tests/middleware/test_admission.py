@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from books_reviewing.dependencies import admission_controller
+from books_reviewing.middleware.admission import (
+    AdmissionClass,
+    AdmissionController,
+    AdmissionMiddleware,
+)
+
+
+@pytest.mark.asyncio
+async def test_admits_up_to_concurrency_then_queues_then_rejects():
+    admission_class = AdmissionClass("read", concurrency=1, queue_size=1)
+
+    assert await admission_class.acquire()
+    waiter = asyncio.create_task(admission_class.acquire())
+    await asyncio.sleep(0)
+    assert admission_class.queued == 1
+    assert not await admission_class.acquire()
+
+    admission_class.release()
+
+    assert await waiter
+    assert admission_class.snapshot() == {
+        "concurrency": 1,
+        "queue_size": 1,
+        "in_flight": 1,
+        "queued": 0,
+        "admitted": 2,
+        "rejected": 1,
+        "timed_out": 0,
+    }
+    admission_class.release()
+    assert admission_class.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_request_times_out():
+    admission_class = AdmissionClass("read", concurrency=1, queue_size=5)
+    await admission_class.acquire()
+
+    assert not await admission_class.acquire(timeout=0.01)
+
+    assert admission_class.timed_out == 1
+    assert admission_class.queued == 0
+    admission_class.release()
+    assert admission_class.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    admission_class = AdmissionClass("read", concurrency=1, queue_size=5)
+    await admission_class.acquire()
+    waiter = asyncio.create_task(admission_class.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert admission_class.queued == 0
+    admission_class.release()
+    assert admission_class.in_flight == 0
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("DELETE", "/api/v1/authors/5f85f36d6dfecacc68428a46", "cascade"),
+        ("POST", "/api/v1/authors/1/merge-into/2", "cascade"),
+        ("GET", "/api/v1/books/", "listing"),
+        ("GET", "/api/v1/reviews/search", "listing"),
+        ("GET", "/api/v1/users/export", "listing"),
+        ("POST", "/api/v1/books/", "write"),
+        ("PATCH", "/api/v1/books/5f85f36d6dfecacc68428a46", "write"),
+        ("GET", "/api/v1/books/5f85f36d6dfecacc68428a46", "read"),
+        ("GET", "/api/v1/books/suggest", "read"),
+    ],
+)
+def test_route_classes(method, path, expected):
+    assert admission_controller.classify(method, path).name == expected
+
+
+def test_monitoring_is_not_admission_controlled():
+    assert admission_controller.classify("GET", "/api/v1/monitoring/admission") is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_load_with_503_and_retry_after():
+    release = asyncio.Event()
+    app = FastAPI()
+    controller = AdmissionController(
+        [AdmissionClass("all", concurrency=1, queue_size=0)], retry_after=3
+    )
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = asyncio.create_task(client.get("/slow"))
+        while controller.classes[0].in_flight == 0:
+            await asyncio.sleep(0)
+
+        rejected = await client.get("/slow")
+        release.set()
+        admitted = await first
+
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "3"
+    assert admitted.status_code == 200
+    assert controller.snapshot()["all"]["rejected"] == 1
+    assert controller.snapshot()["all"]["in_flight"] == 0
@@ -0,0 +1,110 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse, StreamingResponse
+
+from books_reviewing.middleware.compression import (
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+
+large_body = "A long description " * 100
+
+
+def create_client(**kwargs) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **kwargs)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(large_body)
+
+    @app.get("/encoded")
+    def encoded():
+        return PlainTextResponse(large_body, headers={"Content-Encoding": "custom"})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (large_body for _ in range(10)), media_type="text/plain"
+        )
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "br"),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+def test_small_response_is_not_compressed():
+    client = create_client(minimum_size=500)
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "tiny"
+
+
+def test_large_response_is_gzipped():
+    client = create_client(minimum_size=500, levels={"gzip": 9})
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(large_body)
+    assert response.text == large_body
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+def test_large_response_uses_preferred_encoding(encoding):
+    pytest.importorskip({"br": "brotli", "zstd": "zstandard"}[encoding])
+    client = create_client(encodings=[encoding, "gzip"])
+
+    response = client.get("/large", headers={"Accept-Encoding": f"gzip, {encoding}"})
+
+    assert response.headers["content-encoding"] == encoding
+    assert int(response.headers["content-length"]) < len(large_body)
+
+
+def test_already_encoded_response_is_left_alone():
+    client = create_client()
+
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "custom"
+    assert response.content == large_body.encode()
+
+
+def test_streaming_response_is_compressed_incrementally():
+    client = create_client(encodings=["gzip"])
+
+    with client.stream(
+        "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).decode() == large_body * 10
+    assert len(raw) < len(large_body)
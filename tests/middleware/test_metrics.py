@@ -0,0 +1,40 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from books_reviewing.metrics import http_requests, http_request_duration
+from books_reviewing.middleware.metrics import MetricsMiddleware
+
+
+@pytest.fixture
+def client() -> TestClient:
+    http_requests.clear()
+    http_request_duration.clear()
+    app = FastAPI(root_path="/api/v1")
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/books/{book_id}")
+    def book(book_id: str):
+        return {}
+
+    @app.get("/fails")
+    def fails():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_requests_are_labelled_by_route_template(client):
+    client.get("/api/v1/books/1")
+    client.get("/api/v1/books/2")
+    client.get("/api/v1/nothing")
+
+    assert http_requests.values[("GET", "/books/{book_id}", "200")] == 2
+    assert http_requests.values[("GET", "unmatched", "404")] == 1
+    assert http_request_duration.values[("GET", "/books/{book_id}")][-2] == 0
+
+
+def test_unhandled_errors_count_as_500(client):
+    client.get("/api/v1/fails")
+
+    assert http_requests.values[("GET", "/fails", "500")] == 1
@@ -0,0 +1,81 @@
+import asyncio
+import pstats
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from books_reviewing.middleware.profiling import ProfilingMiddleware
+from books_reviewing.profiling import Profiler
+
+
+def busy(seconds: float):
+    deadline = asyncio.get_running_loop().time() + seconds
+    while asyncio.get_running_loop().time() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiler(tmp_path) -> Profiler:
+    return Profiler(str(tmp_path / "profiles"), "secret", interval=0.001)
+
+
+@pytest.fixture
+def client(profiler) -> TestClient:
+    app = FastAPI(root_path="/api/v1")
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.get("/books/search")
+    async def search():
+        return []
+
+    @app.get("/books/{book_id}")
+    async def book(book_id: str):
+        busy(0.05)
+        return {}
+
+    return TestClient(app)
+
+
+def test_requests_with_the_token_are_sampled(client, profiler, tmp_path):
+    response = client.get("/api/v1/books/1", headers={"X-Profile-Token": "secret"})
+
+    name = response.headers["x-profile"]
+    assert name.endswith("-GET-books_book_id.folded")
+    lines = (tmp_path / "profiles" / name).read_text().splitlines()
+    assert any("busy" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_wrong_token_is_ignored(client, tmp_path):
+    response = client.get("/api/v1/books/1", headers={"X-Profile-Token": "guess"})
+
+    assert "x-profile" not in response.headers
+    assert not (tmp_path / "profiles").exists()
+
+
+def test_armed_route_is_profiled_for_the_next_requests(client, profiler, tmp_path):
+    profiler.arm("GET", "/books/{book_id}", count=2, mode="cprofile")
+
+    names = [
+        client.get(f"/api/v1/books/{book_id}").headers.get("x-profile")
+        for book_id in range(3)
+    ]
+
+    assert names[0].endswith(".prof") and names[1].endswith(".prof")
+    assert names[2] is None
+    assert profiler.targets == {}
+    stats = pstats.Stats(str(tmp_path / "profiles" / names[0]))
+    assert any(function == "busy" for _, _, function in stats.stats)
+
+
+def test_armed_route_does_not_capture_sibling_routes(client, profiler):
+    profiler.arm("GET", "/books/{book_id}", count=1)
+
+    search = client.get("/api/v1/books/search")
+    book = client.get("/api/v1/books/1")
+
+    assert "x-profile" not in search.headers
+    assert book.headers["x-profile"].endswith("-GET-books_book_id.folded")
+    assert profiler.targets == {}
@@ -0,0 +1,110 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from books_reviewing.middleware.rate_limit import (
+    RateLimit,
+    RateLimiter,
+    RateLimitMiddleware,
+    client_key,
+)
+
+limit = RateLimit(requests=60, period=60, burst=2)
+
+
+def create_client(limiter: RateLimiter) -> TestClient:
+    app = FastAPI(root_path="/api/v1")
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    @app.get("/books/")
+    def books():
+        return []
+
+    @app.get("/monitoring/database")
+    def database():
+        return {}
+
+    return TestClient(app)
+
+
+def test_bucket_allows_burst_then_refills_at_rate():
+    limiter = RateLimiter({"/books": limit})
+
+    assert limiter.take("/books", limit, "ip:1", now=0) == (True, 1)
+    assert limiter.take("/books", limit, "ip:1", now=0) == (True, 0)
+    assert limiter.take("/books", limit, "ip:1", now=0.5) == (False, 0.5)
+    assert limiter.take("/books", limit, "ip:1", now=1.5)[0]
+    assert limiter.take("/books", limit, "ip:2", now=1.5) == (True, 1)
+    assert limiter.rejected == 1
+
+
+def test_idle_buckets_are_evicted():
+    limiter = RateLimiter({"/books": limit}, eviction_interval=10)
+    limiter.take("/books", limit, "ip:1", now=0)
+    limiter.take("/books", limit, "ip:2", now=9)
+    limiter.take("/books", limit, "ip:2", now=9)
+
+    limiter.evict(now=10)
+
+    assert len(limiter) == 1
+
+
+def test_limit_for_strips_root_path():
+    limiter = RateLimiter({"/books": limit})
+
+    assert limiter.limit_for({"path": "/api/v1/books/", "root_path": "/api/v1"}) == (
+        "/books",
+        limit,
+    )
+    assert limiter.limit_for({"path": "/books/search", "root_path": ""}) == (
+        "/books",
+        limit,
+    )
+    assert limiter.limit_for({"path": "/api/v1/users/", "root_path": "/api/v1"}) is None
+
+
+@pytest.mark.parametrize(
+    "client, headers, expected",
+    [
+        ("10.0.0.1", {}, "ip:10.0.0.1"),
+        ("10.0.0.1", {"X-API-Key": "secret"}, "ip:10.0.0.1"),
+        ("10.0.0.2", {}, "ip:10.0.0.2"),
+        ("10.0.0.2", {"X-API-Key": "secret"}, "key:secret"),
+    ],
+)
+def test_client_key_trusts_the_header_from_trusted_proxies_only(
+    client, headers, expected
+):
+    scope = {
+        "type": "http",
+        "client": (client, 5000),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+
+    assert client_key("X-API-Key", frozenset({"10.0.0.2"}))(scope) == expected
+
+
+def test_middleware_returns_429_with_rate_limit_headers():
+    client = create_client(RateLimiter({"/books": limit}))
+
+    first = client.get("/api/v1/books/")
+    client.get("/api/v1/books/")
+    limited = client.get("/api/v1/books/")
+
+    assert first.status_code == 200
+    assert first.headers["ratelimit-limit"] == "2"
+    assert first.headers["ratelimit-remaining"] == "1"
+    assert first.headers["ratelimit-policy"] == "60;w=60;burst=2"
+    assert limited.status_code == 429
+    assert limited.headers["ratelimit-remaining"] == "0"
+    assert limited.headers["retry-after"] == "1"
+
+
+def test_routes_without_limit_are_not_limited():
+    client = create_client(RateLimiter({"/books": limit}))
+
+    for _ in range(5):
+        response = client.get("/api/v1/monitoring/database")
+
+    assert response.status_code == 200
+    assert "ratelimit-limit" not in response.headers
@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse
+
+from books_reviewing.middleware.request_id import RequestIdMiddleware
+from books_reviewing.structured_logging import RequestContextFilter
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(RequestContextFilter())
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+@pytest.fixture
+def handler() -> ListHandler:
+    handler = ListHandler()
+    logger = logging.getLogger("tests.request_id")
+    logger.addHandler(handler)
+    yield handler
+    logger.removeHandler(handler)
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    def log_error():
+        logging.getLogger("tests.request_id").error("Logged after the response")
+
+    @app.get("/fails")
+    def fails():
+        return JSONResponse({}, status_code=422, background=BackgroundTask(log_error))
+
+    return TestClient(app)
+
+
+def test_background_task_records_carry_the_request_id(client, handler):
+    response = client.get("/fails")
+
+    (record,) = handler.records
+    assert record.request_id == response.headers["x-request-id"]
+    assert len(record.request_id) == 32
+
+
+def test_request_id_from_the_proxy_is_kept(client, handler):
+    response = client.get("/fails", headers={"X-Request-ID": "edge-1234"})
+
+    assert response.headers["x-request-id"] == "edge-1234"
+    assert handler.records[0].request_id == "edge-1234"
+
+
+def test_malformed_request_ids_are_replaced(client):
+    response = client.get("/fails", headers={"X-Request-ID": "id; DROP" * 10})
+
+    assert len(response.headers["x-request-id"]) == 32
@@ -0,0 +1,66 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from books_reviewing.middleware.tracing import TracingMiddleware
+from books_reviewing.tracing import SpanExporter, Trace, Tracer, start_span
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        super().__init__()
+        self.traces = []
+
+    def export(self, trace: Trace):
+        self.traces.append(trace)
+
+    def write(self, request: dict):
+        pass
+
+
+def create_client(tracer: Tracer) -> TestClient:
+    app = FastAPI(root_path="/api/v1")
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    @app.get("/books/{book_id}")
+    async def book(book_id: str):
+        with start_span("BooksService.get"):
+            return {}
+
+    @app.get("/fails")
+    def fails():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def tracer() -> Tracer:
+    return Tracer(1.0, ListExporter())
+
+
+def test_root_span_is_named_after_the_route(tracer):
+    response = create_client(tracer).get("/api/v1/books/1")
+
+    (trace,) = tracer.exporter.traces
+    service, root = trace.spans
+    assert root.name == "GET /books/{book_id}"
+    assert root.attributes["http.status_code"] == 200
+    assert service.parent_span_id == root.span_id
+    assert response.headers["traceparent"] == f"00-{trace.trace_id}-{root.span_id}-01"
+
+
+def test_server_errors_mark_the_span(tracer):
+    create_client(tracer).get("/api/v1/fails")
+
+    (trace,) = tracer.exporter.traces
+    assert trace.spans[0].error == "RuntimeError"
+    assert trace.spans[0].attributes["http.status_code"] == 500
+
+
+def test_unsampled_requests_are_not_traced():
+    tracer = Tracer(0.0, ListExporter())
+    response = create_client(tracer).get("/api/v1/books/1")
+
+    assert tracer.exporter.traces == []
+    assert "traceparent" not in response.headers
@@ -15,6 +15,7 @@ from books_reviewing.schemas.authors import (
     AuthorPatchSchema,
     AuthorFilterEnum,
     AuthorOutSchema,
+    AuthorSuggestionSchema,
 )
 from books_reviewing.services.authors import AuthorsService
 
@@ -60,8 +61,9 @@ def test_update_author_when_missing():
         detail="Author not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.patch(f"/api/v1/authors/{author_id}", json=author_data)
+    response = client.patch(f"/api/v1/authors/{author_id}", json=author_data)
+
+    assert response.status_code == 404
 
     mock_authors_service.update.assert_called_once_with(
         ObjectId(author_id), AuthorPatchSchema(**author_data)
@@ -99,8 +101,9 @@ def test_get_one_author_when_missing():
         detail="Author not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.get(f"/api/v1/authors/{test_author_id}")
+    response = client.get(f"/api/v1/authors/{test_author_id}")
+
+    assert response.status_code == 404
 
     mock_authors_service.get_one.assert_called_once_with(ObjectId(test_author_id))
 
@@ -185,7 +188,46 @@ def test_delete_author_not_found():
         detail="Author not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.delete(f"/api/v1/authors/{test_author_id}")
+    response = client.delete(f"/api/v1/authors/{test_author_id}")
+
+    assert response.status_code == 404
 
     mock_authors_service.delete.assert_called_once_with(ObjectId(test_author_id))
+
+
+def test_merge_author():
+    client = TestClient(app)
+    mock_authors_service = MagicMock(spec=AuthorsService)
+    app.dependency_overrides[get_authors_service] = lambda: mock_authors_service
+
+    target_author_id = "5f85f36d6dfecacc68428a47"
+    mock_authors_service.merge.return_value = AuthorOutSchema(
+        **test_author_data, id=ObjectId(target_author_id), books_count=3
+    )
+
+    response = client.post(
+        f"/api/v1/authors/{test_author_id}/merge-into/{target_author_id}"
+    )
+
+    mock_authors_service.merge.assert_called_once_with(
+        ObjectId(test_author_id), ObjectId(target_author_id)
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == target_author_id
+    assert response.json()["books_count"] == 3
+
+
+def test_suggest_authors():
+    client = TestClient(app)
+    mock_authors_service = MagicMock(spec=AuthorsService)
+    app.dependency_overrides[get_authors_service] = lambda: mock_authors_service
+
+    mock_authors_service.suggest.return_value = [
+        AuthorSuggestionSchema(id=ObjectId(test_author_id), name="John Doe")
+    ]
+
+    response = client.get("/api/v1/authors/suggest?prefix=jo&limit=3")
+
+    mock_authors_service.suggest.assert_called_once_with("jo", 3)
+    assert response.status_code == 200
+    assert response.json() == [{"id": test_author_id, "name": "John Doe"}]
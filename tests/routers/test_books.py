@@ -1,21 +1,23 @@
+import asyncio
 from unittest.mock import MagicMock
 
+import bson
 import pytest as pytest
 from fastapi.testclient import TestClient
 from fastapi_pagination import add_pagination
 from odmantic import ObjectId
 
 from books_reviewing.dependencies import get_books_service
-from books_reviewing.exceptions import ObjectNotFoundException
+from books_reviewing.exceptions import ObjectNotFoundException, database_exception_wrapper
 from books_reviewing.main import app
 from books_reviewing.models import Book
-from books_reviewing.schemas.base import SortEnum
-from books_reviewing.schemas.books import BaseBookSchema, BookPatchSchema, BookFilterEnum, BookOutSchema
+from books_reviewing.schemas.base import SortEnum, MAX_PAGE_SIZE
+from books_reviewing.schemas.books import BaseBookSchema, BookPatchSchema, BookFilterEnum, BookOutSchema, BookSuggestionSchema
 from books_reviewing.services.books import BooksService
 
 test_book_data = {
     "title": "John Doe's Original",
-    "isbn": "23123123123",
+    "isbn": "9781861972712",
     "description": "Truly stunning by Jown Doe",
     "publication_date": "2024-01-23T21:19:18.307000",
     "author_id": "5f85f36d6dfecacc68428a46",
@@ -56,8 +58,9 @@ def test_update_book_when_missing():
         detail="Book not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.patch(f"/api/v1/books/{book_id}", json=book_data)
+    response = client.patch(f"/api/v1/books/{book_id}", json=book_data)
+
+    assert response.status_code == 404
 
     mock_books_service.update.assert_called_once_with(
         ObjectId(book_id), BookPatchSchema(**book_data)
@@ -93,8 +96,9 @@ def test_get_one_book_when_missing():
         detail="Book not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.get(f"/api/v1/books/{test_book_id}")
+    response = client.get(f"/api/v1/books/{test_book_id}")
+
+    assert response.status_code == 404
 
     mock_books_service.get_one.assert_called_once_with(ObjectId(test_book_id))
 
@@ -118,6 +122,136 @@ def test_get_one_book():
     assert response.json()["id"] == test_book_id
 
 
+def test_get_one_book_as_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    mock_books_service.get_one.return_value = BookOutSchema(
+        **test_book_data, id=ObjectId(test_book_id), average_rating=1
+    )
+
+    response = client.get(
+        f"/api/v1/books/{test_book_id}", headers={"Accept": "application/msgpack"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["vary"] == "Accept"
+    book = msgpack.unpackb(response.content)
+    assert book["id"] == test_book_id
+    assert book["isbn"] == test_book_data["isbn"]
+
+
+def test_create_book_from_bson_body():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    mock_books_service.create.return_value = Book(**test_book_data)
+
+    response = client.post(
+        "/api/v1/books/",
+        content=bson.encode(
+            {**test_book_data, "author_id": ObjectId(test_book_data["author_id"])}
+        ),
+        headers={"Content-Type": "application/bson", "Accept": "application/bson"},
+    )
+
+    mock_books_service.create.assert_called_once_with(BaseBookSchema(**test_book_data))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/bson"
+    assert bson.decode(response.content)["title"] == test_book_data["title"]
+
+
+def test_create_book_from_invalid_bson_body():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    response = client.post(
+        "/api/v1/books/",
+        content=b"not bson",
+        headers={"Content-Type": "application/bson"},
+    )
+
+    assert response.status_code == 422
+    mock_books_service.create.assert_not_called()
+
+
+def test_query_books_rejects_page_size_above_max():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    response = client.get(f"/api/v1/books/?size={MAX_PAGE_SIZE + 1}")
+
+    assert response.status_code == 422
+    mock_books_service.query.assert_not_called()
+
+
+def test_request_timeout_header_must_be_positive():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    response = client.get(
+        f"/api/v1/books/{test_book_id}", headers={"X-Request-Timeout-Ms": "0"}
+    )
+
+    assert response.status_code == 422
+    mock_books_service.get_one.assert_not_called()
+
+
+def test_request_over_its_deadline_gets_504():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    @database_exception_wrapper
+    async def find_book(book_id: ObjectId):
+        return None
+
+    async def get_one(book_id: ObjectId):
+        await asyncio.sleep(0.01)
+        return await find_book(book_id)
+
+    mock_books_service.get_one.side_effect = get_one
+
+    response = client.get(
+        f"/api/v1/books/{test_book_id}", headers={"X-Request-Timeout-Ms": "1"}
+    )
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded"}
+
+
+def test_export_books():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    async def documents():
+        for i in range(3):
+            yield {"id": ObjectId(test_book_id), **test_book_data, "title": str(i)}
+
+    mock_books_service.export_documents.return_value = documents()
+
+    response = client.get(
+        "/api/v1/books/export?filter_attributes=title&filter_values=John"
+        "&sort=isbn&sort_direction=desc"
+    )
+
+    mock_books_service.export_documents.assert_called_once_with(
+        [BookFilterEnum.title], ["John"], BookFilterEnum.isbn, SortEnum.desc
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert [book["title"] for book in response.json()] == ["0", "1", "2"]
+    assert response.json()[0]["id"] == test_book_id
+
+
 def test_query_books_with_filters_and_sort():
     client = TestClient(app)
     mock_books_service = MagicMock(spec=BooksService)
@@ -177,7 +311,106 @@ def test_delete_book_not_found():
         detail="Book not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.delete(f"/api/v1/books/{test_book_id}")
+    response = client.delete(f"/api/v1/books/{test_book_id}")
+
+    assert response.status_code == 404
 
     mock_books_service.delete.assert_called_once_with(ObjectId(test_book_id))
+
+
+def test_search_books():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    mock_books_service.search.return_value = (
+        [Book(**test_book_data, id=ObjectId(test_book_id))],
+        1,
+    )
+
+    response = client.get(
+        f"/api/v1/books/search?q=stunning&author_id={test_book_data['author_id']}"
+        f"&page=1&size=5"
+    )
+
+    mock_books_service.search.assert_called_once_with(
+        "stunning", ObjectId(test_book_data["author_id"]), 1, 5
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert test_book_id == response.json()["items"][0]["id"]
+
+
+def test_search_books_without_text():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    response = client.get("/api/v1/books/search")
+
+    mock_books_service.search.assert_not_called()
+    assert response.status_code == 422
+
+
+def test_suggest_books():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    mock_books_service.suggest.return_value = [
+        BookSuggestionSchema(id=ObjectId(test_book_id), title="John Doe's Original")
+    ]
+
+    response = client.get("/api/v1/books/suggest?prefix=john")
+
+    mock_books_service.suggest.assert_called_once_with("john", None)
+    assert response.status_code == 200
+    assert response.json() == [{"id": test_book_id, "title": "John Doe's Original"}]
+
+
+def test_get_one_book_by_isbn():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    mock_books_service.get_one_by_isbn.return_value = BookOutSchema(
+        **test_book_data, id=ObjectId(test_book_id), average_rating=3
+    )
+
+    response = client.get("/api/v1/books/by-isbn/978-1-86197-271-2")
+
+    mock_books_service.get_one_by_isbn.assert_called_once_with("9781861972712")
+    assert response.status_code == 200
+    assert response.json()["id"] == test_book_id
+
+
+def test_get_one_book_by_invalid_isbn():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    response = client.get("/api/v1/books/by-isbn/1234567890")
+
+    mock_books_service.get_one_by_isbn.assert_not_called()
+    assert response.status_code == 422
+
+
+def test_get_books_by_isbns():
+    client = TestClient(app)
+    mock_books_service = MagicMock(spec=BooksService)
+    app.dependency_overrides[get_books_service] = lambda: mock_books_service
+
+    mock_books_service.get_by_isbns.return_value = [
+        Book(**test_book_data, id=ObjectId(test_book_id))
+    ]
+
+    response = client.post(
+        "/api/v1/books/by-isbn",
+        json={"isbns": ["978-1-86197-271-2", "0-306-40615-2"]},
+    )
+
+    mock_books_service.get_by_isbns.assert_called_once_with(
+        ["9781861972712", "9780306406157"]
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == test_book_id
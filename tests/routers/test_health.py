@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+from books_reviewing.container import Container
+from books_reviewing.dependencies import get_container
+from books_reviewing.main import app
+
+
+def test_starting_worker_is_live_but_not_ready():
+    client = TestClient(app)
+    container = Container("mongodb://mongo:27017/", "test")
+    app.dependency_overrides[get_container] = lambda: container
+
+    assert client.get("/api/v1/healthz").status_code == 200
+    response = client.get("/api/v1/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+
+def test_ready_worker():
+    client = TestClient(app)
+    container = Container("mongodb://mongo:27017/", "test")
+    container.ready = True
+    app.dependency_overrides[get_container] = lambda: container
+
+    response = client.get("/api/v1/readyz")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_failed_worker():
+    client = TestClient(app)
+    container = Container("mongodb://mongo:27017/", "test")
+    container.startup_error = "ServerSelectionTimeoutError: mongo:27017"
+    app.dependency_overrides[get_container] = lambda: container
+
+    response = client.get("/api/v1/healthz")
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "ServerSelectionTimeoutError: mongo:27017"
+    assert client.get("/api/v1/readyz").json()["status"] == "failed"
@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+from books_reviewing.container import Container
+from books_reviewing.dependencies import get_container
+from books_reviewing.main import app
+
+
+def test_metrics():
+    client = TestClient(app)
+    app.dependency_overrides[get_container] = lambda: Container(
+        "mongodb://mongo:27017/", "test"
+    )
+    client.get("/api/v1/healthz")
+
+    response = client.get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/healthz",status="200"}' in (
+        response.text
+    )
+    assert "# TYPE mongo_repository_call_duration_seconds histogram" in response.text
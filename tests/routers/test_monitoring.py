@@ -0,0 +1,119 @@
+from fastapi.testclient import TestClient
+from pymongo import monitoring
+
+from books_reviewing.container import Container
+from books_reviewing.dependencies import (
+    get_container,
+    get_pool_monitor,
+    get_command_monitor,
+    get_admission_controller,
+    get_profiler,
+    get_monitoring_token,
+)
+from books_reviewing.main import app
+from books_reviewing.middleware.admission import AdmissionClass, AdmissionController
+from books_reviewing.mongo import PoolMonitor, CommandMonitor
+from books_reviewing.profiling import Profiler
+
+monitoring_headers = {"X-Monitoring-Token": "monitor"}
+
+
+def create_client() -> TestClient:
+    app.dependency_overrides[get_monitoring_token] = lambda: "monitor"
+    return TestClient(app)
+
+
+def test_database_stats():
+    client = create_client()
+    pool_monitor = PoolMonitor()
+    pool_monitor.pool_created(
+        monitoring.PoolCreatedEvent(("mongo", 27017), {"maxPoolSize": 100})
+    )
+    app.dependency_overrides[get_pool_monitor] = lambda: pool_monitor
+    app.dependency_overrides[get_command_monitor] = lambda: CommandMonitor()
+
+    response = client.get("/api/v1/monitoring/database", headers=monitoring_headers)
+
+    assert response.status_code == 200
+    assert response.json()["pools"]["mongo:27017"]["max_size"] == 100
+    assert response.json()["pools"]["mongo:27017"]["in_use"] == 0
+    assert response.json()["commands"] == {}
+
+
+def test_admission_stats():
+    client = create_client()
+    app.dependency_overrides[get_admission_controller] = lambda: AdmissionController(
+        [AdmissionClass("read", concurrency=4, queue_size=8)]
+    )
+
+    response = client.get("/api/v1/monitoring/admission", headers=monitoring_headers)
+
+    assert response.status_code == 200
+    assert response.json()["read"]["concurrency"] == 4
+    assert response.json()["read"]["queued"] == 0
+
+
+def test_startup_profile():
+    client = create_client()
+    container = Container("mongodb://mongo:27017/", "test")
+    container.startup_profile = {"prewarm_pool": 1.5, "configure_database": 12.0}
+    app.dependency_overrides[get_container] = lambda: container
+
+    response = client.get("/api/v1/monitoring/startup", headers=monitoring_headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"prewarm_pool": 1.5, "configure_database": 12.0}
+
+
+def test_arm_profiling(tmp_path):
+    client = create_client()
+    profiler = Profiler(str(tmp_path), "secret")
+    app.dependency_overrides[get_profiler] = lambda: profiler
+
+    response = client.post(
+        "/api/v1/monitoring/profiles",
+        json={"route": "/books/{book_id}", "count": 3},
+        headers={**monitoring_headers, "X-Profile-Token": "secret"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["targets"] == [
+        {"method": "GET", "route": "/books/{book_id}", "count": 3, "mode": "sample"}
+    ]
+    assert profiler.targets[("GET", "/books/{book_id}")].count == 3
+
+
+def test_arm_profiling_needs_the_token_and_a_known_route(tmp_path):
+    client = create_client()
+    app.dependency_overrides[get_profiler] = lambda: Profiler(str(tmp_path), "secret")
+
+    forbidden = client.get(
+        "/api/v1/monitoring/profiles",
+        headers={**monitoring_headers, "X-Profile-Token": "guess"},
+    )
+    unknown = client.post(
+        "/api/v1/monitoring/profiles",
+        json={"route": "/nothing"},
+        headers={**monitoring_headers, "X-Profile-Token": "secret"},
+    )
+
+    assert forbidden.status_code == 403
+    assert unknown.status_code == 404
+
+
+def test_monitoring_needs_the_monitoring_token():
+    client = create_client()
+    app.dependency_overrides[get_admission_controller] = lambda: AdmissionController(
+        [AdmissionClass("read", concurrency=4, queue_size=8)]
+    )
+
+    missing = client.get("/api/v1/monitoring/admission")
+    wrong = client.get(
+        "/api/v1/monitoring/admission", headers={"X-Monitoring-Token": "guess"}
+    )
+    app.dependency_overrides[get_monitoring_token] = lambda: None
+    disabled = client.get("/api/v1/monitoring/admission", headers=monitoring_headers)
+
+    assert missing.status_code == 403
+    assert wrong.status_code == 403
+    assert disabled.status_code == 403
@@ -58,8 +58,9 @@ def test_update_review_when_missing():
         detail="Review not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.patch(f"/api/v1/reviews/{review_id}", json=review_data)
+    response = client.patch(f"/api/v1/reviews/{review_id}", json=review_data)
+
+    assert response.status_code == 404
 
     mock_reviews_service.update.assert_called_once_with(
         ObjectId(review_id), ReviewPatchSchema(**review_data)
@@ -97,8 +98,9 @@ def test_get_one_review_when_missing():
         detail="Review not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.get(f"/api/v1/reviews/{test_review_id}")
+    response = client.get(f"/api/v1/reviews/{test_review_id}")
+
+    assert response.status_code == 404
 
     mock_reviews_service.get_one.assert_called_once_with(ObjectId(test_review_id))
 
@@ -131,8 +133,15 @@ def test_query_reviews_with_filters_and_sort():
     sort = ReviewFilterEnum.rating
     sort_direction = SortEnum.desc
 
-    mock_reviews_service.query.return_value = (
-        [Review(**test_review_data, id=ObjectId(test_review_id))],
+    mock_reviews_service.query_documents.return_value = (
+        [
+            {
+                "id": ObjectId(test_review_id),
+                **test_review_data,
+                "book_id": ObjectId(test_review_data["book_id"]),
+                "user_id": ObjectId(test_review_data["user_id"]),
+            }
+        ],
         1,
     )
 
@@ -146,7 +155,7 @@ def test_query_reviews_with_filters_and_sort():
     expected_sort = ReviewFilterEnum.rating
     expected_sort_direction = SortEnum.desc
 
-    mock_reviews_service.query.assert_called_once_with(
+    mock_reviews_service.query_documents.assert_called_once_with(
         filter_attributes,
         filter_values,
         expected_sort,
@@ -160,6 +169,35 @@ def test_query_reviews_with_filters_and_sort():
     assert test_review_id == response_json_items[0]["id"]
 
 
+def test_query_reviews_as_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    client = TestClient(app)
+    mock_reviews_service = MagicMock(spec=ReviewsService)
+    app.dependency_overrides[get_reviews_service] = lambda: mock_reviews_service
+
+    mock_reviews_service.query_documents.return_value = (
+        [
+            {
+                "id": ObjectId(test_review_id),
+                **test_review_data,
+                "book_id": ObjectId(test_review_data["book_id"]),
+                "user_id": ObjectId(test_review_data["user_id"]),
+            }
+        ],
+        1,
+    )
+
+    response = client.get("/api/v1/reviews/", headers={"Accept": "application/msgpack"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    page = msgpack.unpackb(response.content)
+    assert page["total"] == 1
+    assert test_review_data.items() <= page["items"][0].items()
+    assert page["items"][0]["id"] == test_review_id
+    assert "links" in page
+
+
 def test_delete_review():
     client = TestClient(app)
     mock_reviews_service = MagicMock(spec=ReviewsService)
@@ -180,7 +218,25 @@ def test_delete_review_not_found():
         detail="Review not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.delete(f"/api/v1/reviews/{test_review_id}")
+    response = client.delete(f"/api/v1/reviews/{test_review_id}")
+
+    assert response.status_code == 404
 
     mock_reviews_service.delete.assert_called_once_with(ObjectId(test_review_id))
+
+
+def test_search_reviews():
+    client = TestClient(app)
+    mock_reviews_service = MagicMock(spec=ReviewsService)
+    app.dependency_overrides[get_reviews_service] = lambda: mock_reviews_service
+
+    mock_reviews_service.search.return_value = (
+        [Review(**test_review_data, id=ObjectId(test_review_id))],
+        1,
+    )
+
+    response = client.get("/api/v1/reviews/search?q=heavy")
+
+    mock_reviews_service.search.assert_called_once_with("heavy", None, None, None)
+    assert response.status_code == 200
+    assert test_review_id == response.json()["items"][0]["id"]
@@ -6,7 +6,7 @@ from fastapi_pagination import add_pagination
 from odmantic import ObjectId
 
 from books_reviewing.dependencies import get_users_service
-from books_reviewing.exceptions import ObjectNotFoundException
+from books_reviewing.exceptions import ObjectNotFoundException, ConflictException
 from books_reviewing.main import app
 from books_reviewing.models import User
 from books_reviewing.schemas.base import SortEnum
@@ -55,8 +55,9 @@ def test_update_user_when_missing():
         detail="User not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.patch(f"/api/v1/users/{user_id}", json=user_data)
+    response = client.patch(f"/api/v1/users/{user_id}", json=user_data)
+
+    assert response.status_code == 404
 
     mock_users_service.update.assert_called_once_with(
         ObjectId(user_id), UserPatchSchema(**user_data)
@@ -92,8 +93,9 @@ def test_get_one_user_when_missing():
         detail="User not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.get(f"/api/v1/users/{test_user_id}")
+    response = client.get(f"/api/v1/users/{test_user_id}")
+
+    assert response.status_code == 404
 
     mock_users_service.get_one.assert_called_once_with(ObjectId(test_user_id))
 
@@ -173,7 +175,49 @@ def test_delete_user_not_found():
         detail="User not found"
     )
 
-    with pytest.raises(ObjectNotFoundException):
-        client.delete(f"/api/v1/users/{test_user_id}")
+    response = client.delete(f"/api/v1/users/{test_user_id}")
+
+    assert response.status_code == 404
 
     mock_users_service.delete.assert_called_once_with(ObjectId(test_user_id))
+
+
+def test_create_user_with_taken_email():
+    client = TestClient(app)
+    mock_users_service = MagicMock(spec=UsersService)
+    app.dependency_overrides[get_users_service] = lambda: mock_users_service
+
+    mock_users_service.create.side_effect = ConflictException(
+        detail="User already exists"
+    )
+
+    response = client.post("/api/v1/users/", json=test_user_data)
+
+    assert response.status_code == 409
+
+
+def test_get_one_user_by_email():
+    client = TestClient(app)
+    mock_users_service = MagicMock(spec=UsersService)
+    app.dependency_overrides[get_users_service] = lambda: mock_users_service
+
+    mock_users_service.get_one_by_email.return_value = User(
+        **test_user_data, id=ObjectId(test_user_id)
+    )
+
+    response = client.get("/api/v1/users/by-email/John.Doe@Example.com")
+
+    mock_users_service.get_one_by_email.assert_called_once_with("john.doe@example.com")
+    assert response.status_code == 200
+    assert response.json()["id"] == test_user_id
+
+
+def test_get_one_user_by_invalid_email():
+    client = TestClient(app)
+    mock_users_service = MagicMock(spec=UsersService)
+    app.dependency_overrides[get_users_service] = lambda: mock_users_service
+
+    response = client.get("/api/v1/users/by-email/john.doe")
+
+    mock_users_service.get_one_by_email.assert_not_called()
+    assert response.status_code == 422
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+
+from books_reviewing.schemas.books import (
+    BaseBookSchema,
+    BookPatchSchema,
+    BookIsbnBatchSchema,
+    normalize_isbn,
+)
+
+valid_isbns = [
+    ("9780306406157", "9780306406157"),
+    ("978-0-306-40615-7", "9780306406157"),
+    ("0-306-40615-2", "9780306406157"),
+    ("080442957x", "9780804429573"),
+    ("979 10 90636 07 1", "9791090636071"),
+]
+invalid_isbns = ["0306406153", "9780306406158", "1234567890123", "ISBN", "23123123123"]
+
+
+@pytest.mark.parametrize("isbn_to_normalize,normalized_isbn", valid_isbns)
+def test_normalize_isbn(isbn_to_normalize: str, normalized_isbn: str):
+    assert normalize_isbn(isbn_to_normalize) == normalized_isbn
+
+
+@pytest.mark.parametrize("isbn_to_normalize", invalid_isbns)
+def test_invalid_isbn(isbn_to_normalize: str):
+    with pytest.raises(ValueError):
+        normalize_isbn(isbn_to_normalize)
+
+
+def test_book_schemas_normalize_isbn():
+    data = {
+        "isbn": "0-306-40615-2",
+        "title": "Some title",
+        "description": "Some long description",
+        "publication_date": datetime(1990, 10, 12),
+        "author_id": "5f85f36d6dfecacc68428a46",
+    }
+
+    assert BaseBookSchema(**data).isbn == "9780306406157"
+    assert BookPatchSchema(isbn=data["isbn"]).isbn == "9780306406157"
+    assert BookIsbnBatchSchema(isbns=[data["isbn"]]).isbns == ["9780306406157"]
+
+
+@pytest.mark.parametrize("isbn_to_normalize", invalid_isbns)
+def test_invalid_isbn_in_book_schemas(isbn_to_normalize):
+    with pytest.raises(ValueError):
+        BookPatchSchema(isbn=isbn_to_normalize)
+
+    with pytest.raises(ValueError):
+        BookIsbnBatchSchema(isbns=[isbn_to_normalize])
+
+
+def test_book_patch_schema_accepts_a_null_isbn():
+    assert BookPatchSchema(isbn=None, title="New title").isbn is None
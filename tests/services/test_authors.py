@@ -1,10 +1,17 @@
-from unittest.mock import MagicMock
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.exceptions import RequestValidationError
 from odmantic import ObjectId
 
-from books_reviewing.exceptions import ObjectNotFoundException
+from books_reviewing.deadlines import request_deadline
+from books_reviewing.exceptions import (
+    DatabaseException,
+    DeadlineExceededException,
+    ObjectNotFoundException,
+)
 from books_reviewing.models import Author
 from books_reviewing.repositories.authors import AuthorsRepository
 from books_reviewing.schemas.base import SortEnum
@@ -84,11 +91,16 @@ async def test_update_author(authors_service, mock_authors_repository):
 async def test_get_one_author(
     authors_service, mock_authors_repository, mock_books_service
 ):
-    mock_authors_repository.get_one.return_value = Author(**author_data, id=author_id)
+    mock_authors_repository.get_one_document.return_value = Author(
+        **author_data, id=author_id
+    ).model_dump()
+    mock_books_service.get_book_count_for_author.return_value = 3
 
     retrieved_author = await authors_service.get_one(ObjectId(author_id))
 
-    mock_authors_repository.get_one.assert_called_once_with(ObjectId(author_id))
+    mock_authors_repository.get_one_document.assert_called_once_with(
+        ObjectId(author_id)
+    )
     mock_books_service.get_book_count_for_author.assert_called_once_with(
         ObjectId(author_id)
     )
@@ -208,3 +220,168 @@ async def test_patch_author_not_found(authors_service, mock_authors_repository):
 
     mock_authors_repository.get_one.assert_called_once_with(ObjectId(author_id))
     mock_authors_repository.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_merge_author(
+    authors_service, mock_authors_repository, mock_books_service
+):
+    target_author_id = "5f85f36d6dfecacc68428a47"
+    author = Author(**author_data, id=author_id)
+    target_author = Author(**author_data_list[1], id=target_author_id)
+    mock_authors_repository.get_one.side_effect = [author, target_author]
+    mock_authors_repository.get_one_document.return_value = target_author.model_dump()
+    mock_authors_repository.delete_if_exists.return_value = True
+    mock_books_service.get_book_count_for_author.return_value = 2
+
+    merged_author = await authors_service.merge(
+        ObjectId(author_id), ObjectId(target_author_id)
+    )
+
+    mock_books_service.reassign_books_for_author.assert_called_once_with(
+        ObjectId(author_id), ObjectId(target_author_id)
+    )
+    mock_authors_repository.delete_if_exists.assert_called_once_with(
+        ObjectId(author_id)
+    )
+    assert isinstance(merged_author, AuthorOutSchema)
+    assert str(merged_author.id) == target_author_id
+    assert merged_author.books_count == 2
+
+
+@pytest.mark.asyncio
+async def test_merge_author_into_itself(authors_service, mock_authors_repository):
+    with pytest.raises(RequestValidationError):
+        await authors_service.merge(ObjectId(author_id), ObjectId(author_id))
+
+    mock_authors_repository.get_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_merge_author_target_not_found(
+    authors_service, mock_authors_repository, mock_books_service
+):
+    mock_authors_repository.get_one.side_effect = [
+        Author(**author_data, id=author_id),
+        None,
+    ]
+
+    with pytest.raises(ObjectNotFoundException):
+        await authors_service.merge(
+            ObjectId(author_id), ObjectId("5f85f36d6dfecacc68428a47")
+        )
+
+    mock_books_service.reassign_books_for_author.assert_not_called()
+    mock_authors_repository.delete_if_exists.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_merge_author_deleted_concurrently(
+    authors_service, mock_authors_repository, mock_books_service
+):
+    mock_authors_repository.get_one.side_effect = [
+        Author(**author_data, id=author_id),
+        Author(**author_data_list[1], id="5f85f36d6dfecacc68428a47"),
+    ]
+    mock_authors_repository.delete_if_exists.return_value = False
+
+    with pytest.raises(ObjectNotFoundException):
+        await authors_service.merge(
+            ObjectId(author_id), ObjectId("5f85f36d6dfecacc68428a47")
+        )
+
+    mock_books_service.reassign_books_for_author.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_merge_author_is_restored_when_moving_books_fails(
+    authors_service, mock_authors_repository, mock_books_service
+):
+    author = Author(**author_data, id=author_id)
+    mock_authors_repository.get_one.side_effect = [
+        author,
+        Author(**author_data_list[1], id="5f85f36d6dfecacc68428a47"),
+    ]
+    mock_authors_repository.delete_if_exists.return_value = True
+    mock_books_service.reassign_books_for_author.side_effect = DatabaseException()
+
+    with pytest.raises(DatabaseException):
+        await authors_service.merge(
+            ObjectId(author_id), ObjectId("5f85f36d6dfecacc68428a47")
+        )
+
+    mock_authors_repository.save.assert_called_once_with(author)
+
+
+@pytest.mark.asyncio
+async def test_merge_author_is_restored_after_the_deadline(mock_books_service):
+    author = Author(**author_data, id=author_id)
+    mongo_engine = MagicMock(
+        find_one=AsyncMock(
+            side_effect=[
+                author,
+                Author(**author_data_list[1], id="5f85f36d6dfecacc68428a47"),
+            ]
+        ),
+        save=AsyncMock(return_value=author),
+    )
+    mongo_engine.get_collection.return_value.delete_one = AsyncMock(
+        return_value=MagicMock(deleted_count=1)
+    )
+    authors_service = AuthorsService(AuthorsRepository(mongo_engine), mock_books_service)
+
+    async def reassign_books_for_author(author_id, target_author_id):
+        await asyncio.sleep(0.06)
+        raise DeadlineExceededException(detail="Request deadline exceeded")
+
+    mock_books_service.reassign_books_for_author.side_effect = reassign_books_for_author
+    request_deadline.set(time.monotonic() + 0.05)
+
+    with pytest.raises(DeadlineExceededException):
+        await authors_service.merge(
+            ObjectId(author_id), ObjectId("5f85f36d6dfecacc68428a47")
+        )
+
+    mongo_engine.save.assert_awaited_once_with(author)
+
+
+@pytest.mark.asyncio
+async def test_suggest_authors(authors_service, mock_authors_repository):
+    mock_authors_repository.get_names.return_value = [
+        (ObjectId(author_id), "John Doe"),
+        (ObjectId("5f85f36d6dfecacc68428a47"), "Jane Doe"),
+    ]
+    await authors_service.build_names_index()
+
+    suggestions = authors_service.suggest("jo")
+
+    assert [suggestion.name for suggestion in suggestions] == ["John Doe"]
+    assert str(suggestions[0].id) == author_id
+
+
+@pytest.mark.asyncio
+async def test_create_and_delete_author_update_suggestions(
+    authors_service, mock_authors_repository
+):
+    created_author = Author(**author_data, id=ObjectId(author_id))
+    mock_authors_repository.save.return_value = created_author
+
+    await authors_service.create(BaseAuthorSchema(**author_data))
+
+    assert [suggestion.name for suggestion in authors_service.suggest("john")] == [
+        "John Doe"
+    ]
+
+    mock_authors_repository.get_one.return_value = created_author
+
+    await authors_service.delete(ObjectId(author_id))
+
+    assert authors_service.suggest("john") == []
+
+
+@pytest.mark.asyncio
+async def test_get_one_author_not_found(authors_service, mock_authors_repository):
+    mock_authors_repository.get_one_document.return_value = None
+
+    with pytest.raises(ObjectNotFoundException):
+        await authors_service.get_one(ObjectId(author_id))
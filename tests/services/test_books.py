@@ -44,14 +44,14 @@ book_data_list = [
     {
         "title": "John Doe Forever",
         "publication_date": "2024-01-23T21:19:18.307552",
-        "isbn": "1111112121",
+        "isbn": "9780306406157",
         "description": "John Doe rules the world",
         "author_id": author_id,
     },
     {
         "title": "John Doe Unstoppable",
         "publication_date": "2024-01-23T21:19:18.307552",
-        "isbn": "1111112122",
+        "isbn": "9780140449136",
         "description": "John Doe goes on",
         "author_id": author_id,
     },
@@ -60,7 +60,7 @@ book_data_list = [
 book_data = {
     "title": "John Doe Forever",
     "publication_date": "2024-01-23T21:19:18.307552",
-    "isbn": "1111112121",
+    "isbn": "9780306406157",
     "description": "John Doe rules the world",
     "author_id": author_id,
 }
@@ -125,12 +125,14 @@ async def test_update_book(books_service, mock_books_repository):
 
 @pytest.mark.asyncio
 async def test_get_one_book(books_service, mock_books_repository, mock_reviews_service):
-    mock_books_repository.get_one.return_value = Book(**book_data, id=ObjectId(book_id))
+    mock_books_repository.get_one_document.return_value = Book(
+        **book_data, id=ObjectId(book_id)
+    ).model_dump()
     mock_reviews_service.get_average_rating_for_book.return_value = 2.2
 
     retrieved_book = await books_service.get_one(ObjectId(book_id))
 
-    mock_books_repository.get_one.assert_called_once_with(ObjectId(book_id))
+    mock_books_repository.get_one_document.assert_called_once_with(ObjectId(book_id))
     assert isinstance(retrieved_book, BookOutSchema)
     assert retrieved_book.title == book_data["title"]
     assert str(retrieved_book.id) == book_id
@@ -139,7 +141,9 @@ async def test_get_one_book(books_service, mock_books_repository, mock_reviews_s
 
 @pytest.mark.asyncio
 async def test_get_one_book_without_rating(books_service, mock_books_repository):
-    mock_books_repository.get_one.return_value = Book(**book_data, id=ObjectId(book_id))
+    mock_books_repository.get_one_document.return_value = Book(
+        **book_data, id=ObjectId(book_id)
+    ).model_dump()
 
     retrieved_book = await books_service.get_one_without_rating(ObjectId(book_id))
 
@@ -177,6 +181,34 @@ async def test_query_filters(books_service, mock_books_repository):
     assert all(book.title in ["John Doe"] for book in result)
 
 
+def test_export_documents_filters(books_service, mock_books_repository):
+    author_object_id = ObjectId(author_id)
+
+    books_service.export_documents(
+        filter_attributes=[BookFilterEnum.author_id, BookFilterEnum.isbn],
+        filter_values=[author_id, "978-0-306-40615-7"],
+        sort=BookFilterEnum.publication_date,
+        sort_direction=SortEnum.desc,
+    )
+
+    mock_books_repository.export_documents.assert_called_once_with(
+        filters_dict={"author_id": author_object_id, "isbn": "9780306406157"},
+        sort=BookFilterEnum.publication_date,
+        sort_direction=SortEnum.desc,
+    )
+
+
+def test_export_documents_validates_filters_before_streaming(
+    books_service, mock_books_repository
+):
+    with pytest.raises(RequestValidationError):
+        books_service.export_documents(
+            filter_attributes=[BookFilterEnum.title], filter_values=["a", "b"]
+        )
+
+    mock_books_repository.export_documents.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_query_default(books_service, mock_books_repository):
     mock_books_repository.query.return_value = [Book(**data) for data in book_data_list]
@@ -300,3 +332,160 @@ async def test_delete_books_for_author(
         ObjectId(author_id)
     )
     mock_reviews_service.delete_reviews_for_books.assert_called_once_with(book_ids)
+
+
+@pytest.mark.asyncio
+async def test_reassign_books_for_author(books_service, mock_books_repository):
+    target_author_id = ObjectId("65b16d22dde26a309457be45")
+    mock_books_repository.reassign_books_for_author.return_value = 2
+
+    reassigned_count = await books_service.reassign_books_for_author(
+        ObjectId(author_id), target_author_id
+    )
+
+    mock_books_repository.reassign_books_for_author.assert_called_once_with(
+        ObjectId(author_id), target_author_id
+    )
+    assert reassigned_count == 2
+
+
+@pytest.mark.asyncio
+async def test_search_books(books_service, mock_books_repository):
+    mock_books_repository.search.return_value = (
+        [Book(**book_data_list[0])],
+        1,
+    )
+
+    items, total_count = await books_service.search(
+        "forever", author_id=ObjectId(author_id)
+    )
+
+    mock_books_repository.search.assert_called_once_with(
+        text="forever", author_id=ObjectId(author_id), page=1, size=10
+    )
+    assert total_count == 1
+    assert items[0].title == book_data_list[0]["title"]
+
+
+@pytest.mark.asyncio
+async def test_get_book_ids_for_author(books_service, mock_books_repository):
+    book_id = ObjectId("65b16d22dde26a309457be45")
+    mock_books_repository.get_books_for_author.return_value = [
+        Book(**book_data_list[0], id=book_id)
+    ]
+
+    book_ids = await books_service.get_book_ids_for_author(ObjectId(author_id))
+
+    mock_books_repository.get_books_for_author.assert_called_once_with(
+        ObjectId(author_id)
+    )
+    assert book_ids == [book_id]
+
+
+@pytest.mark.asyncio
+async def test_suggest_books(books_service, mock_books_repository):
+    mock_books_repository.get_titles.return_value = [
+        (ObjectId(book_id), "John Doe Forever"),
+        (ObjectId("65b16d22dde26a309457be45"), "Jane Doe Unstoppable"),
+    ]
+    await books_service.build_titles_index()
+
+    suggestions = books_service.suggest("john doe", limit=5)
+
+    assert [suggestion.title for suggestion in suggestions] == ["John Doe Forever"]
+    assert str(suggestions[0].id) == book_id
+
+
+@pytest.mark.asyncio
+async def test_update_book_updates_suggestions(books_service, mock_books_repository):
+    mock_books_repository.get_titles.return_value = [
+        (ObjectId(book_id), "John Doe Forever")
+    ]
+    await books_service.build_titles_index()
+    mock_books_repository.get_one.return_value = Book(**book_data, id=book_id)
+
+    await books_service.update(ObjectId(book_id), BookPatchSchema(title="Jane Doe"))
+
+    assert books_service.suggest("john") == []
+    assert [suggestion.title for suggestion in books_service.suggest("jane")] == [
+        "Jane Doe"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_one_book_by_isbn(
+    books_service, mock_books_repository, mock_reviews_service
+):
+    mock_books_repository.get_one_by_isbn.return_value = Book(
+        **book_data, id=ObjectId(book_id)
+    )
+    mock_reviews_service.get_average_rating_for_book.return_value = 4.5
+
+    result = await books_service.get_one_by_isbn(book_data["isbn"])
+
+    mock_books_repository.get_one_by_isbn.assert_called_once_with(book_data["isbn"])
+    mock_reviews_service.get_average_rating_for_book.assert_called_once_with(
+        ObjectId(book_id)
+    )
+    assert isinstance(result, BookOutSchema)
+    assert result.average_rating == 4.5
+
+
+@pytest.mark.asyncio
+async def test_get_one_book_by_isbn_not_found(
+    books_service, mock_books_repository, mock_reviews_service
+):
+    mock_books_repository.get_one_by_isbn.return_value = None
+
+    with pytest.raises(ObjectNotFoundException):
+        await books_service.get_one_by_isbn(book_data["isbn"])
+
+    mock_reviews_service.get_average_rating_for_book.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_books_by_isbns(books_service, mock_books_repository):
+    isbns = [book["isbn"] for book in book_data_list]
+    mock_books_repository.get_by_isbns.return_value = [
+        Book(**book) for book in book_data_list
+    ]
+
+    result = await books_service.get_by_isbns(isbns)
+
+    mock_books_repository.get_by_isbns.assert_called_once_with(isbns)
+    assert len(result) == 2
+
+
+@pytest.mark.asyncio
+async def test_query_normalizes_isbn_filter(books_service, mock_books_repository):
+    await books_service.query(
+        filter_attributes=[BookFilterEnum.isbn], filter_values=["0-306-40615-2"]
+    )
+
+    mock_books_repository.query.assert_called_once_with(
+        filters_dict={"isbn": "9780306406157"},
+        sort=BookFilterEnum.title,
+        sort_direction=SortEnum.asc,
+        page=1,
+        size=10,
+    )
+
+
+@pytest.mark.asyncio
+async def test_query_invalid_isbn_filter(books_service, mock_books_repository):
+    with pytest.raises(RequestValidationError):
+        await books_service.query(
+            filter_attributes=[BookFilterEnum.isbn], filter_values=["123"]
+        )
+
+    mock_books_repository.query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_one_book_not_found(
+    books_service, mock_books_repository, mock_reviews_service
+):
+    mock_books_repository.get_one_document.return_value = None
+
+    with pytest.raises(ObjectNotFoundException):
+        await books_service.get_one(ObjectId(book_id))
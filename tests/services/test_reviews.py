@@ -362,3 +362,67 @@ async def test_delete_reviews_for_user(reviews_service, mock_reviews_repository)
     mock_reviews_repository.delete_reviews_by_user.assert_called_once_with(
         ObjectId(user_1_id)
     )
+
+
+@pytest.mark.asyncio
+async def test_search_reviews(reviews_service, mock_reviews_repository):
+    mock_reviews_repository.search.return_value = ([Review(**review_data)], 1)
+
+    items, total_count = await reviews_service.search("heavy", page=2, size=5)
+
+    mock_reviews_repository.search.assert_called_once_with(
+        text="heavy", book_ids=None, page=2, size=5
+    )
+    assert total_count == 1
+
+
+@pytest.mark.asyncio
+async def test_search_reviews_for_author(
+    reviews_service, mock_reviews_repository, mock_books_service
+):
+    author_id = ObjectId("5f85f36d6dfecacc68428a46")
+    book_ids = [ObjectId(book_1_id), ObjectId(book_2_id)]
+    mock_books_service.get_book_ids_for_author.return_value = book_ids
+    mock_reviews_repository.search.return_value = ([], 0)
+
+    await reviews_service.search("heavy", author_id=author_id)
+
+    mock_books_service.get_book_ids_for_author.assert_called_once_with(author_id)
+    mock_reviews_repository.search.assert_called_once_with(
+        text="heavy", book_ids=book_ids, page=1, size=10
+    )
+
+
+@pytest.mark.asyncio
+async def test_query_documents(reviews_service, mock_reviews_repository):
+    documents = [{"id": ObjectId(), **review_data}]
+    mock_reviews_repository.query_documents.return_value = (documents, 1)
+
+    result = await reviews_service.query_documents(
+        filter_attributes=[ReviewFilterEnum.user_id],
+        filter_values=[user_1_id],
+        sort=ReviewFilterEnum.rating,
+        sort_direction=SortEnum.desc,
+        page=3,
+        size=50,
+    )
+
+    mock_reviews_repository.query_documents.assert_called_once_with(
+        filters_dict={"user_id": ObjectId(user_1_id)},
+        sort=ReviewFilterEnum.rating,
+        sort_direction=SortEnum.desc,
+        page=3,
+        size=50,
+    )
+    assert result == (documents, 1)
+
+
+@pytest.mark.asyncio
+async def test_query_documents_wrong_filters(reviews_service, mock_reviews_repository):
+    with pytest.raises(RequestValidationError):
+        await reviews_service.query_documents(
+            filter_attributes=[ReviewFilterEnum.user_id, ReviewFilterEnum.rating],
+            filter_values=[user_1_id],
+        )
+
+    mock_reviews_repository.query_documents.assert_not_called()
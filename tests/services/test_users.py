@@ -5,7 +5,7 @@ import pytest
 from fastapi.exceptions import RequestValidationError
 from odmantic import ObjectId
 
-from books_reviewing.exceptions import ObjectNotFoundException
+from books_reviewing.exceptions import ObjectNotFoundException, ConflictException
 from books_reviewing.models import User
 from books_reviewing.repositories.users import UsersRepository
 from books_reviewing.schemas.base import SortEnum
@@ -16,7 +16,9 @@ from books_reviewing.services.users import UsersService
 
 @pytest.fixture
 def mock_users_repository():
-    return MagicMock(spec=UsersRepository)
+    mock_users_repository = MagicMock(spec=UsersRepository)
+    mock_users_repository.get_one_by_email.return_value = None
+    return mock_users_repository
 
 
 @pytest.fixture
@@ -214,3 +216,70 @@ async def test_patch_user_not_found(users_service, mock_users_repository):
 
     mock_users_repository.get_one.assert_called_once_with(ObjectId(user_id))
     mock_users_repository.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_user_with_taken_email(users_service, mock_users_repository):
+    mock_users_repository.get_one_by_email.return_value = User(**user_data)
+
+    with pytest.raises(ConflictException):
+        await users_service.create(BaseUserSchema(**user_data))
+
+    mock_users_repository.get_one_by_email.assert_called_once_with(user_data["email"])
+    mock_users_repository.save.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_user_with_taken_email(users_service, mock_users_repository):
+    mock_users_repository.get_one.return_value = User(**user_data_list[0], id=user_id)
+    mock_users_repository.get_one_by_email.return_value = User(**user_data_list[1])
+
+    with pytest.raises(ConflictException):
+        await users_service.update(
+            ObjectId(user_id), UserPatchSchema(email=user_data_list[1]["email"])
+        )
+
+    mock_users_repository.save.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_user_keeping_email(users_service, mock_users_repository):
+    mock_users_repository.get_one.return_value = User(**user_data_list[0], id=user_id)
+
+    await users_service.update(
+        ObjectId(user_id), UserPatchSchema(email=user_data_list[0]["email"])
+    )
+
+    mock_users_repository.get_one_by_email.assert_not_called()
+    mock_users_repository.save.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_one_user_by_email(users_service, mock_users_repository):
+    mock_users_repository.get_one_by_email.return_value = User(**user_data, id=user_id)
+
+    user = await users_service.get_one_by_email(user_data["email"])
+
+    mock_users_repository.get_one_by_email.assert_called_once_with(user_data["email"])
+    assert str(user.id) == user_id
+
+
+@pytest.mark.asyncio
+async def test_get_one_user_by_email_not_found(users_service, mock_users_repository):
+    with pytest.raises(ObjectNotFoundException):
+        await users_service.get_one_by_email(user_data["email"])
+
+
+@pytest.mark.asyncio
+async def test_query_lowercases_email_filter(users_service, mock_users_repository):
+    await users_service.query(
+        filter_attributes=[UserFilterEnum.email], filter_values=["John@Doe.com"]
+    )
+
+    mock_users_repository.query.assert_called_once_with(
+        filters_dict={"email": "john@doe.com"},
+        sort=UserFilterEnum.name,
+        sort_direction=SortEnum.asc,
+        page=1,
+        size=10,
+    )
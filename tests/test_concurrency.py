@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from books_reviewing.concurrency import gather, gather_writes
+from books_reviewing.deadlines import request_deadline
+from books_reviewing.exceptions import (
+    DeadlineExceededException,
+    ObjectNotFoundException,
+)
+
+
+async def return_after(value, seconds: float):
+    await asyncio.sleep(seconds)
+    return value
+
+
+async def raise_after(exception: Exception, seconds: float):
+    await asyncio.sleep(seconds)
+    raise exception
+
+
+@pytest.mark.asyncio
+async def test_gather_returns_results_in_order():
+    assert await gather(return_after(1, 0.02), return_after(2, 0)) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_gather_raises_first_error_and_cancels_siblings():
+    slow = asyncio.ensure_future(asyncio.sleep(10))
+
+    async def wait_for_slow():
+        await slow
+
+    with pytest.raises(ObjectNotFoundException):
+        await gather(
+            wait_for_slow(), raise_after(ObjectNotFoundException(detail="gone"), 0)
+        )
+
+    assert slow.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_gather_stops_at_the_request_deadline():
+    token = request_deadline.set(time.monotonic() + 0.05)
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceededException):
+            await gather(return_after(1, 10), return_after(2, 0))
+    finally:
+        request_deadline.reset(token)
+
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_gather_writes_finishes_every_write_before_raising():
+    token = request_deadline.set(time.monotonic() + 0.01)
+    try:
+        slow = asyncio.ensure_future(return_after(1, 0.05))
+        with pytest.raises(ObjectNotFoundException):
+            await gather_writes(
+                slow, raise_after(ObjectNotFoundException(detail="gone"), 0)
+            )
+    finally:
+        request_deadline.reset(token)
+
+    assert slow.result() == 1
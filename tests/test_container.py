@@ -0,0 +1,106 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from books_reviewing.container import Container
+
+
+def test_container_is_lazy():
+    container = Container("mongodb://mongo:27017/", "test")
+
+    assert container._Container__mongo_client is None
+    assert container._Container__services is None
+
+
+def test_container_wires_services():
+    container = Container("mongodb://mongo:27017/", "test")
+
+    assert container.users_service.reviews_service is container.reviews_service
+    assert container.authors_service.books_service is container.books_service
+    assert (
+        container.books_service._BooksService__authors_service
+        is container.authors_service
+    )
+    assert container.books_service.reviews_service is container.reviews_service
+    assert container.reviews_service.books_service is container.books_service
+    assert container.reviews_service.users_service is container.users_service
+    assert container.mongo_engine.client is container.mongo_client
+    assert container.mongo_engine.database_name == "test"
+
+    container.close()
+
+
+def test_container_close_resets():
+    container = Container("mongodb://mongo:27017/", "test")
+    mongo_client = container.mongo_client
+    users_service = container.users_service
+
+    container.close()
+
+    assert container.mongo_client is not mongo_client
+    assert container.users_service is not users_service
+    container.close()
+
+
+@pytest.mark.asyncio
+async def test_container_start_profiles_phases(monkeypatch):
+    container = Container("mongodb://mongo:27017/", "test")
+    monkeypatch.setattr(
+        "books_reviewing.container.prewarm_pool", AsyncMock(return_value=None)
+    )
+    container._Container__mongo_engine = MagicMock(configure_database=AsyncMock())
+    container.authors_service.build_names_index = AsyncMock()
+    container.books_service.build_titles_index = AsyncMock()
+
+    await container.start()
+
+    assert list(container.startup_profile) == [
+        "prewarm_pool",
+        "configure_database",
+        "build_suggestion_indexes",
+    ]
+    container.authors_service.build_names_index.assert_awaited_once()
+    container.books_service.build_titles_index.assert_awaited_once()
+    assert container.ready
+    assert container.status == "ready"
+    container.close()
+
+
+@pytest.mark.asyncio
+async def test_container_start_failure_is_reported(monkeypatch):
+    container = Container("mongodb://mongo:27017/", "test")
+    monkeypatch.setattr(
+        "books_reviewing.container.prewarm_pool",
+        AsyncMock(side_effect=ConnectionError("mongo:27017 unreachable")),
+    )
+
+    with pytest.raises(ConnectionError):
+        await container.start()
+
+    assert not container.ready
+    assert container.status == "failed"
+    assert container.startup_error == "ConnectionError: mongo:27017 unreachable"
+    container.close()
+
+
+@pytest.mark.asyncio
+async def test_container_refreshes_suggestion_indexes_once_ready():
+    container = Container("mongodb://mongo:27017/", "test")
+    container.authors_service.build_names_index = AsyncMock()
+    container.books_service.build_titles_index = AsyncMock(
+        side_effect=[ConnectionError("mongo:27017 unreachable"), None]
+    )
+
+    refresh = asyncio.create_task(container.refresh_suggestion_indexes(0.01))
+    await asyncio.sleep(0.05)
+    container.books_service.build_titles_index.assert_not_awaited()
+    container.ready = True
+    while container.books_service.build_titles_index.await_count < 2:
+        await asyncio.sleep(0.01)
+    refresh.cancel()
+    await asyncio.gather(refresh, return_exceptions=True)
+
+    # The failed rebuild was logged and the next one still ran.
+    assert container.authors_service.build_names_index.await_count >= 2
+    container.close()
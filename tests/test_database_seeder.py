@@ -0,0 +1,157 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from books_reviewing.database_seeder import DatabaseSeeder, SEED_LOCK_ID
+
+
+def make_seeder() -> tuple[DatabaseSeeder, MagicMock]:
+    locks = MagicMock(
+        insert_one=AsyncMock(),
+        find_one_and_update=AsyncMock(return_value=None),
+        update_one=AsyncMock(return_value=MagicMock(matched_count=1)),
+        delete_one=AsyncMock(),
+    )
+    mongo_client = MagicMock()
+    mongo_client.__getitem__.return_value.__getitem__.return_value = locks
+    database_seeder = DatabaseSeeder(
+        MagicMock(), MagicMock(), MagicMock(), MagicMock(), mongo_client, "test"
+    )
+    database_seeder.seed_database = AsyncMock()
+    database_seeder.clear_database = AsyncMock()
+    return database_seeder, locks
+
+
+@pytest.mark.asyncio
+async def test_seed_once_first_worker_seeds():
+    database_seeder, locks = make_seeder()
+
+    await database_seeder.seed_once()
+
+    assert locks.insert_one.await_args.args[0]["_id"] == SEED_LOCK_ID
+    (worker,) = locks.insert_one.await_args.args[0]["workers"]
+    assert worker["owner"] == database_seeder.owner
+    database_seeder.seed_database.assert_awaited_once()
+    assert locks.update_one.await_args.args[1]["$set"] == {"state": "seeded"}
+
+
+@pytest.mark.asyncio
+async def test_seed_once_joins_seeded_database():
+    database_seeder, locks = make_seeder()
+    locks.insert_one.side_effect = DuplicateKeyError("duplicate")
+    locks.find_one_and_update.return_value = {"_id": SEED_LOCK_ID}
+
+    await database_seeder.seed_once()
+
+    filter, update = locks.find_one_and_update.await_args.args
+    assert filter == {"_id": SEED_LOCK_ID, "state": "seeded"}
+    assert update["$push"]["workers"]["owner"] == database_seeder.owner
+    database_seeder.seed_database.assert_not_awaited()
+    database_seeder.clear_database.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_seed_once_waits_for_other_worker():
+    database_seeder, locks = make_seeder()
+    locks.insert_one.side_effect = DuplicateKeyError("duplicate")
+    locks.find_one_and_update.side_effect = [None, None, {"_id": SEED_LOCK_ID}]
+
+    await database_seeder.seed_once(poll_interval=0)
+
+    assert locks.insert_one.await_count == 2
+    database_seeder.seed_database.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_seed_once_takes_over_expired_lease():
+    database_seeder, locks = make_seeder()
+    locks.insert_one.side_effect = DuplicateKeyError("duplicate")
+    locks.find_one_and_update.side_effect = [None, {"_id": SEED_LOCK_ID}]
+
+    await database_seeder.seed_once()
+
+    database_seeder.clear_database.assert_awaited_once()
+    database_seeder.seed_database.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_seed_once_renews_the_lease_while_seeding():
+    database_seeder, locks = make_seeder()
+
+    async def seed_database():
+        await asyncio.sleep(0.05)
+
+    database_seeder.seed_database = seed_database
+
+    await database_seeder.seed_once(lease_seconds=0.03)
+
+    renewal_filter, renewal = locks.update_one.await_args_list[0].args
+    assert renewal_filter["state"] == "seeding"
+    assert renewal["$set"]["workers"][0]["owner"] == database_seeder.owner
+    assert locks.update_one.await_args.args[1]["$set"] == {"state": "seeded"}
+
+
+@pytest.mark.asyncio
+async def test_seed_once_stops_seeding_when_the_lease_is_lost():
+    database_seeder, locks = make_seeder()
+    locks.update_one.return_value = MagicMock(matched_count=0)
+    seeding = asyncio.Event()
+
+    async def seed_database():
+        await asyncio.sleep(10)
+        seeding.set()
+
+    database_seeder.seed_database = seed_database
+
+    with pytest.raises(RuntimeError):
+        await database_seeder.seed_once(lease_seconds=0.03)
+
+    assert not seeding.is_set()
+    assert all(
+        call.args[1].get("$set") != {"state": "seeded"}
+        for call in locks.update_one.await_args_list
+    )
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_drops_expired_workers_and_renews_this_one():
+    database_seeder, locks = make_seeder()
+
+    await database_seeder.heartbeat()
+
+    (pull_filter, pull), (renew_filter, renew) = [
+        call.args for call in locks.update_one.await_args_list
+    ]
+    assert "$lt" in pull["$pull"]["workers"]["expires_at"]
+    assert renew_filter["workers.owner"] == database_seeder.owner
+    assert "workers.$.expires_at" in renew["$set"]
+
+
+@pytest.mark.asyncio
+async def test_release_keeps_data_for_other_workers():
+    database_seeder, locks = make_seeder()
+
+    await database_seeder.release()
+
+    assert locks.update_one.await_args.args[1] == {
+        "$pull": {"workers": {"owner": database_seeder.owner}}
+    }
+    database_seeder.clear_database.assert_not_awaited()
+    locks.delete_one.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_release_last_live_worker_clears():
+    database_seeder, locks = make_seeder()
+    locks.find_one_and_update.return_value = {"_id": SEED_LOCK_ID, "workers": []}
+
+    await database_seeder.release()
+
+    filter = locks.find_one_and_update.await_args.args[0]
+    assert "$elemMatch" in filter["workers"]["$not"]
+    database_seeder.clear_database.assert_awaited_once()
+    locks.delete_one.assert_awaited_once_with(
+        {"_id": SEED_LOCK_ID, "owner": database_seeder.owner}
+    )
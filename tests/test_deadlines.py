@@ -0,0 +1,40 @@
+import pytest
+
+from books_reviewing.deadlines import (
+    MAX_BUDGET_MS,
+    RequestDeadline,
+    remaining_seconds,
+    request_deadline,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_deadline():
+    token = request_deadline.set(None)
+    yield
+    request_deadline.reset(token)
+
+
+def test_no_deadline_by_default():
+    assert remaining_seconds() is None
+
+
+@pytest.mark.asyncio
+async def test_route_budget():
+    await RequestDeadline(budget_ms=2000)(None)
+
+    assert 1.5 < remaining_seconds() <= 2
+
+
+@pytest.mark.asyncio
+async def test_header_overrides_route_budget():
+    await RequestDeadline(budget_ms=2000)(500)
+
+    assert 0 < remaining_seconds() <= 0.5
+
+
+@pytest.mark.asyncio
+async def test_header_is_capped_at_max_budget():
+    await RequestDeadline()(MAX_BUDGET_MS * 10)
+
+    assert remaining_seconds() <= MAX_BUDGET_MS / 1000
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+from odmantic.exceptions import DuplicateKeyError
+from pymongo import _csot
+from pymongo.errors import (
+    DuplicateKeyError as DriverDuplicateKeyError,
+    ExecutionTimeout,
+    NetworkTimeout,
+)
+
+from books_reviewing.exceptions import (
+    ConflictException,
+    DatabaseException,
+    DeadlineExceededException,
+    database_exception_wrapper,
+)
+from books_reviewing.deadlines import request_deadline
+
+
+@database_exception_wrapper
+async def raise_exception(exception: Exception):
+    raise exception
+
+
+@database_exception_wrapper
+async def get_timeout() -> float | None:
+    return _csot.get_timeout()
+
+
+def deadline_in(seconds: float):
+    # Each async test runs in its own context, so this does not leak.
+    request_deadline.set(time.monotonic() + seconds)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_key_errors_are_conflicts():
+    with pytest.raises(ConflictException):
+        await raise_exception(DriverDuplicateKeyError("E11000 duplicate key"))
+
+    with pytest.raises(ConflictException):
+        await raise_exception(
+            DuplicateKeyError(None, DriverDuplicateKeyError("E11000 duplicate key"))
+        )
+
+
+@pytest.mark.asyncio
+async def test_other_errors_are_database_exceptions():
+    with pytest.raises(DatabaseException):
+        await raise_exception(ValueError("boom"))
+
+
+@pytest.mark.asyncio
+async def test_no_client_timeout_without_deadline():
+    assert await get_timeout() is None
+
+
+@pytest.mark.asyncio
+async def test_remaining_budget_is_the_client_timeout():
+    deadline_in(2)
+
+    timeout = await get_timeout()
+
+    assert 1.5 < timeout <= 2
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_skips_the_call():
+    deadline_in(-1)
+
+    with pytest.raises(DeadlineExceededException):
+        await raise_exception(AssertionError("must not be called"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "exception",
+    [
+        ExecutionTimeout("operation exceeded time limit", 50),
+        NetworkTimeout("timed out"),
+    ],
+)
+async def test_driver_timeouts_exceed_the_deadline(exception):
+    deadline_in(2)
+
+    with pytest.raises(DeadlineExceededException):
+        await raise_exception(exception)
+
+
+@pytest.mark.asyncio
+async def test_driver_timeouts_without_deadline_are_database_exceptions():
+    with pytest.raises(DatabaseException):
+        await raise_exception(NetworkTimeout("timed out"))
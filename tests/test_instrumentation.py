@@ -0,0 +1,117 @@
+import logging
+
+import pytest
+from odmantic import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from books_reviewing import instrumentation
+from books_reviewing.exceptions import ConflictException, database_exception_wrapper
+from books_reviewing.instrumentation import (
+    RepositoryCall,
+    SlowQueryLog,
+    result_size,
+    value_shape,
+)
+from books_reviewing.models import Book
+from books_reviewing.schemas.base import SortEnum
+
+
+class BooksRepository:
+    @database_exception_wrapper
+    async def query(
+        self,
+        sort: str,
+        sort_direction: str,
+        page: int,
+        size: int,
+        filters_dict: dict = None,
+    ):
+        return ["book"] * size, 100
+
+    @database_exception_wrapper
+    async def save(self, book):
+        raise DuplicateKeyError("E11000 duplicate key")
+
+
+@pytest.fixture
+def calls() -> list[RepositoryCall]:
+    calls = []
+    instrumentation.add_observer(calls.append)
+    yield calls
+    instrumentation.remove_observer(calls.append)
+
+
+def test_value_shape_masks_user_data():
+    assert value_shape(
+        {"author_id": ObjectId(), "title": "Pepa", "tags": ["a", "b"], "size": 10}
+    ) == {"author_id": "ObjectId", "title": "str", "tags": ["str"], "size": 10}
+    assert value_shape(SortEnum.desc) == "desc"
+    assert value_shape("title", visible=True) == "title"
+
+
+def test_result_size():
+    assert result_size(None) == 0
+    assert result_size((["a", "b"], 10)) == 2
+    assert result_size(["a", "b", "c"]) == 3
+    assert result_size({"_id": 1}) == 1
+    assert result_size(5) is None
+
+
+@pytest.mark.asyncio
+async def test_observers_get_duration_result_and_shape(calls):
+    await BooksRepository().query("title", "asc", 1, 5, {"author_id": ObjectId()})
+
+    (call,) = calls
+    assert call.labels == ("BooksRepository", "query")
+    assert call.duration > 0
+    assert call.result_size == 5
+    assert call.error_class == "none"
+    assert call.shape() == {
+        "sort": "title",
+        "sort_direction": "asc",
+        "page": 1,
+        "size": 5,
+        "filters_dict": {"author_id": "ObjectId"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_observers_get_the_driver_error(calls):
+    with pytest.raises(ConflictException):
+        await BooksRepository().save(Book)
+
+    assert calls[0].error_class == "DuplicateKeyError"
+
+
+def slow_call(duration: float) -> RepositoryCall:
+    return RepositoryCall(
+        BooksRepository.query.__wrapped__,
+        (None, "title", "asc", 1, 10),
+        {"filters_dict": {"title": "Pepa"}},
+        duration,
+        (["book"], 1),
+        None,
+    )
+
+
+def test_slow_query_log(caplog):
+    slow_query_log = SlowQueryLog(threshold_ms=100)
+
+    with caplog.at_level(logging.WARNING, logger="books_reviewing.slow_queries"):
+        slow_query_log(slow_call(0.05))
+        slow_query_log(slow_call(0.25))
+
+    (record,) = caplog.records
+    assert "BooksRepository.query took 250.0 ms" in record.getMessage()
+    assert record.result_size == 1
+    assert record.shape["filters_dict"] == {"title": "str"}
+
+
+def test_slow_query_log_sampling(caplog, monkeypatch):
+    monkeypatch.setattr("books_reviewing.instrumentation.random.random", lambda: 0.5)
+
+    with caplog.at_level(logging.WARNING, logger="books_reviewing.slow_queries"):
+        SlowQueryLog(threshold_ms=100, sample_rate=0.4)(slow_call(0.25))
+        SlowQueryLog(threshold_ms=100, sample_rate=0.6)(slow_call(0.25))
+
+    assert len(caplog.records) == 1
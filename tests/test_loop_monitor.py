@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from books_reviewing.loop_monitor import LoopLagMonitor
+from books_reviewing.metrics import event_loop_lag, event_loop_stalls
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+def blocking_call(seconds: float):
+    time.sleep(seconds)
+
+
+async def run_blocked(monitor: LoopLagMonitor, seconds: float):
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.05)
+    blocking_call(seconds)
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_lag_is_recorded_and_stalls_counted():
+    event_loop_lag.clear()
+    event_loop_stalls.clear()
+
+    await run_blocked(LoopLagMonitor(interval=0.01, threshold=0.1), 0.2)
+
+    buckets = event_loop_lag.values[()]
+    assert sum(buckets[:-1]) > 1
+    assert event_loop_stalls.values[()] == 1
+
+
+@pytest.mark.asyncio
+async def test_watchdog_logs_the_blocking_stack_once():
+    handler = ListHandler()
+    logger = logging.getLogger("tests.loop_monitor")
+    logger.addHandler(handler)
+    monitor = LoopLagMonitor(
+        interval=0.01, threshold=0.05, capture_stacks=True, logger=logger
+    )
+    try:
+        await run_blocked(monitor, 0.3)
+    finally:
+        logger.removeHandler(handler)
+
+    (record,) = handler.records
+    assert "blocking_call" in record.stack
+    assert record.blocked_ms >= 50
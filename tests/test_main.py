@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys, threading
+import books_reviewing.main
+print(json.dumps({
+    "threads": threading.active_count(),
+    "duplicated_modules": sorted(
+        m for m in sys.modules if "books_reviewing." + m in sys.modules
+    ),
+}))
+"""
+
+
+def test_importing_the_app_loads_each_module_once_and_starts_no_threads():
+    # books_reviewing is on the path too, as in the Dockerfile and the test
+    # runs, so a bare "import exceptions" would load a second copy.
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join([str(ROOT), str(ROOT / "books_reviewing")]),
+        },
+        check=True,
+    )
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["duplicated_modules"] == []
+    assert probe["threads"] == 1
@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+import time
+
+from books_reviewing.instrumentation import RepositoryCall
+from books_reviewing.metrics import (
+    MetricsRegistry,
+    clear_snapshots,
+    merge_snapshots,
+    observe_repository_call,
+    render,
+    repository_call_duration,
+    repository_calls,
+    repository_result_size,
+)
+from books_reviewing.repositories.books import BooksRepository
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1)
+    )
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(("/books/",), value)
+
+    text = render(registry.collect())
+
+    assert 'latency_seconds_bucket{route="/books/",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/books/",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/books/",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/books/"} 4' in text
+    assert 'latency_seconds_sum{route="/books/"} 2.65' in text
+    assert "# TYPE latency_seconds histogram" in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.", ("route",)).inc(('/a"b\\',))
+
+    assert 'requests_total{route="/a\\"b\\\\"} 1' in render(registry.collect())
+
+
+def test_collectors_run_before_snapshot():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("buckets", "Buckets.")
+    registry.add_collector(lambda: gauge.set((), 7))
+
+    assert registry.snapshot()["buckets"]["values"] == [[[], 7]]
+
+
+def test_merge_sums_workers():
+    first, second = MetricsRegistry(), MetricsRegistry()
+    for registry, count in ((first, 1), (second, 2)):
+        registry.counter("requests_total", "Requests.", ("status",)).inc(
+            ("200",), count
+        )
+        registry.histogram("latency_seconds", "Latency.", buckets=(1,)).observe(
+            (), count
+        )
+
+    merged = merge_snapshots([first.snapshot(), second.snapshot()])
+
+    assert merged["requests_total"]["values"] == {("200",): 3}
+    assert merged["latency_seconds"]["values"] == {(): [1, 1, 3]}
+
+
+def write_snapshot_of(registry: MetricsRegistry, pid: int) -> str:
+    registry.write_snapshot()
+    path = os.path.join(registry.directory, f"metrics-{pid}.json")
+    os.rename(registry.snapshot_path, path)
+    return path
+
+
+def test_collect_merges_snapshots_of_other_workers(tmp_path):
+    other = MetricsRegistry(str(tmp_path))
+    other.counter("requests_total", "Requests.").inc((), 5)
+    write_snapshot_of(other, os.getppid())
+    registry = MetricsRegistry(str(tmp_path))
+    registry.counter("requests_total", "Requests.").inc()
+
+    assert registry.collect()["requests_total"]["values"] == {(): 6}
+
+    clear_snapshots(str(tmp_path))
+    assert registry.collect()["requests_total"]["values"] == {(): 1}
+
+
+def test_collect_drops_exited_workers_and_stale_gauges(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    dead = MetricsRegistry(str(tmp_path))
+    dead.gauge("in_flight", "In flight.").set((), 3)
+    dead_path = write_snapshot_of(dead, exited.pid)
+    stale = MetricsRegistry(str(tmp_path))
+    stale.gauge("in_flight", "In flight.").set((), 2)
+    stale.counter("requests_total", "Requests.").inc((), 4)
+    stale_path = write_snapshot_of(stale, os.getppid())
+    os.utime(stale_path, (time.time() - 60, time.time() - 60))
+    registry = MetricsRegistry(str(tmp_path), stale_after=15)
+    registry.gauge("in_flight", "In flight.").set((), 1)
+    registry.counter("requests_total", "Requests.").inc()
+
+    merged = registry.collect()
+
+    assert merged["in_flight"]["values"] == {(): 1}
+    assert merged["requests_total"]["values"] == {(): 5}
+    assert not os.path.exists(dead_path)
+
+
+def test_observe_repository_call():
+    repository_call_duration.clear()
+    repository_calls.clear()
+    repository_result_size.clear()
+
+    observe_repository_call(
+        RepositoryCall(BooksRepository.get_all, (), {}, 0.02, ["book", "book"], None)
+    )
+
+    labels = ("BooksRepository", "get_all")
+    assert repository_calls.values[(*labels, "none")] == 1
+    assert repository_call_duration.values[labels][-1] == 0.02
+    assert repository_result_size.values[labels][2] == 1
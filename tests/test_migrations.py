@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from odmantic import ObjectId
+
+from books_reviewing.migrations import normalize_stored_emails, normalize_stored_isbns
+
+first_id = ObjectId("5f85f36d6dfecacc68428a46")
+second_id = ObjectId("5f85f36d6dfecacc68428a47")
+third_id = ObjectId("5f85f36d6dfecacc68428a48")
+fourth_id = ObjectId("5f85f36d6dfecacc68428a49")
+fifth_id = ObjectId("5f85f36d6dfecacc68428a4a")
+
+
+def create_collection(documents: list[dict]) -> MagicMock:
+    async def find(*args):
+        for document in documents:
+            yield document
+
+    collection = MagicMock(bulk_write=AsyncMock())
+    collection.find.side_effect = find
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_normalize_stored_isbns_reports_what_it_cannot_fix():
+    collection = create_collection(
+        [
+            {"_id": first_id, "isbn": "0-306-40615-2"},
+            {"_id": second_id, "isbn": "978-0-201-63361-0"},
+            {"_id": third_id, "isbn": "9780201633610"},
+            {"_id": fourth_id, "isbn": "9781861972712"},
+            {"_id": fifth_id, "isbn": "not an isbn"},
+        ]
+    )
+
+    report = await normalize_stored_isbns(collection)
+
+    (updates,) = collection.bulk_write.await_args.args
+    assert [(update._filter, update._doc) for update in updates] == [
+        ({"_id": first_id}, {"$set": {"isbn": "9780306406157"}})
+    ]
+    assert report.updated == 1
+    assert report.duplicates == {"9780201633610": [second_id, third_id]}
+    assert report.invalid == {fifth_id: "not an isbn"}
+    assert not report.clean
+
+
+@pytest.mark.asyncio
+async def test_normalize_stored_isbns_dry_run_writes_nothing():
+    collection = create_collection([{"_id": first_id, "isbn": "0306406152"}])
+
+    report = await normalize_stored_isbns(collection, dry_run=True)
+
+    assert report.updated == 1
+    assert report.clean
+    collection.bulk_write.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_normalize_stored_emails_lowercases_and_reports_case_variants():
+    collection = create_collection(
+        [
+            {"_id": first_id, "email": "Reader@Example.com"},
+            {"_id": second_id, "email": "twin@example.com"},
+            {"_id": third_id, "email": "Twin@Example.com"},
+            {"_id": fourth_id, "email": "lower@example.com"},
+        ]
+    )
+
+    report = await normalize_stored_emails(collection)
+
+    (updates,) = collection.bulk_write.await_args.args
+    assert [(update._filter, update._doc) for update in updates] == [
+        ({"_id": first_id}, {"$set": {"email": "reader@example.com"}})
+    ]
+    assert report.updated == 1
+    assert report.duplicates == {"twin@example.com": [second_id, third_id]}
+    assert report.invalid == {}
+    assert not report.clean
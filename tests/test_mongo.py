@@ -0,0 +1,129 @@
+import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from pymongo import monitoring
+
+from books_reviewing.mongo import (
+    CommandMonitor,
+    LatencyRecorder,
+    PoolMonitor,
+    client_options_from_env,
+    prewarm_pool,
+)
+
+address = ("localhost", 27017)
+
+
+def test_latency_recorder_snapshot():
+    recorder = LatencyRecorder(window=100)
+    for milliseconds in range(1, 101):
+        recorder.record(milliseconds, failed=milliseconds > 98)
+
+    snapshot = recorder.snapshot()
+
+    assert snapshot["count"] == 100
+    assert snapshot["failures"] == 2
+    assert snapshot["mean_ms"] == 50.5
+    assert snapshot["max_ms"] == 100
+    assert snapshot["p50_ms"] == 50
+    assert snapshot["p95_ms"] == 95
+    assert snapshot["p99_ms"] == 99
+
+
+def test_latency_recorder_percentiles_use_last_window():
+    recorder = LatencyRecorder(window=2)
+    for milliseconds in (100, 1, 2):
+        recorder.record(milliseconds)
+
+    snapshot = recorder.snapshot()
+
+    assert snapshot["count"] == 3
+    assert snapshot["max_ms"] == 100
+    assert snapshot["p99_ms"] == 2
+
+
+def test_empty_latency_recorder_snapshot():
+    assert LatencyRecorder().snapshot()["p50_ms"] == 0.0
+
+
+def test_pool_monitor_tracks_connections_and_checkouts():
+    pool_monitor = PoolMonitor()
+    pool_monitor.pool_created(
+        monitoring.PoolCreatedEvent(address, {"maxPoolSize": 10, "minPoolSize": 2})
+    )
+    for connection_id in (1, 2):
+        pool_monitor.connection_created(
+            monitoring.ConnectionCreatedEvent(address, connection_id)
+        )
+        pool_monitor.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+        )
+        pool_monitor.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(address, connection_id)
+        )
+    pool_monitor.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+    pool_monitor.connection_check_out_started(
+        monitoring.ConnectionCheckOutStartedEvent(address)
+    )
+    pool_monitor.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(address, "timeout")
+    )
+
+    pool = pool_monitor.snapshot()["localhost:27017"]
+
+    assert pool["max_size"] == 10
+    assert pool["min_size"] == 2
+    assert pool["open"] == 2
+    assert pool["in_use"] == 1
+    assert pool["checkout_wait"]["count"] == 3
+    assert pool["checkout_wait"]["failures"] == 1
+
+
+def test_command_monitor_records_latency_per_command():
+    command_monitor = CommandMonitor()
+    for duration_ms in (2, 4):
+        command_monitor.succeeded(
+            monitoring.CommandSucceededEvent(
+                datetime.timedelta(milliseconds=duration_ms), {}, "find", 1, address, 1
+            )
+        )
+    command_monitor.failed(
+        monitoring.CommandFailedEvent(
+            datetime.timedelta(milliseconds=8), {}, "find", 2, address, 2
+        )
+    )
+
+    find = command_monitor.snapshot()["find"]
+
+    assert find["count"] == 3
+    assert find["failures"] == 1
+    assert find["max_ms"] == 8
+    assert find["p50_ms"] == 4
+
+
+def test_client_options_from_env(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "50")
+    monkeypatch.setenv("MONGO_MIN_POOL_SIZE", "5")
+    monkeypatch.setenv("MONGO_COMPRESSORS", "zstd,zlib")
+    monkeypatch.delenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", raising=False)
+
+    options = client_options_from_env()
+
+    assert options["maxPoolSize"] == 50
+    assert options["minPoolSize"] == 5
+    assert options["compressors"] == "zstd,zlib"
+    assert "waitQueueTimeoutMS" not in options
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("min_pool_size", [0, 3])
+async def test_prewarm_pool_pings_min_pool_size_times(min_pool_size):
+    mongo_client = MagicMock()
+    mongo_client.options.pool_options.min_pool_size = min_pool_size
+    mongo_client.admin.command = AsyncMock()
+
+    await prewarm_pool(mongo_client)
+
+    assert mongo_client.admin.command.await_count == min_pool_size
@@ -0,0 +1,54 @@
+from odmantic import ObjectId
+
+from books_reviewing.prefix_index import PrefixIndex, normalize
+
+pepa_id = ObjectId("5f85f36d6dfecacc68428a46")
+ceca_id = ObjectId("5f85f36d6dfecacc68428a47")
+pedro_id = ObjectId("5f85f36d6dfecacc68428a48")
+
+
+def build_index() -> PrefixIndex:
+    index = PrefixIndex()
+    index.build([(pepa_id, "Pepa"), (ceca_id, "Ceca"), (pedro_id, "Pédro Páramo")])
+    return index
+
+
+def test_normalize():
+    assert normalize("  Pédro PÁRAMO ") == "pedro paramo"
+
+
+def test_suggest():
+    index = build_index()
+
+    assert index.suggest("pe", 10) == [(pedro_id, "Pédro Páramo"), (pepa_id, "Pepa")]
+    assert index.suggest("PÉP", 10) == [(pepa_id, "Pepa")]
+    assert index.suggest("x", 10) == []
+    assert index.suggest("   ", 10) == []
+
+
+def test_suggest_limit():
+    index = build_index()
+
+    assert index.suggest("pe", 1) == [(pedro_id, "Pédro Páramo")]
+
+
+def test_add_and_update():
+    index = build_index()
+
+    index.add(ObjectId("5f85f36d6dfecacc68428a49"), "Meca")
+    index.add(ceca_id, "Peca")
+
+    assert len(index) == 4
+    assert index.suggest("c", 10) == []
+    assert index.suggest("m", 10) == [(ObjectId("5f85f36d6dfecacc68428a49"), "Meca")]
+    assert index.suggest("pec", 10) == [(ceca_id, "Peca")]
+
+
+def test_remove():
+    index = build_index()
+
+    index.remove(pepa_id)
+    index.remove(ObjectId("5f85f36d6dfecacc68428a49"))
+
+    assert len(index) == 2
+    assert index.suggest("pe", 10) == [(pedro_id, "Pédro Páramo")]
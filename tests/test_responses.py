@@ -0,0 +1,175 @@
+import datetime
+import json
+import logging
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from odmantic import ObjectId
+from pymongo.errors import ExecutionTimeout
+
+from books_reviewing import responses
+from books_reviewing.responses import (
+    BSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    FastJSONResponse,
+    NegotiatedResponse,
+    dumps_json,
+    dumps_orjson,
+    iterate_json_array,
+    loads_bson,
+    loads_msgpack,
+    response_media_type,
+    streaming_json_response,
+)
+from books_reviewing.deadlines import request_deadline
+from books_reviewing.exceptions import DatabaseException, DeadlineExceededException
+from books_reviewing.repositories.books import BooksRepository
+
+content = {
+    "id": ObjectId("5f85f36d6dfecacc68428a46"),
+    "publication_date": datetime.datetime(2024, 1, 23, 21, 19, 18, 307000),
+    "title": "Pépa Pig",
+    "ctx": {"error": ValueError("Email is not valid")},
+    "items": [1, 2.5, None, True],
+}
+
+expected_json = (
+    '{"id":"5f85f36d6dfecacc68428a46",'
+    '"publication_date":"2024-01-23T21:19:18.307000",'
+    '"title":"Pépa Pig",'
+    '"ctx":{"error":"Email is not valid"},'
+    '"items":[1,2.5,null,true]}'
+)
+
+
+@pytest.mark.parametrize("dumps", [dumps_json, dumps_orjson])
+def test_encoders_serialize_object_ids_and_datetimes(dumps):
+    assert dumps(content).decode() == expected_json
+
+
+def test_fast_json_response_uses_configured_encoder(monkeypatch):
+    monkeypatch.setattr(responses, "dumps", dumps_json)
+
+    response = FastJSONResponse(content, status_code=201)
+
+    assert response.status_code == 201
+    assert response.body.decode() == expected_json
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_negotiated_response_defaults_to_json():
+    response = NegotiatedResponse(content)
+
+    assert response.body.decode() == expected_json
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_negotiated_response_renders_msgpack():
+    token = response_media_type.set(MSGPACK_MEDIA_TYPE)
+    try:
+        response = NegotiatedResponse(content)
+    finally:
+        response_media_type.reset(token)
+
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    decoded = loads_msgpack(response.body)
+    assert decoded["id"] == "5f85f36d6dfecacc68428a46"
+    assert decoded["publication_date"] == datetime.datetime(
+        2024, 1, 23, 21, 19, 18, 307000, tzinfo=datetime.timezone.utc
+    )
+    assert decoded["items"] == [1, 2.5, None, True]
+
+
+def test_negotiated_response_renders_bson_and_wraps_lists():
+    token = response_media_type.set(BSON_MEDIA_TYPE)
+    try:
+        document = NegotiatedResponse({"id": content["id"], "title": "Pépa Pig"})
+        items = NegotiatedResponse([{"title": "Pépa Pig"}])
+    finally:
+        response_media_type.reset(token)
+
+    assert document.headers["content-type"] == BSON_MEDIA_TYPE
+    assert loads_bson(document.body) == {"id": content["id"], "title": "Pépa Pig"}
+    assert loads_bson(items.body) == {"items": [{"title": "Pépa Pig"}]}
+
+
+async def as_async_iterable(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, 1, 50])
+async def test_iterate_json_array_streams_valid_json_in_chunks(count):
+    documents = [{"id": ObjectId(), "title": f"Book {i}"} for i in range(count)]
+
+    chunks = [
+        chunk async for chunk in iterate_json_array(as_async_iterable(documents), 256)
+    ]
+
+    assert json.loads(b"".join(chunks)) == [
+        {"id": str(document["id"]), "title": document["title"]}
+        for document in documents
+    ]
+    assert all(len(chunk) < 256 + 64 for chunk in chunks)
+
+
+async def fail_after(items, exception: Exception):
+    for item in items:
+        yield item
+    raise exception
+
+
+@pytest.mark.asyncio
+async def test_streaming_json_response_raises_errors_before_the_response():
+    with pytest.raises(DatabaseException):
+        await streaming_json_response(fail_after([], DatabaseException("down")))
+
+
+def test_streaming_json_response_aborts_on_errors_mid_stream(caplog):
+    app = FastAPI()
+
+    @app.get("/export")
+    async def export():
+        documents = [{"title": "x" * 100}] * 1000
+        return await streaming_json_response(
+            fail_after(documents, DatabaseException("down"))
+        )
+
+    received = b""
+    # Starlette re-raises it from its task group, wrapped in an ExceptionGroup.
+    with pytest.raises(Exception):
+        with TestClient(app).stream("GET", "/export") as response:
+            assert response.status_code == 200
+            for chunk in response.iter_bytes():
+                received += chunk
+
+    assert not received.endswith(b"]")
+    assert caplog.record_tuples == [
+        ("books_reviewing.responses", logging.ERROR, "Streaming the response failed")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_batches_go_through_the_database_wrapper():
+    cursor = MagicMock(
+        to_list=AsyncMock(
+            side_effect=[[{"_id": 1, "title": "Pepa"}], ExecutionTimeout("")]
+        ),
+        close=AsyncMock(),
+    )
+    mongo_engine = MagicMock()
+    mongo_engine.get_collection.return_value.find.return_value.sort.return_value.batch_size.return_value = (
+        cursor
+    )
+    request_deadline.set(time.monotonic() + 1)
+
+    documents = BooksRepository(mongo_engine).export_documents("title", "asc")
+
+    assert await anext(documents) == {"id": 1, "title": "Pepa"}
+    with pytest.raises(DeadlineExceededException):
+        await anext(documents)
+    cursor.close.assert_awaited_once()
@@ -0,0 +1,21 @@
+import pytest
+
+from books_reviewing.routing import negotiate_media_type
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, "application/json"),
+        ("*/*", "application/json"),
+        ("application/msgpack", "application/msgpack"),
+        ("application/x-msgpack", "application/x-msgpack"),
+        ("application/bson", "application/bson"),
+        ("application/json, application/msgpack;q=0.5", "application/json"),
+        ("application/json;q=0.5, application/msgpack", "application/msgpack"),
+        ("text/html, application/xml", "application/json"),
+        ("application/bson;q=abc", "application/json"),
+    ],
+)
+def test_negotiate_media_type(accept, expected):
+    assert negotiate_media_type(accept) == expected
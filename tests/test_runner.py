@@ -0,0 +1,93 @@
+import asyncio
+import signal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import uvicorn
+
+from books_reviewing.container import Container
+from books_reviewing.runner import (
+    DrainingServer,
+    select_implementation,
+    server_options_from_env,
+)
+
+
+def test_server_options_from_env(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.setenv("SERVER_KEEP_ALIVE_TIMEOUT", "75")
+    monkeypatch.setenv("SERVER_DRAIN_SECONDS", "2.5")
+    monkeypatch.delenv("SERVER_BACKLOG", raising=False)
+
+    options = server_options_from_env()
+
+    assert options["workers"] == 4
+    assert options["timeout_keep_alive"] == 75
+    assert options["drain_seconds"] == 2.5
+    assert options["backlog"] == 2048
+
+
+def test_server_options_default_to_one_worker(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+
+    assert server_options_from_env()["workers"] == 1
+
+
+@pytest.mark.parametrize(
+    "kind, preferred, installed, selected",
+    [
+        ("loop", "auto", True, "uvloop"),
+        ("loop", "auto", False, "asyncio"),
+        ("loop", "uvloop", False, "asyncio"),
+        ("loop", "asyncio", True, "asyncio"),
+        ("http", "auto", True, "httptools"),
+        ("http", "httptools", False, "h11"),
+    ],
+)
+def test_select_implementation(monkeypatch, kind, preferred, installed, selected):
+    monkeypatch.setattr(
+        "books_reviewing.runner.importlib.util.find_spec",
+        lambda name: object() if installed else None,
+    )
+
+    assert select_implementation(kind, preferred) == selected
+
+
+def make_server(drain_seconds: float) -> tuple[DrainingServer, Container]:
+    container = Container("mongodb://mongo:27017/", "test")
+    container.ready = True
+    app = SimpleNamespace(state=SimpleNamespace(container=container))
+    config = MagicMock(spec=uvicorn.Config, loaded_app=SimpleNamespace(app=app))
+    return DrainingServer(config, drain_seconds), container
+
+
+@pytest.mark.asyncio
+async def test_draining_server_stops_after_drain():
+    server, container = make_server(drain_seconds=0.05)
+
+    server.handle_exit(signal.SIGTERM, None)
+
+    assert container.status == "stopping"
+    assert not server.should_exit
+    await asyncio.sleep(0.1)
+    assert server.should_exit
+
+
+@pytest.mark.asyncio
+async def test_draining_server_exits_on_second_signal():
+    server, container = make_server(drain_seconds=60)
+
+    server.handle_exit(signal.SIGTERM, None)
+    server.handle_exit(signal.SIGTERM, None)
+
+    assert server.should_exit
+
+
+def test_server_without_drain_exits_right_away():
+    server, container = make_server(drain_seconds=0)
+
+    server.handle_exit(signal.SIGTERM, None)
+
+    assert server.should_exit
+    assert container.ready
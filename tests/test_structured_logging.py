@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import queue
+
+from books_reviewing.structured_logging import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RepeatedRecordFilter,
+    RequestContextFilter,
+    configure_logging,
+    log_file_path,
+    stop_logging,
+    request_id,
+)
+
+
+def make_record(message: str = "boom", lineno: int = 1, **extra):
+    record = logging.LogRecord(
+        "main", logging.ERROR, "main.py", lineno, message, None, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_records_carry_the_request_context_and_extra_fields():
+    token = request_id.set("abc")
+    try:
+        record = make_record(duration_ms=12.5)
+        RequestContextFilter().filter(record)
+    finally:
+        request_id.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "boom"
+    assert entry["level"] == "ERROR"
+    assert entry["request_id"] == "abc"
+    assert entry["duration_ms"] == 12.5
+    assert "trace_id" not in entry
+
+
+def test_repeated_records_are_rate_limited_per_call_site(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr("time.monotonic", lambda: now)
+    repeated = RepeatedRecordFilter(window=60, burst=2)
+
+    assert [repeated.filter(make_record()) for _ in range(5)] == [
+        True,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert repeated.filter(make_record(lineno=2))
+    assert repeated.filter(make_record(status_code=504))
+    assert repeated.filter(make_record(exc_info=(ValueError, ValueError(), None)))
+
+    now = 61.0
+    record = make_record()
+    assert repeated.filter(record)
+    assert record.suppressed == 3
+
+
+def test_queue_handler_keeps_the_traceback_apart_and_never_blocks():
+    records = queue.Queue(1)
+    handler = NonBlockingQueueHandler(records)
+    try:
+        raise ValueError("broken")
+    except ValueError as exception:
+        record = make_record("failed %s", exc_info=(ValueError, exception, None))
+        record.args = ("twice",)
+        handler.emit(record)
+    handler.emit(make_record())
+
+    queued = records.get_nowait()
+    assert queued.getMessage() == "failed twice"
+    assert queued.exc_info is None
+    assert "ValueError: broken" in queued.exc_text
+    assert handler.dropped == 1
+
+
+def test_configure_logging_writes_json_lines(tmp_path):
+    path = tmp_path / "errors.log"
+    logger = logging.getLogger("tests.structured_logging")
+    logger.propagate = False
+    listener = configure_logging([logger], str(path))
+    try:
+        logger.error("Database error", extra={"repository": "BooksRepository"})
+    finally:
+        stop_logging([logger], listener)
+
+    (line,) = path.read_text().splitlines()
+    assert json.loads(line)["repository"] == "BooksRepository"
+    assert logger.handlers == []
+
+
+def test_each_worker_gets_its_own_log_file():
+    assert log_file_path("../errors.log", 1) == "../errors.log"
+    assert log_file_path("../errors.log", 4) == f"../errors-{os.getpid()}.log"
+    assert log_file_path("", 4) == ""
@@ -0,0 +1,179 @@
+import asyncio
+import json
+
+import pytest
+
+from books_reviewing import instrumentation
+from books_reviewing.exceptions import database_exception_wrapper
+from books_reviewing.tracing import (
+    SPAN_KIND_CLIENT,
+    FileSpanExporter,
+    SpanExporter,
+    Trace,
+    Tracer,
+    current_span,
+    parse_traceparent,
+    start_span,
+    trace_repository_call,
+    traced_methods,
+)
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        super().__init__()
+        self.traces = []
+
+    def export(self, trace: Trace):
+        self.traces.append(trace)
+
+    def write(self, request: dict):
+        pass
+
+
+class BooksRepository:
+    @database_exception_wrapper
+    async def get(self, book_id: str):
+        return {"_id": book_id}
+
+
+@traced_methods
+class BooksService:
+    async def get(self, book_id: str):
+        return await BooksRepository().get(book_id)
+
+    async def get_many(self, book_ids: list[str]):
+        return await asyncio.gather(*(self.get(book_id) for book_id in book_ids))
+
+
+@pytest.fixture
+def tracer() -> Tracer:
+    return Tracer(1.0, ListExporter())
+
+
+@pytest.fixture
+def repository_tracing():
+    instrumentation.add_observer(trace_repository_call)
+    yield
+    instrumentation.remove_observer(trace_repository_call)
+
+
+async def traced_request(tracer: Tracer, coroutine) -> Trace:
+    span = tracer.start_request("GET /books")
+    token = current_span.set(span)
+    try:
+        await coroutine
+    finally:
+        current_span.reset(token)
+        tracer.finish_request(span)
+    return span.trace
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_gathered_tasks(tracer, repository_tracing):
+    trace = await traced_request(tracer, BooksService().get_many(["1", "2"]))
+
+    spans = {span.span_id: span for span in trace.spans}
+    names = sorted(span.name for span in trace.spans)
+    assert names == [
+        "BooksRepository.get",
+        "BooksRepository.get",
+        "BooksService.get",
+        "BooksService.get",
+        "BooksService.get_many",
+        "GET /books",
+    ]
+    for span in trace.spans:
+        if span.name == "BooksRepository.get":
+            assert span.kind == SPAN_KIND_CLIENT
+            assert span.attributes["db.result_size"] == 1
+            assert spans[span.parent_span_id].name == "BooksService.get"
+        if span.name == "BooksService.get":
+            assert spans[span.parent_span_id].name == "BooksService.get_many"
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_recorded_outside_a_trace(repository_tracing):
+    assert await BooksService().get("1") == {"_id": "1"}
+    with start_span("unsampled") as span:
+        assert span is None
+
+
+@pytest.mark.asyncio
+async def test_errors_are_recorded_on_the_span(tracer):
+    async def fails():
+        with start_span("fails"):
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await traced_request(tracer, fails())
+
+    assert tracer.exporter.traces[0].spans[0].error == "ValueError"
+
+
+def test_sampling_follows_the_rate_and_the_traceparent():
+    assert Tracer(0.0, ListExporter()).start_request("GET") is None
+    assert not Tracer(0.0, ListExporter()).enabled
+
+    tracer = Tracer(1e-9, ListExporter())
+    trace_id, parent_id = "a" * 32, "b" * 16
+    span = tracer.start_request("GET", f"00-{trace_id}-{parent_id}-01")
+    assert span.trace.trace_id == trace_id
+    assert span.parent_span_id == parent_id
+    assert (
+        Tracer(1.0, ListExporter()).start_request(
+            "GET", f"00-{trace_id}-{parent_id}-00"
+        )
+        is None
+    )
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{'a' * 32}-{'b' * 16}-01") == (
+        "a" * 32,
+        "b" * 16,
+        True,
+    )
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+    assert parse_traceparent(f"00-{'a' * 32}-{'b' * 16}-zz") is None
+    assert parse_traceparent(f"00-{'A' * 32}-{'b' * 16}-01") is None
+    assert parse_traceparent(f"00-{'g' * 32}-{'b' * 16}-01") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{'b' * 16}-01") is None
+    assert parse_traceparent(f"00-{'a' * 32}-{'0' * 16}-01") is None
+    assert parse_traceparent(f"ff-{'a' * 32}-{'b' * 16}-01") is None
+    assert parse_traceparent(f"0-{'a' * 32}-{'b' * 16}-01") is None
+    assert parse_traceparent(f"00-{'a' * 32}-{'b' * 16}-01-extra") is None
+    assert parse_traceparent(f"01-{'a' * 32}-{'b' * 16}-01-extra") == (
+        "a" * 32,
+        "b" * 16,
+        True,
+    )
+
+
+def test_span_exporters_must_implement_write():
+    with pytest.raises(TypeError):
+        SpanExporter()
+
+
+def test_file_exporter_writes_otlp_json(tmp_path, tracer):
+    path = tmp_path / "traces.jsonl"
+    exporter = FileSpanExporter(str(path), flush_interval=0.01)
+    span = tracer.start_request("GET /books", attributes={"http.status_code": 200})
+    span.end()
+
+    exporter.export(span.trace)
+    exporter.shutdown()
+
+    (line,) = path.read_text().splitlines()
+    request = json.loads(line)
+    resource = request["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"] == {
+        "stringValue": "books_reviewing"
+    }
+    (exported,) = resource["scopeSpans"][0]["spans"]
+    assert exported["traceId"] == span.trace.trace_id
+    assert exported["name"] == "GET /books"
+    assert exported["attributes"] == [
+        {"key": "http.status_code", "value": {"intValue": "200"}}
+    ]